@@ -0,0 +1,112 @@
+import gzip
+import os
+
+# Directory the scraper archives raw pages in.
+ARCHIVE_DIR = 'raw_pages'
+# Pages written to one shard before the next shard is started.
+PAGES_PER_SHARD = 500
+INDEX_FILE = 'index.tsv'
+
+
+class PageArchive:
+    """
+    Writes raw listing pages into gzip-compressed shard files as they arrive.
+
+    Each page is its own gzip member appended to the current shard, so a shard
+    is still an ordinary .gz file, and any one page can be read back by seeking
+    to its offset. index.tsv gets one line per page (page key, shard, offset,
+    length) and is flushed with the shard, so an interrupted scrape leaves a
+    readable archive of every page written so far.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR, pages_per_shard=PAGES_PER_SHARD):
+        self.directory = directory
+        self.pages_per_shard = pages_per_shard
+        self.page_count = 0
+        self._shard = None
+        self._shard_name = None
+        os.makedirs(directory, exist_ok=True)
+        # A new scrape replaces whatever archive was there before.
+        for name in os.listdir(directory):
+            if name == INDEX_FILE or name.startswith('pages-'):
+                os.remove(os.path.join(directory, name))
+        self._index = open(os.path.join(directory, INDEX_FILE), 'w', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, page_key, html_content):
+        """
+        Compresses one page onto the end of the current shard and indexes it.
+        """
+        if self.page_count % self.pages_per_shard == 0:
+            self._next_shard()
+        member = gzip.compress(html_content.encode('utf-8'))
+        offset = self._shard.tell()
+        self._shard.write(member)
+        self._shard.flush()
+        self._index.write(f'{page_key}\t{self._shard_name}\t{offset}\t{len(member)}\n')
+        self._index.flush()
+        self.page_count += 1
+
+    def close(self):
+        """Closes the open shard and the index."""
+        if self._shard is not None:
+            self._shard.close()
+            self._shard = None
+        self._index.close()
+
+    def _next_shard(self):
+        if self._shard is not None:
+            self._shard.close()
+        self._shard_name = f'pages-{self.page_count // self.pages_per_shard:05d}.gz'
+        self._shard = open(os.path.join(self.directory, self._shard_name), 'wb')
+
+
+def read_index(directory=ARCHIVE_DIR):
+    """
+    Returns the archive index as a list of (page_key, shard, offset, length), in page order.
+    """
+    index = []
+    with open(os.path.join(directory, INDEX_FILE), 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            # A line cut short by a crash has fewer fields; its page is not usable.
+            if len(parts) == 4:
+                page_key, shard, offset, length = parts
+                index.append((page_key, shard, int(offset), int(length)))
+    index.sort(key=lambda entry: int(entry[0].rsplit('_', 1)[1]))
+    return index
+
+
+def read_page(directory, entry):
+    """
+    Reads and decompresses the single page described by one index entry.
+    """
+    _, shard, offset, length = entry
+    with open(os.path.join(directory, shard), 'rb') as f:
+        f.seek(offset)
+        return gzip.decompress(f.read(length)).decode('utf-8')
+
+
+def iter_pages(directory=ARCHIVE_DIR):
+    """
+    Lazily yields (page_key, html_content) for every archived page, in page order.
+
+    Only one page is decompressed at a time, and each shard is opened once.
+    """
+    shard_name, shard = None, None
+    try:
+        for page_key, name, offset, length in read_index(directory):
+            if name != shard_name:
+                if shard is not None:
+                    shard.close()
+                shard_name, shard = name, open(os.path.join(directory, name), 'rb')
+            shard.seek(offset)
+            yield page_key, gzip.decompress(shard.read(length)).decode('utf-8')
+    finally:
+        if shard is not None:
+            shard.close()
@@ -1,10 +1,18 @@
 import json
+import os
 import re
+import textwrap
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from bs4 import BeautifulSoup
 
+from archive import ARCHIVE_DIR, INDEX_FILE, iter_pages, read_index, read_page
+
 # Input and output files
 RAW_DATA_FILE = 'raw_html_data.json'
 CLEAN_DATA_FILE = 'applicant_data.json'
+# Processes cleaning archived pages; 0 or 1 cleans them in this process.
+CLEAN_WORKERS = os.cpu_count() or 1
 
 def parse_status_and_date(tag):
     """
@@ -64,93 +72,160 @@ def parse_details_from_badges(row):
 def clean_data(raw_html_dict):
     """
     Parses the raw HTML from the JSON file into a structured list of applicant data.
+
+    Also accepts any iterable of (page_key, html_content) pairs, such as
+    archive.iter_pages, so archived pages are read one at a time.
     """
     all_applicants = []
-    for page_key, html_content in raw_html_dict.items():
-        if not html_content:
-            continue
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
+    pages = raw_html_dict.items() if isinstance(raw_html_dict, dict) else raw_html_dict
+    for _, html_content in pages:
+        all_applicants.extend(clean_page(html_content))
+    return all_applicants
 
-        # The tbody tag has the table entries without the header.
-        tbody = soup.find('tbody')
-        if not tbody:
-            continue
+def clean_page(html_content):
+    """
+    Parses one page of raw HTML into a list of applicant entries.
+    """
+    all_applicants = []
+    if not html_content:
+        return []
 
-        # Find all top-level rows in the tbody.
-        # This is complex because comments and details are also in <tr> tags.
-        rows = tbody.find_all('tr', recursive=False)
-        
-        i = 0
-        while i < len(rows):
-            # The first row for an applicant doesn't have a colspan attribute.
-            first_tds = rows[i].find_all('td')
-            if not first_tds or first_tds[0].get('colspan'):
-                i += 1
-                continue
-
-            # Parse the first row. 
-            school = first_tds[0].get_text(strip=True)
-            
-            program_cell = first_tds[1]
-            program_name = program_cell.find('span').get_text(strip=True)
-            degree = program_cell.find_all('span')[-1].get_text(strip=True)
-            
-            date_added = first_tds[2].get_text(strip=True)
-            status, decision_date = parse_status_and_date(first_tds[3])
-            
-            # Finds the url ending for the individual record.
-            url_tag = first_tds[4].find('a', href=re.compile(r'/result/\d+'))
-            url = 'https://www.thegradcafe.com' + url_tag['href']
-
-            applicant_entry = {
-            	'university': school,
-                'program': program_name, 
-                'Degree': degree,
-                'date_added': date_added,
-                'status': status,
-                'decision_date': decision_date,
-                'url': url
-            }
-            
-            # Parse the details row  with the badges.
-            i += 1
-            details_row = rows[i]
-            details = parse_details_from_badges(details_row)
-            applicant_entry.update(details)
+    soup = BeautifulSoup(html_content, 'html.parser')
 
-            # Parse the optional comment row.
+    # The tbody tag has the table entries without the header.
+    tbody = soup.find('tbody')
+    if not tbody:
+        return []
+
+    # Find all top-level rows in the tbody.
+    # This is complex because comments and details are also in <tr> tags.
+    rows = tbody.find_all('tr', recursive=False)
+
+    i = 0
+    while i < len(rows):
+        # The first row for an applicant doesn't have a colspan attribute.
+        first_tds = rows[i].find_all('td')
+        if not first_tds or first_tds[0].get('colspan'):
             i += 1
-            comments = None
-            # A comment row has a single td with colspan='100%' and a <p> tag
-            if i < len(rows) and rows[i].find('td', {'colspan': '100%'}):
-                comment_tag = rows[i].find('p')
-                if comment_tag:
-                    comments = comment_tag.get_text(strip=True)
-                    i += 1 # Increment because we consumed this row
+            continue
+
+        # Parse the first row. 
+        school = first_tds[0].get_text(strip=True)
+
+        program_cell = first_tds[1]
+        program_name = program_cell.find('span').get_text(strip=True)
+        degree = program_cell.find_all('span')[-1].get_text(strip=True)
+
+        date_added = first_tds[2].get_text(strip=True)
+        status, decision_date = parse_status_and_date(first_tds[3])
+
+        # Finds the url ending for the individual record.
+        url_tag = first_tds[4].find('a', href=re.compile(r'/result/\d+'))
+        url = 'https://www.thegradcafe.com' + url_tag['href']
+
+        applicant_entry = {
+        	'university': school,
+            'program': program_name, 
+            'Degree': degree,
+            'date_added': date_added,
+            'status': status,
+            'decision_date': decision_date,
+            'url': url
+        }
+
+        # Parse the details row  with the badges.
+        i += 1
+        details_row = rows[i]
+        details = parse_details_from_badges(details_row)
+        applicant_entry.update(details)
+
+        # Parse the optional comment row.
+        i += 1
+        comments = None
+        # A comment row has a single td with colspan='100%' and a <p> tag
+        if i < len(rows) and rows[i].find('td', {'colspan': '100%'}):
+            comment_tag = rows[i].find('p')
+            if comment_tag:
+                comments = comment_tag.get_text(strip=True)
+                i += 1 # Increment because we consumed this row
+
+        applicant_entry['comments'] = comments
+        all_applicants.append(applicant_entry)
             
-            applicant_entry['comments'] = comments
-            all_applicants.append(applicant_entry)
-                
     return all_applicants
 
+def clean_archived_page(directory, entry):
+    """
+    Reads one page from the archive and cleans it; runs in a worker process.
+    """
+    return clean_page(read_page(directory, entry))
+
+def clean_archive(directory=ARCHIVE_DIR, workers=CLEAN_WORKERS):
+    """
+    Yields the applicant entries of each archived page, one list per page, in page order.
+
+    With more than one worker, pages are cleaned on a process pool. Each worker
+    reads its own page from the archive, so only index entries and results
+    pass between processes, and at most twice as many pages as there are
+    workers are in flight at once, however large the archive is.
+    """
+    if workers <= 1:
+        for _, html_content in iter_pages(directory):
+            yield clean_page(html_content)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        queued = deque()
+        for entry in read_index(directory):
+            queued.append(executor.submit(clean_archived_page, directory, entry))
+            if len(queued) >= 2 * workers:
+                yield queued.popleft().result()
+        while queued:
+            yield queued.popleft().result()
+
 def save_data(data, filename):
     """Saves the cleaned data to a JSON file."""
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=4)
     print(f'Cleaned data successfully saved to {filename}')
 
+def save_data_incrementally(applicant_pages, filename):
+    """
+    Writes applicant entries page by page as they are cleaned.
+
+    The file has exactly the layout save_data gives the same list, but only
+    one page of entries is held in memory at a time. Returns the entry count.
+    """
+    count = 0
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for applicants in applicant_pages:
+            for applicant in applicants:
+                f.write(',\n' if count else '\n')
+                f.write(textwrap.indent(json.dumps(applicant, indent=4), '    '))
+                count += 1
+        f.write('\n]' if count else ']')
+    print(f'Cleaned data successfully saved to {filename}')
+    return count
+
 def load_data(filename):
     """Loads data from a JSON file."""
     with open(filename, 'r', encoding='utf-8') as f:
         return json.load(f)
 
 if __name__ == '__main__':
-    print(f'Loading raw HTML data from {RAW_DATA_FILE}...')
-    raw_data = load_data(RAW_DATA_FILE)
+    if os.path.exists(os.path.join(ARCHIVE_DIR, INDEX_FILE)):
+        # Pages are cleaned in parallel and written out in page order as they finish.
+        print(f'Cleaning archived pages from {ARCHIVE_DIR}/ with {CLEAN_WORKERS} workers...')
+        entry_count = save_data_incrementally(clean_archive(ARCHIVE_DIR, CLEAN_WORKERS),
+                                              CLEAN_DATA_FILE)
+        print(f'Processed {entry_count} applicant entries.')
+    else:
+        print(f'Loading raw HTML data from {RAW_DATA_FILE}...')
+        raw_data = load_data(RAW_DATA_FILE)
     
-    if raw_data:
-        print('Cleaning and structuring data...')
-        cleaned_data = clean_data(raw_data)
-        print(f'Processed {len(cleaned_data)} applicant entries.')
-        save_data(cleaned_data, CLEAN_DATA_FILE)
+        if raw_data:
+            print('Cleaning and structuring data...')
+            cleaned_data = clean_data(raw_data)
+            print(f'Processed {len(cleaned_data)} applicant entries.')
+            save_data(cleaned_data, CLEAN_DATA_FILE)
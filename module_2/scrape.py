@@ -1,19 +1,85 @@
+import codecs
+import contextlib
+import os
+import threading
+import time
 import urllib3
 import json
 import re
 from urllib.robotparser import RobotFileParser
 from urllib.parse import urljoin
 
+from archive import ARCHIVE_DIR, PageArchive
+
 # Constants
 BASE_URL = 'https://www.thegradcafe.com/'
 TARGET_URL = urljoin(BASE_URL, 'survey/index.php')
 USER_AGENT = 'Burch'
 TARGET_ENTRIES = 100000 
+# Raw pages are archived into gzip shards under ARCHIVE_DIR as they arrive;
+# this single JSON file is only written by save_data for small scrapes.
 OUTPUT_FILE = 'raw_html_data.json'
+# Pages are kept here with their ETag/Last-Modified so a re-run only downloads
+# pages that changed. Set to None to always download everything.
+CACHE_DIR = 'page_cache'
+# Pages are requested compressed ("gzip,deflate", plus "br" when brotli is
+# installed) and decoded a chunk of this many bytes at a time.
+ACCEPT_ENCODING = urllib3.util.make_headers(accept_encoding=True)['accept-encoding']
+STREAM_CHUNK_SIZE = 64 * 1024
+# robots.txt policies cached between runs, in the same format module_5 uses so
+# both scrapers can share one file. Within the TTL no request is made; after it
+# the cached rules are used while a background thread fetches new ones, and only
+# a policy older than the max staleness is read before scraping starts.
+ROBOTS_CACHE_FILE = 'robots_cache.json'
+ROBOTS_CACHE_TTL = 24 * 60 * 60
+ROBOTS_MAX_STALE = 7 * 24 * 60 * 60
+
+def load_robots_cache():
+    """
+    Returns the cached robots.txt policies keyed by URL, or {} if there are none.
+    """
+    try:
+        with open(ROBOTS_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def store_robots_policy(robots_url, parser):
+    """
+    Saves the policy a parser has just read, unless the read failed.
+    """
+    if not (parser.mtime() or parser.allow_all or parser.disallow_all):
+        return
+    policies = load_robots_cache()
+    policies[robots_url] = {
+        'rules': str(parser),
+        'allow_all': parser.allow_all is True,
+        'disallow_all': parser.disallow_all is True,
+        'fetched_at': time.time(),
+    }
+    tmp_path = f'{ROBOTS_CACHE_FILE}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(policies, f)
+    os.replace(tmp_path, ROBOTS_CACHE_FILE)
+
+def refresh_robots_policy(robots_url):
+    """
+    Re-reads robots.txt and updates the cache; runs on a background thread.
+    """
+    parser = RobotFileParser()
+    parser.set_url(robots_url)
+    try:
+        parser.read()
+    except OSError as e:
+        print(f'Could not refresh {robots_url}: {e}')
+        return
+    store_robots_policy(robots_url, parser)
 
 def check_permission(target_url, user_agent):
     """
     Checks the robots.txt file to see if scraping is allowed.
+
+    Uses the cached policy when there is a recent enough one.
     """
     robots_url = urljoin(target_url, '/robots.txt')
     print(f'Checking permissions at: {robots_url}...')
@@ -21,7 +87,18 @@ def check_permission(target_url, user_agent):
     parser = RobotFileParser()
     parser.set_url(robots_url)
     
-    parser.read()
+    policy = load_robots_cache().get(robots_url)
+    age = time.time() - policy['fetched_at'] if policy else None
+    if policy is None or age >= ROBOTS_MAX_STALE:
+        parser.read()
+        store_robots_policy(robots_url, parser)
+    else:
+        parser.parse(policy['rules'].splitlines())
+        parser.allow_all = policy['allow_all']
+        parser.disallow_all = policy['disallow_all']
+        if age >= ROBOTS_CACHE_TTL:
+            threading.Thread(target=refresh_robots_policy, args=(robots_url,),
+                             daemon=True).start()
     is_allowed = parser.can_fetch(user_agent, target_url)
     if is_allowed:
         print('Scraping is allowed by robots.txt.')
@@ -29,9 +106,76 @@ def check_permission(target_url, user_agent):
         print('Scraping is disallowed by robots.txt.')
     return is_allowed
 
-def scrape_data():
+def cache_paths(page_num):
+    """
+    Returns the (html, metadata) file paths used to cache one listing page.
+    """
+    base = os.path.join(CACHE_DIR, f'page_{page_num}')
+    return f'{base}.html', f'{base}.json'
+
+def request_page(http, page_num):
+    """
+    Requests one listing page, revalidating the cached copy if there is one.
+
+    Returns (status, html), where html is None unless the status is 200. The
+    page is requested compressed and read as a stream: each decoded chunk is
+    written to the cache and turned into text as it arrives, so the page is
+    never held as one bytes object. A 304 Not Modified answer is turned into a
+    200 with the cached page.
+    """
+    url = f'{TARGET_URL}?page={page_num}'
+    headers = {'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING}
+    cached = None
+    if CACHE_DIR:
+        html_path, meta_path = cache_paths(page_num)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(html_path, 'rb') as f:
+                cached = f.read()
+        except (OSError, ValueError):
+            meta = {}
+        if cached is not None and meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if cached is not None and meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    response = http.request('GET', url, headers=headers, preload_content=False)
+    try:
+        if response.status == 304 and cached is not None:
+            return 200, cached.decode('utf-8', 'ignore')
+        if response.status != 200:
+            response.drain_conn()
+            return response.status, None
+
+        decoder = codecs.getincrementaldecoder('utf-8')('ignore')
+        parts = []
+        with contextlib.ExitStack() as stack:
+            cache_file = None
+            if CACHE_DIR:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                cache_file = stack.enter_context(open(html_path, 'wb'))
+            for chunk in response.stream(STREAM_CHUNK_SIZE, decode_content=True):
+                if cache_file:
+                    cache_file.write(chunk)
+                parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b'', final=True))
+    finally:
+        response.release_conn()
+
+    if CACHE_DIR:
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'etag': response.headers.get('ETag'),
+                       'last_modified': response.headers.get('Last-Modified')}, f)
+    return 200, ''.join(parts)
+
+def scrape_data(archive=None):
     """ 
     Scrapes raw html data and puts it into a dictionary 
+
+    With a PageArchive, each page is written to it as it arrives instead, so
+    memory use does not grow with the number of pages and the dictionary
+    returned stays empty.
     """
     http = urllib3.PoolManager()
     all_html_data = {}
@@ -41,17 +185,15 @@ def scrape_data():
     print(f'Starting scrape. Target: {TARGET_ENTRIES} entries.')
 
     while entries_completed < TARGET_ENTRIES:
-        # Construct the URL for the current page.
-        url = f'{TARGET_URL}?page={page_num}'
-
-        # Make the GET request.
-        response = http.request('GET', url, headers={'User-Agent': USER_AGENT})
+        # Make the GET request, conditional if the page is already cached.
+        status, html_content = request_page(http, page_num)
         
-        if response.status == 200:
-            html_content = response.data.decode('utf-8', 'ignore')
-
-            # Add a dictionary entry for each page.
-            all_html_data[f'page_{page_num}'] = html_content
+        if status == 200:
+            # Add a dictionary entry, or an archived page, for each page.
+            if archive is not None:
+                archive.write(f'page_{page_num}', html_content)
+            else:
+                all_html_data[f'page_{page_num}'] = html_content
             
             # Count entries on page based on the regex match so we know how many records we have.
             matches = re.findall(r'https://www.thegradcafe.com/result/', html_content)
@@ -60,7 +202,7 @@ def scrape_data():
 
             print(f'Scraped page {page_num}. Found {entries_on_page} entries. Total: {entries_completed}/{TARGET_ENTRIES}')
         else:
-            print(f'Failed to scrape page {page_num}. Status code: {response.status}')
+            print(f'Failed to scrape page {page_num}. Status code: {status}')
             break
 
         page_num += 1
@@ -76,10 +218,11 @@ def save_data(data, filename):
 
 if __name__ == '__main__':
     if check_permission(TARGET_URL, USER_AGENT):
-        raw_data, entry_count = scrape_data()
+        with PageArchive(ARCHIVE_DIR) as archive:
+            _, entry_count = scrape_data(archive)
         
-        if raw_data:
-            save_data(raw_data, OUTPUT_FILE)
+        if archive.page_count:
+            print(f'\nArchived {archive.page_count} pages in {ARCHIVE_DIR}/')
             print(f'Scraping complete. Collected a total of {entry_count} entries.')
         else:
             print('No data was scraped.')
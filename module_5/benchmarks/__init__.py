@@ -0,0 +1 @@
+"""Benchmarks for the scraping pipeline, run against a local replay server."""
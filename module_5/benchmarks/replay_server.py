@@ -0,0 +1,304 @@
+"""
+Module for serving recorded GradCafe listing pages from a local HTTP server.
+
+``ReplayServer`` stands in for thegradcafe.com so scrapers can be timed and
+tested against real HTTP without touching the live site. Its corpus is a list
+of entry blocks (the table rows making up one result) taken from recorded
+pages, or generated by ``synthetic_corpus``. The server paginates the blocks
+itself, which lets it imitate the live site:
+
+* ``latency`` delays every response,
+* ``error_rate`` answers that fraction of listing requests with a 503,
+* ``shift_every`` inserts a new result at the top of the listing after that
+  many requests, pushing every row one place down the pages the way new
+  submissions do during a real scrape,
+* ``compress`` gzips pages for clients that send ``Accept-Encoding: gzip``,
+  as the live site does; ``bytes_sent`` counts what went over the wire.
+
+Pages past the end of the listing answer 404, which stops every scraper.
+"""
+import gzip
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from bs4 import BeautifulSoup
+
+LISTING_PATH = '/survey/index.php'
+ROBOTS_TXT = b'User-agent: *\nAllow: /\n'
+ROWS_PER_PAGE = 20
+PAGE_TEMPLATE = '<html><body><table><tbody>{}</tbody></table></body></html>'
+PID_PATTERN = re.compile(r'/result/(\d+)')
+
+ENTRY_TEMPLATE = """
+<tr>
+    <td class="tw-py-5 tw-pr-3"><div class="tw-font-medium">{university}</div></td>
+    <td class="tw-px-3 tw-py-5"><div><span>{program}</span><span class="tw-text-gray-500">{degree}</span></div></td>
+    <td class="tw-px-3 tw-py-5">{added}</td>
+    <td class="tw-px-3 tw-py-5"><div class="tw-bg-green-50">{status} on {decided}</div></td>
+    <td class="tw-relative tw-py-5"><a href="/result/{pid}">See More</a></td>
+</tr>
+<tr class="tw-border-none">
+    <td colspan="3" class="tw-pt-2 tw-pb-5">
+        <div class="tw-gap-2 tw-flex">
+            <div class="tw-inline-flex">Fall 2026</div>
+            <div class="tw-inline-flex">{student_type}</div>
+            <div class="tw-inline-flex">GPA {gpa:.2f}</div>
+            <div class="tw-inline-flex">GRE {gre}</div>
+        </div>
+    </td>
+</tr>
+"""
+COMMENT_TEMPLATE = """
+<tr class="tw-border-none"><td colspan="100%" class="tw-pb-5"><p>{comment}</p></td></tr>
+"""
+
+
+def split_entries(page_html):
+    """Split a recorded listing page into one HTML block per entry.
+
+    :param page_html: HTML of a listing page.
+    :type page_html: str or bytes
+    :returns: Entry blocks in page order; rows before the first entry are dropped.
+    :rtype: list[str]
+    """
+    tbody = BeautifulSoup(page_html, 'html.parser').find('tbody')
+    if tbody is None:
+        return []
+    blocks = []
+    for row in tbody.find_all('tr', recursive=False):
+        if len(row.find_all('td', recursive=False)) > 1:
+            blocks.append(str(row))
+        elif blocks:
+            blocks[-1] += str(row)
+    return blocks
+
+
+def load_corpus(path):
+    """Load entry blocks from recorded pages.
+
+    :param path: Either a JSON file mapping ``page_N`` to HTML, as written by
+        ``module_2/scrape.py``, or a directory of ``page_N.html`` files, as kept
+        by its page cache.
+    :type path: str
+    :returns: Entry blocks in listing order.
+    :rtype: list[str]
+    """
+    if os.path.isdir(path):
+        pages = {}
+        for name in os.listdir(path):
+            match = re.fullmatch(r'page_(\d+)\.html', name)
+            if match:
+                with open(os.path.join(path, name), 'r', encoding='utf-8', errors='ignore') as f:
+                    pages[int(match.group(1))] = f.read()
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            pages = {int(key.rsplit('_', 1)[1]): html for key, html in json.load(f).items()}
+    return [block for _, html in sorted(pages.items()) for block in split_entries(html)]
+
+
+def synthetic_corpus(entry_count, first_pid=900000, newest=date(2025, 9, 30), per_day=40,
+                     seed=0):
+    """Generate realistic entry blocks, newest first, when no recording is at hand.
+
+    :param entry_count: Number of entries to generate.
+    :type entry_count: int
+    :param first_pid: PID of the newest entry; older entries count down from it.
+    :type first_pid: int
+    :param newest: ``date_added`` of the newest entry.
+    :type newest: datetime.date
+    :param per_day: Entries added per day.
+    :type per_day: int
+    :param seed: Seed for the generated field values.
+    :type seed: int
+    :rtype: list[str]
+    """
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(entry_count):
+        added = newest - timedelta(days=i // per_day)
+        block = ENTRY_TEMPLATE.format(
+            university=f'University {rng.randrange(400)}',
+            program=rng.choice(['Computer Science', 'Physics', 'History', 'Economics']),
+            degree=rng.choice(['MS', 'PhD', 'MA']),
+            added=f'{added:%B} {added.day}, {added.year}',
+            status=rng.choice(['Accepted', 'Rejected', 'Interview', 'Wait listed']),
+            decided=f'{added.day} {added:%b}',
+            pid=first_pid - i,
+            student_type=rng.choice(['American', 'International']),
+            gpa=rng.uniform(2.5, 4.0),
+            gre=rng.randrange(290, 341),
+        )
+        if i % 3 == 0:
+            block += COMMENT_TEMPLATE.format(comment=f'Comment for entry {first_pid - i}.')
+        blocks.append(block)
+    return blocks
+
+
+# The counters read by the benchmarks sit next to the HTTP plumbing and the listing state.
+class ReplayServer:  # pylint: disable=too-many-instance-attributes
+    """Threaded HTTP server paginating a corpus of entry blocks like the live listing.
+
+    Every option after ``entries`` is keyword-only; they mirror the fault
+    flags of ``run_benchmarks``.
+
+    :param entries: Entry blocks, newest first.
+    :type entries: list[str]
+    :param rows_per_page: Entries per listing page.
+    :type rows_per_page: int
+    :param latency: Seconds every response is delayed by.
+    :type latency: float
+    :param error_rate: Fraction of listing requests answered with a 503.
+    :type error_rate: float
+    :param shift_every: Listing requests between inserted entries; 0 never shifts.
+    :type shift_every: int
+    :param seed: Seed for choosing which requests fail.
+    :type seed: int
+    :param compress: Whether to gzip pages for clients that accept it.
+    :type compress: bool
+    """
+
+    # One keyword per fault knob, so a benchmark run reads like its command line.
+    # pylint: disable-next=too-many-arguments
+    def __init__(self, entries, *, rows_per_page=ROWS_PER_PAGE, latency=0.0, error_rate=0.0,
+                 shift_every=0, seed=0, compress=True):
+        self.entries = list(entries)
+        self.rows_per_page = rows_per_page
+        self.latency = latency
+        self.error_rate = error_rate
+        self.shift_every = shift_every
+        self.compress = compress
+        self.requests = 0
+        self.bytes_sent = 0
+        self.pages_served = 0
+        self.entries_served = 0
+        self._rng = random.Random(seed)
+        self._inserted = []
+        pids = [int(m.group(1)) for block in self.entries for m in PID_PATTERN.finditer(block)]
+        self._next_pid = max(pids, default=0) + 1
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """Root URL of the running server, ending in a slash."""
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    @property
+    def url(self):
+        """Listing URL to use as a scraper's ``TARGET_URL``."""
+        return self.base_url.rstrip('/') + LISTING_PATH
+
+    @property
+    def page_count(self):
+        """Number of listing pages at this moment, including inserted entries."""
+        with self._lock:
+            total = len(self._inserted) + len(self.entries)
+        return -(-total // self.rows_per_page)
+
+    def start(self):
+        """Start serving on a free local port in a background thread."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Routes requests to the owning ``ReplayServer``."""
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """Answer robots.txt and listing requests."""
+                status, body = server.respond(self.path)
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                if server.compress and body and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body, compresslevel=6)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server.count_sent(len(body))
+
+            def log_message(self, *_args):
+                """Keep request logs out of benchmark output."""
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server and wait for its thread."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def respond(self, path):
+        """Build the response for one request path.
+
+        :param path: Request path with query string.
+        :type path: str
+        :returns: Tuple of (status, body).
+        :rtype: tuple[int, bytes]
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        parts = urlsplit(path)
+        if parts.path == '/robots.txt':
+            return 200, ROBOTS_TXT
+        if parts.path != LISTING_PATH:
+            return 404, b''
+        try:
+            page_num = int(parse_qs(parts.query).get('page', ['1'])[0])
+        except ValueError:
+            return 400, b''
+
+        with self._lock:
+            self.requests += 1
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return 503, b''
+            if self.shift_every and self.requests % self.shift_every == 0:
+                self._insert_entry()
+            listing = self._inserted[::-1] + self.entries
+            start = (page_num - 1) * self.rows_per_page
+            blocks = listing[start:start + self.rows_per_page] if page_num >= 1 else []
+            if not blocks:
+                return 404, b''
+            self.pages_served += 1
+            self.entries_served += len(blocks)
+        return 200, PAGE_TEMPLATE.format(''.join(blocks)).encode('utf-8')
+
+    def count_sent(self, size):
+        """Add a response body's size to ``bytes_sent``."""
+        with self._lock:
+            self.bytes_sent += size
+
+    def render_pages(self):
+        """Return every listing page as ``module_2``'s raw data dict, without any request.
+
+        :rtype: dict[str, str]
+        """
+        with self._lock:
+            listing = self._inserted[::-1] + self.entries
+        return {
+            f'page_{i // self.rows_per_page + 1}':
+                PAGE_TEMPLATE.format(''.join(listing[i:i + self.rows_per_page]))
+            for i in range(0, len(listing), self.rows_per_page)
+        }
+
+    def _insert_entry(self):
+        """Add a copy of an existing entry under a new PID at the top of the listing."""
+        template = self.entries[len(self._inserted) % len(self.entries)]
+        self._inserted.append(PID_PATTERN.sub(f'/result/{self._next_pid}', template))
+        self._next_pid += 1
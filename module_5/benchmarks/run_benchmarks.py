@@ -0,0 +1,236 @@
+"""
+Benchmark the scrapers and the module_2 cleaner against ``ReplayServer``.
+
+Each target runs in a fresh process, so the peak RSS reported is that
+target's own high-water mark rather than the largest of all of them. For the
+scrapers the replay server runs in the same process and ``TARGET_URL`` is
+pointed at it; ``clean_data`` is handed the same pages directly, and
+``clean_archive`` reads them from a page archive.
+
+Run from the module_5 directory::
+
+    python -m benchmarks.run_benchmarks --entries 4000 --latency 0.02
+    python -m benchmarks.run_benchmarks --corpus ../module_2/raw_html_data.json
+
+Results are printed as a table and can also be written to a JSON file with
+``--output`` to compare runs before and after a change.
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from .replay_server import ReplayServer, load_corpus, synthetic_corpus
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+MODULE_2_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))), 'module_2')
+TARGETS = ('scrape_and_clean', 'module_2.scrape_data', 'module_2.clean_data',
+           'module_2.clean_archive')
+DEFAULT_ENTRIES = 2000
+
+
+def import_module_2():
+    """Import module_2's scraper, cleaner and page archive, which are scripts rather than a package.
+
+    :returns: Tuple of the (scrape, clean, archive) modules.
+    :rtype: tuple[module, module, module]
+    """
+    if MODULE_2_DIR not in sys.path:
+        sys.path.insert(0, MODULE_2_DIR)
+    import scrape  # pylint: disable=import-outside-toplevel,import-error
+    import clean  # pylint: disable=import-outside-toplevel,import-error
+    import archive  # pylint: disable=import-outside-toplevel,import-error
+    return scrape, clean, archive
+
+
+def peak_rss_kb():
+    """Return this process's peak resident set size in KiB, or None if unknown.
+
+    :rtype: int or None
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KiB.
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def scrape_with_module_5(server):
+    """Run ``scrape_and_clean`` over the whole replayed listing.
+
+    :returns: Tuple of (pages, entries) scraped.
+    :rtype: tuple[int, int]
+    """
+    from src import scrape_and_clean as scraper  # pylint: disable=import-outside-toplevel
+    from src.failed_pages import FailedPages  # pylint: disable=import-outside-toplevel
+    from src.retry_policy import RetryPolicy  # pylint: disable=import-outside-toplevel
+    from src.scrape_options import ScrapeOptions  # pylint: disable=import-outside-toplevel
+    scraper.TARGET_URL = server.url
+    entries = scraper.scrape_and_clean(page_limit=server.page_count + 10, options=ScrapeOptions(
+        probe=False, retry=RetryPolicy(base_delay=0.05), failed_pages=FailedPages()
+    ))
+    return server.pages_served, len(entries)
+
+
+def scrape_with_module_2(server):
+    """Run ``module_2/scrape.scrape_data`` over the whole replayed listing.
+
+    Pages are written to a throwaway page archive, as the script itself does.
+
+    :returns: Tuple of (pages, entries) scraped.
+    :rtype: tuple[int, int]
+    """
+    scrape, _, archive = import_module_2()
+    scrape.TARGET_URL = server.url
+    scrape.CACHE_DIR = None
+    with tempfile.TemporaryDirectory() as directory:
+        with archive.PageArchive(directory) as page_archive:
+            scrape.scrape_data(page_archive)
+    return page_archive.page_count, server.entries_served
+
+
+def clean_with_module_2(server):
+    """Run ``module_2/clean.clean_data`` over every replayed page.
+
+    :returns: Tuple of (pages, entries) cleaned.
+    :rtype: tuple[int, int]
+    """
+    _, clean, _ = import_module_2()
+    pages = server.render_pages()
+    return len(pages), len(clean.clean_data(pages))
+
+
+def clean_archive_with_module_2(server):
+    """Run ``module_2/clean.clean_archive`` over an archive of every replayed page.
+
+    Entries are written out with ``save_data_incrementally``, as the script
+    does, using one worker process per core. Writing the archive is timed too.
+
+    :returns: Tuple of (pages, entries) cleaned.
+    :rtype: tuple[int, int]
+    """
+    _, clean, archive = import_module_2()
+    with tempfile.TemporaryDirectory() as directory:
+        with archive.PageArchive(directory) as page_archive:
+            for page_key, html_content in server.render_pages().items():
+                page_archive.write(page_key, html_content)
+        entry_count = clean.save_data_incrementally(
+            clean.clean_archive(directory, clean.CLEAN_WORKERS),
+            os.path.join(directory, clean.CLEAN_DATA_FILE))
+    return page_archive.page_count, entry_count
+
+
+RUNNERS = {
+    'scrape_and_clean': scrape_with_module_5,
+    'module_2.scrape_data': scrape_with_module_2,
+    'module_2.clean_data': clean_with_module_2,
+    'module_2.clean_archive': clean_archive_with_module_2,
+}
+
+
+def run_target(target, entries, latency=0.0, error_rate=0.0, shift_every=0):
+    """Time one target against a fresh replay server in this process.
+
+    :param target: One of ``TARGETS``.
+    :type target: str
+    :param entries: Entry blocks to serve.
+    :type entries: list[str]
+    :param latency: Seconds each response is delayed by.
+    :type latency: float
+    :param error_rate: Fraction of listing requests answered with a 503.
+    :type error_rate: float
+    :param shift_every: Requests between entries inserted at the top of the listing.
+    :type shift_every: int
+    :returns: Result row with ``target``, ``seconds``, ``pages``, ``entries``,
+        ``pages_per_sec``, ``entries_per_sec``, ``kib_sent`` and ``peak_rss_kb`` keys.
+    :rtype: dict
+    """
+    with ReplayServer(entries, latency=latency, error_rate=error_rate,
+                      shift_every=shift_every) as server:
+        # The scrapers report every page; that output is not what is being timed.
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, \
+                contextlib.redirect_stdout(devnull):
+            started = time.perf_counter()
+            pages, entry_count = RUNNERS[target](server)
+            seconds = time.perf_counter() - started
+    return {
+        'target': target,
+        'seconds': round(seconds, 3),
+        'pages': pages,
+        'entries': entry_count,
+        'pages_per_sec': round(pages / seconds, 1) if seconds else None,
+        'entries_per_sec': round(entry_count / seconds, 1) if seconds else None,
+        'kib_sent': round(server.bytes_sent / 1024, 1),
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+def run_isolated(target, entries, **options):
+    """Run ``run_target`` in a new process so its peak RSS is measured on its own.
+
+    :returns: The result row from ``run_target``.
+    :rtype: dict
+    """
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(run_target, (target, entries), options)
+
+
+def print_results(results):
+    """Print result rows as an aligned table."""
+    print(f"{'target':<22} {'seconds':>8} {'pages':>6} {'entries':>8} "
+          f"{'pages/s':>9} {'entries/s':>10} {'KiB sent':>9} {'peak RSS KiB':>13}")
+    for row in results:
+        print(f"{row['target']:<22} {row['seconds']:>8} {row['pages']:>6} {row['entries']:>8} "
+              f"{row['pages_per_sec']!s:>9} {row['entries_per_sec']!s:>10} "
+              f"{row['kib_sent']:>9} {row['peak_rss_kb']!s:>13}")
+
+
+def main(argv=None):
+    """Parse arguments, run the selected benchmarks and report them.
+
+    :param argv: Command-line arguments; defaults to ``sys.argv[1:]``.
+    :type argv: list[str] or None
+    :returns: The result rows.
+    :rtype: list[dict]
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n', maxsplit=1)[0])
+    parser.add_argument('--corpus', help="Recorded pages: module_2's raw JSON or a page cache "
+                                         "directory. Synthetic entries are used otherwise.")
+    parser.add_argument('--entries', type=int, default=DEFAULT_ENTRIES,
+                        help="Number of synthetic entries to serve.")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="Seconds each response is delayed by.")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Fraction of listing requests answered with a 503.")
+    parser.add_argument('--shift-every', type=int, default=0,
+                        help="Insert a new entry at the top after this many requests.")
+    parser.add_argument('--target', action='append', choices=TARGETS,
+                        help="Benchmark only this target; may be repeated.")
+    parser.add_argument('--output', help="Also write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    entries = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.entries)
+    print(f"Serving {len(entries)} entries.")
+    results = [
+        run_isolated(target, entries, latency=args.latency, error_rate=args.error_rate,
+                     shift_every=args.shift_every)
+        for target in args.target or TARGETS
+    ]
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == '__main__':
+    main()
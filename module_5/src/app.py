@@ -11,7 +11,10 @@ from flask import Flask, render_template, jsonify, redirect, url_for
 import psycopg
 
 from . import query_data
+from .pipeline_files import CLEANED_OUTPUT_FILE, LLM_COMMAND, SCRAPE_OUTPUT_FILE
 from .scrape_and_clean import main as run_scrape_and_clean
+from .scrape_and_clean import METRICS_FILE as SCRAPE_METRICS_FILE
+from .scrape_metrics import load_summary
 from .load_new_data import main as run_data_loading
 
 app = Flask(__name__)
@@ -55,9 +58,10 @@ def run_full_pipeline():
 
             if new_entries_count > 0:
                 print("Step 2/3: Cleaning scraped data via subprocess...")
-                command_args = ["python", "src/llm_hosting/app.py",
-                                "--file", "new_structured_entries.json"]
-                subprocess.run(command_args, capture_output=True, text=True, check=True)
+                # The LLM prints the cleaned entries; they go where the loader reads them.
+                with open(CLEANED_OUTPUT_FILE, 'w', encoding='utf-8') as cleaned:
+                    subprocess.run([*LLM_COMMAND, SCRAPE_OUTPUT_FILE], stdout=cleaned,
+                                   stderr=subprocess.PIPE, text=True, check=True)
                 print("Cleaning complete.")
 
                 print("Step 3/3: Loading data into database...")
@@ -218,6 +222,23 @@ def status():
     """
     return jsonify({"PIPELINE_IN_PROGRESS": PIPELINE_IN_PROGRESS})
 
+@app.route("/scrape-metrics")
+def scrape_metrics():
+    """Return the metrics summary of the last scrape run.
+
+    The summary holds page and row counts, response statuses, retries, and
+    histograms of fetch latency, response size, parse time and rows per page,
+    as written by ``src.scrape_metrics.ScrapeMetrics.write``.
+
+    :returns: JSON response with the summary, or a 404 error if no scrape has
+        saved one yet.
+    :rtype: flask.Response
+    """
+    summary = load_summary(SCRAPE_METRICS_FILE)
+    if summary is None:
+        return jsonify({"error": "No scrape metrics have been recorded yet."}), 404
+    return jsonify(summary)
+
 
 if __name__ == "__main__":  # pragma: no cover
     app.run(debug=True)
@@ -0,0 +1,218 @@
+"""
+Module for bulk-inserting applicant records into the database.
+
+Inserting one row per ``execute`` costs one round trip to the server per
+row, which dominates an initial load of tens of thousands of entries.
+``copy_insert`` streams the records into a temporary staging table with
+``COPY`` and merges them into ``applicants`` with one set-based
+``INSERT ... SELECT ... ON CONFLICT (pid) DO NOTHING``, so a load costs a
+handful of round trips whatever its size.
+
+The merge keeps the per-row semantics: an entry whose PID is already stored is
+skipped, the first of several entries with the same PID wins, and the count
+returned is exactly the number of rows inserted.
+
+For the tens or hundreds of rows of a typical pull, creating and dropping the
+staging table costs more than it saves. ``batch_insert`` sends the plain
+``INSERT`` for every record through one ``executemany``, which psycopg runs in
+pipeline mode without waiting on each row, and counts the ``RETURNING pid``
+rows that come back. ``insert_records`` picks between the two by row count.
+
+``load_chunks`` feeds ``insert_records`` fixed-size chunks taken from any
+iterable of records, so a loader can parse its file lazily: memory stays
+bounded by the chunk size and the first rows are inserted while the rest of
+the file is still unread.
+
+With ``update_changed`` every one of these paths upserts instead: a stored
+row is overwritten when its ``content_hash`` differs from the record's, and
+counted only then, so the re-crawl loader shares the same batching.
+"""
+from itertools import islice
+
+from psycopg import sql
+
+# Columns filled from ``ApplicantRecord.db_params``, in the same order.
+APPLICANT_COLUMNS = (
+    'pid', 'program', 'comments', 'date_added', 'url', 'status', 'term',
+    'us_or_international', 'gpa', 'gre', 'gre_v', 'gre_aw', 'degree',
+    'llm_generated_program', 'llm_generated_university', 'content_hash',
+)
+STAGING_TABLE = 'applicants_staging'
+# Loads of at least this many rows go through COPY; smaller ones are batched.
+COPY_THRESHOLD = 1000
+# Records read, held and inserted at a time by ``load_chunks``.
+CHUNK_SIZE = 5000
+
+_columns = sql.SQL(', ').join(sql.Identifier(name) for name in APPLICANT_COLUMNS)
+_staging = sql.Identifier(STAGING_TABLE)
+
+# Conflict action of a plain load: a stored PID is left as it is.
+_skip_stored = sql.SQL("DO NOTHING")
+# Conflict action of an upsert: a stored row is rewritten only if its content changed.
+_update_changed = sql.SQL(
+    "DO UPDATE SET {assignments} WHERE {table}.{hash} IS DISTINCT FROM EXCLUDED.{hash}"
+).format(
+    assignments=sql.SQL(', ').join(
+        sql.SQL("{column} = EXCLUDED.{column}").format(column=sql.Identifier(name))
+        for name in APPLICANT_COLUMNS if name != 'pid'
+    ),
+    table=sql.Identifier('applicants'), hash=sql.Identifier('content_hash'),
+)
+
+# Drops a staging table left behind by an earlier failed load on this session.
+drop_staging_query = sql.SQL("DROP TABLE IF EXISTS {schema}.{staging};").format(
+    schema=sql.Identifier('pg_temp'), staging=_staging)
+
+# Same columns and types as applicants, plus each record's position in the load.
+create_staging_query = sql.SQL(
+    "CREATE TEMP TABLE {staging} (LIKE {table}, {seq} BIGINT);"
+).format(staging=_staging, table=sql.Identifier('applicants'), seq=sql.Identifier('seq'))
+
+copy_staging_query = sql.SQL("COPY {staging} ({seq}, {columns}) FROM STDIN;").format(
+    staging=_staging, seq=sql.Identifier('seq'), columns=_columns)
+
+# DISTINCT ON keeps the first record for each PID, as row-by-row inserts would.
+_merge_staging = sql.SQL("""
+    INSERT INTO {table} ({columns})
+    SELECT DISTINCT ON ({pid}) {columns}
+    FROM {staging}
+    ORDER BY {pid}, {seq}
+    ON CONFLICT ({pid}) {action};
+""")
+merge_staging_query, upsert_staging_query = (
+    _merge_staging.format(table=sql.Identifier('applicants'), columns=_columns,
+                          staging=_staging, pid=sql.Identifier('pid'),
+                          seq=sql.Identifier('seq'), action=action)
+    for action in (_skip_stored, _update_changed)
+)
+
+drop_created_staging_query = sql.SQL("DROP TABLE {staging};").format(staging=_staging)
+
+# Returns the PID only when the row was written, not when it was left as it was.
+_insert_returning = sql.SQL("""
+    INSERT INTO {table} ({columns})
+    VALUES ({placeholders})
+    ON CONFLICT ({pid}) {action}
+    RETURNING {pid};
+""")
+insert_returning_query, upsert_returning_query = (
+    _insert_returning.format(
+        table=sql.Identifier('applicants'), columns=_columns,
+        placeholders=sql.SQL(', ').join(sql.Placeholder() * len(APPLICANT_COLUMNS)),
+        pid=sql.Identifier('pid'), action=action)
+    for action in (_skip_stored, _update_changed)
+)
+
+
+def copy_insert(cur, records, update_changed=False):
+    """Insert records through a ``COPY``-filled staging table, skipping stored PIDs.
+
+    :param cur: Cursor on the connection to load through; the caller commits.
+    :type cur: psycopg.Cursor
+    :param records: Records to insert, in file order.
+    :type records: iterable[src.applicant_record.ApplicantRecord]
+    :param update_changed: Overwrite stored rows whose content hash differs.
+    :type update_changed: bool
+    :returns: Number of rows inserted, or inserted and updated.
+    :rtype: int
+    """
+    cur.execute(drop_staging_query)
+    cur.execute(create_staging_query)
+    with cur.copy(copy_staging_query) as copy:
+        for seq, record in enumerate(records):
+            copy.write_row((seq, *record.db_params()))
+    cur.execute(upsert_staging_query if update_changed else merge_staging_query)
+    inserted = cur.rowcount
+    cur.execute(drop_created_staging_query)
+    return inserted
+
+
+def batch_insert(cur, records, update_changed=False):
+    """Insert records with one pipelined ``executemany``, skipping stored PIDs.
+
+    :param cur: Cursor on the connection to load through; the caller commits.
+    :type cur: psycopg.Cursor
+    :param records: Records to insert, in file order.
+    :type records: iterable[src.applicant_record.ApplicantRecord]
+    :param update_changed: Overwrite stored rows whose content hash differs.
+    :type update_changed: bool
+    :returns: Number of rows inserted, or inserted and updated.
+    :rtype: int
+    """
+    query = upsert_returning_query if update_changed else insert_returning_query
+    cur.executemany(query, (record.db_params() for record in records), returning=True)
+    # One result per record; it holds the PID only if the row was written.
+    inserted = 0
+    while True:
+        if cur.fetchone() is not None:
+            inserted += 1
+        if not cur.nextset():
+            return inserted
+
+
+def insert_records(cur, records, copy_threshold=COPY_THRESHOLD, update_changed=False):
+    """Insert records the cheapest way for their number, skipping stored PIDs.
+
+    :param cur: Cursor on the connection to load through; the caller commits.
+    :type cur: psycopg.Cursor
+    :param records: Records to insert, in file order.
+    :type records: list[src.applicant_record.ApplicantRecord]
+    :param copy_threshold: Row count from which ``copy_insert`` is used
+        instead of ``batch_insert``.
+    :type copy_threshold: int
+    :param update_changed: Overwrite stored rows whose content hash differs.
+    :type update_changed: bool
+    :returns: Number of rows inserted, or inserted and updated.
+    :rtype: int
+    """
+    if not records:
+        return 0
+    if len(records) >= copy_threshold:
+        return copy_insert(cur, records, update_changed)
+    return batch_insert(cur, records, update_changed)
+
+
+def iter_chunks(records, chunk_size=CHUNK_SIZE):
+    """Group an iterable of records into lists of at most ``chunk_size``.
+
+    :param records: Records in file order; consumed lazily.
+    :type records: iterable[src.applicant_record.ApplicantRecord]
+    :param chunk_size: Largest number of records per chunk.
+    :type chunk_size: int
+    :returns: Generator of non-empty chunks.
+    :rtype: collections.abc.Iterator[list[src.applicant_record.ApplicantRecord]]
+    """
+    iterator = iter(records)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def load_chunks(conn, records, chunk_size=CHUNK_SIZE, commit_each_chunk=False,
+                update_changed=False):
+    """Insert a stream of records chunk by chunk, skipping stored PIDs.
+
+    Only one chunk is held at a time. Without ``commit_each_chunk`` the caller
+    commits, so an error partway through leaves nothing loaded; with it, every
+    chunk inserted before the error stays committed.
+
+    :param conn: Connection to load through.
+    :type conn: psycopg.Connection
+    :param records: Records in file order; consumed lazily.
+    :type records: iterable[src.applicant_record.ApplicantRecord]
+    :param chunk_size: Number of records inserted at a time.
+    :type chunk_size: int
+    :param commit_each_chunk: Commit after every chunk.
+    :type commit_each_chunk: bool
+    :param update_changed: Overwrite stored rows whose content hash differs.
+    :type update_changed: bool
+    :returns: Tuple of (rows inserted, or inserted and updated, records read).
+    :rtype: tuple[int, int]
+    """
+    inserted = total = 0
+    for chunk in iter_chunks(records, chunk_size):
+        with conn.cursor() as cur:
+            inserted += insert_records(cur, chunk, update_changed=update_changed)
+        total += len(chunk)
+        if commit_each_chunk:
+            conn.commit()
+    return inserted, total
@@ -0,0 +1,182 @@
+"""
+Module for checkpointing long scrapes so they can resume after a crash.
+
+A checkpoint is two files. ``<path>.entries.jsonl`` holds the entries scraped
+so far, one JSON object per line, and is only ever appended to. ``<path>``
+holds a small JSON state record: the cutoff the scrape was started with, the
+last page whose entries are safely on disk, how many entry lines that covers,
+which pages were skipped after failing, the year context the next page's dates
+are inferred from, and whether the scrape finished. The
+state is replaced atomically *after* the entries it counts have been flushed,
+so a crash at any point leaves a state that describes a prefix of the entries
+file; anything past that prefix is discarded on resume.
+
+The cutoff a checkpoint belongs to is built once with ``cutoff_key`` and
+passed to ``load``, ``start`` and ``resume``.
+"""
+import json
+import os
+from datetime import date
+
+from .applicant_record import entry_to_json
+
+
+class ScrapeCheckpoint:
+    """Persisted progress of one scrape, keyed to its cutoff state.
+
+    :param path: Path of the state file; entries are kept next to it.
+    :type path: str
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries_path = f'{path}.entries.jsonl'
+        self._state = None
+
+    def load(self, cutoff):
+        """Return the saved progress if it belongs to the same scrape.
+
+        A checkpoint only applies to a scrape with the same cutoff date, the
+        same already-stored PIDs, the same PID watermark and the same page
+        limit; anything else starts over from page 1.
+
+        :param cutoff: Cutoff of the scrape being resumed, from ``cutoff_key``.
+        :type cutoff: dict
+        :returns: Dict with ``last_page``, ``stop_page``, ``done``, ``failed_pages``,
+            ``year_state`` and ``entries`` keys, or None if there is no usable checkpoint.
+        :rtype: dict or None
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('cutoff') != cutoff:
+            return None
+
+        entries = []
+        try:
+            with open(self.entries_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if len(entries) == state['entry_count']:
+                        break
+                    entries.append(json.loads(line))
+        except (OSError, ValueError):
+            return None
+        if len(entries) != state['entry_count']:
+            return None
+
+        # Drop anything written after the last saved state.
+        with open(self.entries_path, 'r+b') as f:
+            f.truncate(state['entries_bytes'])
+        return {
+            'last_page': state['last_page'],
+            'stop_page': state['stop_page'],
+            'done': state['done'],
+            'failed_pages': state['failed_pages'],
+            'year_state': state.get('year_state'),
+            'entries': entries,
+        }
+
+    def start(self, cutoff, stop_page):
+        """Discard any previous checkpoint and record the start of a new scrape.
+
+        :param cutoff: Cutoff of the scrape, from ``cutoff_key``.
+        :type cutoff: dict
+        :param stop_page: Last page the scrape will request.
+        :type stop_page: int
+        """
+        with open(self.entries_path, 'wb'):
+            pass
+        self._state = {
+            'cutoff': cutoff,
+            'stop_page': stop_page,
+            'last_page': 0,
+            'entry_count': 0,
+            'entries_bytes': 0,
+            'done': False,
+            'failed_pages': None,
+            'year_state': None,
+        }
+        self._write_state()
+
+    def resume(self, cutoff, progress):
+        """Continue recording into a checkpoint returned by ``load``.
+
+        :param cutoff: Cutoff of the scrape, from ``cutoff_key``.
+        :type cutoff: dict
+        :param progress: Progress returned by ``load``.
+        :type progress: dict
+        """
+        self._state = {
+            'cutoff': cutoff,
+            'stop_page': progress['stop_page'],
+            'last_page': progress['last_page'],
+            'entry_count': len(progress['entries']),
+            'entries_bytes': os.path.getsize(self.entries_path),
+            'done': progress['done'],
+            'failed_pages': progress['failed_pages'],
+            'year_state': progress['year_state'],
+        }
+
+    # Everything after the entries is keyword-only state that is saved alongside them.
+    # pylint: disable-next=too-many-arguments
+    def record(self, last_page, entries, *, done=False, failed_pages=None, year_state=None):
+        """Append newly scraped entries and mark ``last_page`` as completed.
+
+        :param last_page: Last page whose entries are included.
+        :type last_page: int
+        :param entries: Entries scraped since the previous call.
+        :type entries: list[src.applicant_record.ApplicantRecord or dict]
+        :param done: Whether the scrape has finished.
+        :type done: bool
+        :param failed_pages: Pages skipped so far because they could not be
+            fetched, from ``FailedPages.state``.
+        :type failed_pages: dict or None
+        :param year_state: Year context after ``last_page``, from ``YearInferrer.state``.
+        :type year_state: dict or None
+        """
+        if entries:
+            with open(self.entries_path, 'ab') as f:
+                for entry in entries:
+                    f.write(entry_to_json(entry).encode('utf-8') + b'\n')
+                f.flush()
+                os.fsync(f.fileno())
+                self._state['entries_bytes'] = f.tell()
+        self._state['last_page'] = last_page
+        self._state['entry_count'] += len(entries)
+        self._state['done'] = done
+        self._state['failed_pages'] = failed_pages
+        self._state['year_state'] = year_state
+        self._write_state()
+
+    def _write_state(self):
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def cutoff_key(latest_db_date, pids_on_latest_date, page_limit, pid_watermark=None):
+    """Describe the scrape a checkpoint belongs to in a JSON-comparable form.
+
+    :param latest_db_date: Cutoff date of the scrape.
+    :type latest_db_date: datetime.date or None
+    :param pids_on_latest_date: PIDs already stored on the cutoff date.
+    :type pids_on_latest_date: set[int]
+    :param page_limit: Page limit of the scrape.
+    :type page_limit: int
+    :param pid_watermark: Highest stored PID, when deduplicating with a ``PidIndex``.
+    :type pid_watermark: int or None
+    :rtype: dict
+    """
+    key = {
+        'latest_db_date': latest_db_date.isoformat() if isinstance(latest_db_date, date) else None,
+        'pids_on_latest_date': sorted(pids_on_latest_date),
+        'page_limit': page_limit,
+    }
+    if pid_watermark is not None:
+        key['pid_watermark'] = pid_watermark
+    return key
@@ -0,0 +1,95 @@
+"""
+Module for locating the page where an incremental scrape can stop.
+
+Listing pages are ordered newest first, so the first page holding an entry
+older than the newest stored date is the last page an incremental scrape
+needs. ``find_cutoff_page`` finds it with a handful of probe requests, so the
+whole range up to it can be fetched in parallel instead of being discovered
+one page at a time. Only the page number is kept: the walk fetches every
+page again, since the listing may have moved on while the probe ran.
+"""
+from datetime import datetime
+
+from .date_utils import YearInferrer
+from .row_extractor import listing_rows
+
+
+def oldest_entry_date(page_data):
+    """Return the date of the oldest entry on a listing page.
+
+    :param page_data: Raw HTML of the listing page.
+    :type page_data: bytes or str
+    :returns: Date of the last dated entry row, or None if the page has no entries.
+    :rtype: datetime.date or None
+    """
+    rows = listing_rows(page_data)
+    date_strings = [row['cells'][2]['text'] for row in rows or () if row['td_count'] > 1]
+    if not date_strings:
+        return None
+
+    dates = [d for d in YearInferrer().infer_page(date_strings) if d]
+    if not dates:
+        return None
+    return datetime.strptime(dates[-1], '%Y-%m-%d').date()
+
+
+def find_cutoff_page(fetcher, latest_db_date, page_limit):
+    """Locate the first page that reaches back past ``latest_db_date``.
+
+    Listing pages are ordered newest first, so "the oldest entry on page N is
+    older than the cutoff" holds for every page from the cutoff page onward.
+    Pages 1, 2, 4, 8, ... are probed until one crosses the cutoff (or the
+    listing runs out), and the gap to the previous probe is then bisected.
+    This needs about 2*log2(N) requests instead of walking N pages in turn.
+
+    If a probe cannot be fetched, probing is abandoned and the full
+    ``page_limit`` range is returned so the normal walk decides where to stop.
+
+    Probed pages are not consecutive, so each is dated on its own rather than
+    with the walk's year context. A page whose dates carry no year is then
+    counted back from today, which can only make it look newer than it is,
+    so the returned page is never before the real cutoff page. The walk,
+    which dates every page in context, stops at the real one.
+
+    :param fetcher: Page fetcher used for the probe requests.
+    :type fetcher: src.page_fetcher.PageFetcher
+    :param latest_db_date: Most recent date in the database.
+    :type latest_db_date: datetime.date
+    :param page_limit: Highest page number that may be scraped.
+    :type page_limit: int
+    :returns: The last page to scrape.
+    :rtype: int
+    """
+    def crosses_cutoff(page_num):
+        page_data = fetcher.fetch(page_num)
+        if page_data is None:
+            return None
+        oldest = oldest_entry_date(page_data)
+        return oldest is None or oldest < latest_db_date
+
+    # Exponential phase: newest_page is the last page known to be entirely newer.
+    newest_page, page_num = 0, 1
+    while True:
+        crossed = crosses_cutoff(page_num)
+        if crossed is None:
+            return page_limit
+        if crossed:
+            break
+        newest_page = page_num
+        if page_num >= page_limit:
+            return page_limit
+        page_num = min(page_num * 2, page_limit)
+
+    # Bisection phase: the cutoff page lies in (newest_page, page_num].
+    while page_num - newest_page > 1:
+        middle = (newest_page + page_num) // 2
+        crossed = crosses_cutoff(middle)
+        if crossed is None:
+            return page_limit
+        if crossed:
+            page_num = middle
+        else:
+            newest_page = middle
+
+    print(f"Probe found the cutoff date ({latest_db_date}) on page {page_num}.")
+    return page_num
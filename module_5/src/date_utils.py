@@ -4,8 +4,106 @@ Module for date-related utility functions used in data scraping.
 This module provides functions for handling date strings that may be missing
 year information, particularly useful when processing scraped data that has
 inconsistent date formats.
+
+Every listing row carries a date, but a page holds only a handful of distinct
+ones, so parsed strings are memoized. A string is first classified by shape
+("23 Sep", "23 Sep 25", "23 Sep 2025" or "September 23, 2025") and its month
+looked up in a table, without trying formats one by one. Only strings of no
+known shape, or whose parts do not form a real date, go through
+``datetime.strptime``. That is the reference behavior, so the results are the
+same either way.
 """
+import calendar
 from datetime import datetime
+from functools import lru_cache
+
+# Formats ``infer_years`` accepts, tried in this order.
+FORMATS_WITH_YEAR = ('%d %b %y', '%d %b %Y', '%B %d, %Y')
+FORMAT_NO_YEAR = '%d %b'
+# Formats ``format_decision_date`` accepts before falling back to the reference year.
+DECISION_FORMATS = ('%d %b %y', '%d %b %Y')
+# Distinct strings remembered by each memoized parser.
+DATE_CACHE_SIZE = 4096
+
+# Lowercase month names, as matched by %b and %B, mapped to month numbers.
+MONTH_ABBRS = {name.lower(): number for number, name in enumerate(calendar.month_abbr) if name}
+MONTH_NAMES = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+
+# String shapes recognized by ``classify_date``.
+SHAPE_DAY_MONTH = 'day_month'
+SHAPE_DAY_MONTH_YEAR = 'day_month_year'
+SHAPE_MONTH_DAY_YEAR = 'month_day_year'
+
+
+def classify_date(date_str):
+    """Classify a date string by shape and split it into its numeric parts.
+
+    Only single-space ASCII strings are recognized, with a one- or two-digit
+    day from 1 to 31 and a month name ``strptime`` would accept. Anything else
+    returns None and is left to ``strptime``. Two-digit years are mapped the
+    way ``%y`` maps them: 69-99 to the 1900s and 00-68 to the 2000s.
+
+    :param date_str: Date string such as "23 Sep", "23 Sep 25", "23 Sep 2025"
+        or "September 23, 2025".
+    :type date_str: str
+    :returns: Tuple of (shape, year, month, day), where shape is one of the
+        ``SHAPE_*`` constants and year is None for ``SHAPE_DAY_MONTH``, or
+        None if the string has no known shape.
+    :rtype: tuple[str, int or None, int, int] or None
+    """
+    if not date_str.isascii():
+        return None
+    parts = date_str.split(' ')
+    if len(parts) == 3 and parts[1].endswith(','):
+        shape, day_text, year_text = SHAPE_MONTH_DAY_YEAR, parts[1][:-1], parts[2]
+        month = MONTH_NAMES.get(parts[0].lower())
+        year_ok = len(year_text) == 4
+    elif len(parts) in (2, 3):
+        day_text, month = parts[0], MONTH_ABBRS.get(parts[1].lower())
+        if len(parts) == 2:
+            shape, year_text, year_ok = SHAPE_DAY_MONTH, None, True
+        else:
+            shape, year_text = SHAPE_DAY_MONTH_YEAR, parts[2]
+            year_ok = len(year_text) in (2, 4)
+    else:
+        return None
+
+    if (month is None or not year_ok or len(day_text) > 2 or not day_text.isdigit()
+            or not (year_text is None or year_text.isdigit())):
+        return None
+    day = int(day_text)
+    if not 1 <= day <= 31:
+        return None
+
+    year = None
+    if year_text is not None:
+        year = int(year_text)
+        if len(year_text) == 2:
+            year += 2000 if year <= 68 else 1900
+    return shape, year, month, day
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_text(date_str):
+    """Parse a date string for ``infer_years``, memoized.
+
+    :param date_str: Date string to parse.
+    :type date_str: str
+    :returns: Tuple of (date, inferred) as in ``_parse_single_date``.
+    :rtype: tuple[datetime.datetime or None, bool]
+    """
+    parts = classify_date(date_str)
+    if parts is not None:
+        shape, year, month, day = parts
+        try:
+            if shape == SHAPE_DAY_MONTH:
+                # Checked against a leap year, as the reference does, then moved to 1900.
+                return datetime(2000, month, day).replace(year=1900), True
+            return datetime(year, month, day), False
+        except ValueError:
+            pass
+    parsed = _parse_single_date(date_str, FORMATS_WITH_YEAR, FORMAT_NO_YEAR)
+    return parsed['date'], parsed['inferred']
 
 
 def _parse_single_date(date_str, formats_with_year, format_no_year):
@@ -34,6 +132,29 @@ def _parse_single_date(date_str, formats_with_year, format_no_year):
         return {'date': None, 'inferred': False}
 
 
+def _date_and_inferred(date_str):
+    """Parse a single date string, detecting if it has a year or not.
+
+    :param date_str: Date string to parse
+    :returns: Tuple of (date, inferred), where inferred is True for a date with
+        no year of its own (placed in 1900)
+    """
+    if isinstance(date_str, str):
+        return _parse_date_text(date_str)
+    parsed = _parse_single_date(date_str, FORMATS_WITH_YEAR, FORMAT_NO_YEAR)
+    return parsed['date'], parsed['inferred']
+
+
+def _parse_date(date_str):
+    """Parse a single date string for ``infer_years``, detecting if it has a year or not.
+
+    :param date_str: Date string to parse
+    :returns: Dict with 'date' and 'inferred' keys
+    """
+    parsed, inferred = _date_and_inferred(date_str)
+    return {'date': parsed, 'inferred': inferred}
+
+
 def _forward_pass_years(parsed_dates):
     """Propagate years forward through the date list.
     
@@ -123,14 +244,8 @@ def infer_years(date_strings: list[str]) -> list[str]:
     :returns: List of standardized date strings in YYYY-MM-DD format, with inferred years.
     :rtype: list[str]
     """
-    formats_with_year = ['%d %b %y', '%d %b %Y', '%B %d, %Y']
-    format_no_year = '%d %b'
-
     # Parse all dates
-    parsed_dates = [
-        _parse_single_date(s, formats_with_year, format_no_year)
-        for s in date_strings
-    ]
+    parsed_dates = [_parse_date(s) for s in date_strings]
 
     # Propagate years in both directions
     _forward_pass_years(parsed_dates)
@@ -140,6 +255,170 @@ def infer_years(date_strings: list[str]) -> list[str]:
     return _format_results(parsed_dates)
 
 
+class YearInferrer:
+    """Infer missing years over a stream of date strings that spans several pages.
+
+    The listing is ordered newest first, so every date in the stream is on or
+    before the one above it. A ``YearInferrer`` keeps the last known year and
+    the previous date between calls, so a scraper that feeds it page after
+    page resolves the year-less dates at the top of a page from the page
+    before, as if the whole listing were one list.
+
+    A year-less date takes the last known year, moved one year back when it
+    would fall after the date just above it. Year-less dates seen before the
+    first date with a year must wait; they are buffered and resolved upward
+    from that date, moving one year on when a date would fall before the one
+    below it. No inferred date is placed after ``today``; one that would be
+    is moved back a year.
+
+    :param today: Latest date an inferred date may take; defaults to the
+        current date.
+    :type today: datetime.date or None
+    """
+
+    def __init__(self, today=None):
+        self._today = today or datetime.now().date()
+        self._year = None
+        self._previous = None
+        self._pending = []
+
+    def push(self, date_str):
+        """Consume the next date string of the stream.
+
+        :param date_str: Date string that may be missing its year.
+        :type date_str: str
+        :returns: The dates resolved by this string, in stream order, in
+            YYYY-MM-DD format (None for unparseable strings). This is empty
+            while year-less dates wait for a year, and includes the waiting
+            ones once it arrives.
+        :rtype: list[str or None]
+        """
+        parsed, inferred = _date_and_inferred(date_str)
+        if self._year is None:
+            if parsed is None or inferred:
+                self._pending.append(parsed)
+                return []
+            resolved = self._resolve_pending(parsed)
+            resolved.append(parsed)
+        else:
+            if parsed is not None and inferred:
+                parsed = self._on_or_before(parsed, self._year, self._previous)
+            resolved = [parsed]
+
+        if parsed is not None:
+            self._year, self._previous = parsed.year, parsed
+        return [_iso_date(d) for d in resolved]
+
+    def flush(self):
+        """Resolve the dates still waiting for a year, counting back from today.
+
+        The inferrer keeps no year from this, so a later date with a year is
+        still the first one it knows.
+
+        :returns: The waiting dates in YYYY-MM-DD format (None for unparseable strings).
+        :rtype: list[str or None]
+        """
+        year, newer = self._today.year, datetime.combine(self._today, datetime.min.time())
+        resolved = []
+        for parsed in self._pending:
+            if parsed is not None:
+                parsed = newer = self._on_or_before(parsed, year, newer)
+                year = parsed.year
+            resolved.append(_iso_date(parsed))
+        self._pending = []
+        return resolved
+
+    def infer_page(self, date_strings):
+        """Resolve every date of one page, carrying year context from earlier pages.
+
+        :param date_strings: The page's date strings, in listing order.
+        :type date_strings: list[str]
+        :returns: One YYYY-MM-DD string (or None) per input string.
+        :rtype: list[str or None]
+        """
+        results = []
+        for date_str in date_strings:
+            results.extend(self.push(date_str))
+        results.extend(self.flush())
+        return results
+
+    def state(self):
+        """Return the year context carried into the next page, for saving.
+
+        Taken between pages, when no date is waiting for a year, this is all
+        an inferrer needs to continue the stream; see ``restore``.
+
+        :returns: JSON-serializable dict with the last known ``year`` and the
+            ``previous`` date in YYYY-MM-DD format.
+        :rtype: dict
+        """
+        return {'year': self._year, 'previous': _iso_date(self._previous)}
+
+    def restore(self, state):
+        """Continue the stream from a context returned by ``state``.
+
+        :param state: Saved year context; None leaves the inferrer fresh.
+        :type state: dict or None
+        """
+        self._pending = []
+        if not state:
+            self._year, self._previous = None, None
+            return
+        self._year = state['year']
+        self._previous = state['previous'] and datetime.strptime(state['previous'], '%Y-%m-%d')
+
+    def _on_or_before(self, parsed, year, newer):
+        """Give a year-less date ``year``, or the year before if it would pass ``newer``.
+
+        :param parsed: Year-less date, placed in 1900.
+        :type parsed: datetime.datetime
+        :param year: Year of the date above it in the stream.
+        :type year: int
+        :param newer: The date above it, or None.
+        :type newer: datetime.datetime or None
+        :rtype: datetime.datetime
+        """
+        dated = parsed.replace(year=year)
+        if newer is not None and dated > newer:
+            dated = parsed.replace(year=year - 1)
+        return self._not_after_today(dated)
+
+    def _not_after_today(self, dated):
+        """Move an inferred date that lies in the future back to its latest past year."""
+        if dated.date() <= self._today:
+            return dated
+        year = self._today.year
+        if dated.replace(year=year).date() > self._today:
+            year -= 1
+        return dated.replace(year=year)
+
+    def _resolve_pending(self, anchor):
+        """Resolve the buffered year-less dates upward from the first dated entry.
+
+        :param anchor: The first date in the stream that has its own year.
+        :type anchor: datetime.datetime
+        :returns: The buffered dates with their years, in stream order.
+        :rtype: list[datetime.datetime or None]
+        """
+        resolved = self._pending
+        self._pending = []
+        year, older = anchor.year, anchor
+        for i in range(len(resolved) - 1, -1, -1):
+            parsed = resolved[i]
+            if parsed is not None:
+                dated = parsed.replace(year=year)
+                if dated < older:
+                    dated = parsed.replace(year=year + 1)
+                parsed = older = resolved[i] = self._not_after_today(dated)
+                year = parsed.year
+        return resolved
+
+
+def _iso_date(parsed):
+    """Format a resolved date as YYYY-MM-DD, passing None through."""
+    return parsed.strftime('%Y-%m-%d') if parsed is not None else None
+
+
 def format_decision_date(date_str, reference_year):
     """Format decision date string into standardized YYYY-MM-DD format.
 
@@ -157,10 +436,47 @@ def format_decision_date(date_str, reference_year):
     """
     if not date_str or not reference_year:
         return None
+    if isinstance(date_str, str) and isinstance(reference_year, int):
+        return _decision_date_text(date_str, reference_year)
+    return _strptime_decision_date(date_str, reference_year)
 
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _decision_date_text(date_str, reference_year):
+    """Format a decision date string for ``format_decision_date``, memoized.
+
+    :param date_str: Non-empty date string, possibly missing its year.
+    :type date_str: str
+    :param reference_year: Year used when the string has none.
+    :type reference_year: int
+    :returns: Date in YYYY-MM-DD format, or None if parsing fails.
+    :rtype: str or None
+    """
+    parts = classify_date(date_str)
+    if parts is not None and parts[0] != SHAPE_MONTH_DAY_YEAR and 1000 <= reference_year <= 9999:
+        shape, year, month, day = parts
+        try:
+            return datetime(reference_year if shape == SHAPE_DAY_MONTH else year,
+                            month, day).strftime('%Y-%m-%d')
+        except ValueError:
+            pass
+    return _strptime_decision_date(date_str, reference_year)
+
+
+def _strptime_decision_date(date_str, reference_year):
+    """Format a decision date by trying each format with ``strptime``.
+
+    This is the reference behavior of ``format_decision_date``.
+
+    :param date_str: Non-empty date string, possibly missing its year.
+    :type date_str: str
+    :param reference_year: Year used when the string has none.
+    :type reference_year: int
+    :returns: Date in YYYY-MM-DD format, or None if parsing fails.
+    :rtype: str or None
+    """
     # First, try formats that might already include a year
-    formats_to_try = ['%d %b %y', '%d %b %Y']
-    for fmt in formats_to_try:
+    for fmt in DECISION_FORMATS:
         try:
             return datetime.strptime(date_str, fmt).strftime('%Y-%m-%d')
         except ValueError:
@@ -0,0 +1,57 @@
+"""
+Module for streaming scraped entries to a JSON Lines file.
+
+Entries are written one JSON object per line as each page is parsed, so the
+scraper never holds the whole result set in memory and a file cut short by a
+crash still contains every completed page. Paths ending in ``.gz`` are written
+gzip-compressed; each batch is flushed with a sync flush so a truncated
+archive can still be read up to the last completed page.
+"""
+import gzip
+
+from .applicant_record import entry_to_json
+
+
+class EntryWriter:
+    """Append entries to a JSON Lines file, opening it on the first write.
+
+    A scrape that finds nothing therefore leaves no file behind.
+
+    :param path: Output path; a ``.gz`` suffix enables gzip compression.
+    :type path: str
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, entries):
+        """Write a batch of entries and flush them to disk.
+
+        :param entries: Entries to append, typically one page's worth.
+        :type entries: list[src.applicant_record.ApplicantRecord or dict]
+        """
+        if not entries:
+            return
+        if self._file is None:
+            if self.path.endswith('.gz'):
+                self._file = gzip.open(self.path, 'wt', encoding='utf-8')
+            else:
+                self._file = open(self.path, 'w', encoding='utf-8')  # pylint: disable=consider-using-with
+        for entry in entries:
+            self._file.write(entry_to_json(entry) + '\n')
+        self._file.flush()
+        self.count += len(entries)
+
+    def close(self):
+        """Close the output file if it was opened."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,119 @@
+"""
+Module for recording the pages a scrape could not fetch.
+
+A page that still fails after its retries is skipped, and several failures
+in a row end the walk, leaving every page from there to the cutoff
+unwalked. ``FailedPages`` records both: the numbers of the skipped pages
+and the page the walk gave up at. Page numbers drift as new entries are
+posted, so each gap also keeps the date and PID of the last entry collected
+before it. A later pass starts the year context of a continued walk from
+that date, and drops rows at or above the bound, which the run already has.
+"""
+
+
+class FailedPages:
+    """Pages a scrape skipped, and where it gave up, with the bound of each gap.
+
+    :param pages: Numbers of pages skipped after failing.
+    :type pages: list[int] or None
+    :param gave_up_at: First page of the failures in a row that ended the
+        walk; every page from there to the cutoff is missing.
+    :type gave_up_at: int or None
+    :param bounds: Bound of each gap from ``entry_bound``, keyed by the gap's
+        first page.
+    :type bounds: dict[int, dict or None] or None
+    """
+
+    def __init__(self, pages=None, gave_up_at=None, bounds=None):
+        self.pages = list(pages or [])
+        self.gave_up_at = gave_up_at
+        self.bounds = dict(bounds or {})
+
+    def __bool__(self):
+        return bool(self.pages) or self.gave_up_at is not None
+
+    def __repr__(self):
+        return f"FailedPages(pages={self.pages!r}, gave_up_at={self.gave_up_at!r})"
+
+    def add(self, page_num, bound=None):
+        """Record a page that was skipped after failing.
+
+        :param page_num: Number of the skipped page.
+        :type page_num: int
+        :param bound: Bound of the last entry collected before it.
+        :type bound: dict or None
+        """
+        self.pages.append(page_num)
+        self.bounds[page_num] = bound
+
+    def give_up(self, first_page, bound=None):
+        """Record that the walk ended after failures from ``first_page`` on.
+
+        Those pages are no longer listed as skipped, since the unwalked range
+        that starts at ``first_page`` covers them.
+
+        :param first_page: First page of the failures in a row.
+        :type first_page: int
+        :param bound: Bound of the last entry collected before it.
+        :type bound: dict or None
+        """
+        for page_num in [p for p in self.pages if p >= first_page]:
+            self.pages.remove(page_num)
+            self.bounds.pop(page_num, None)
+        self.gave_up_at = first_page
+        self.bounds[first_page] = bound
+
+    def missing(self, first_page, entries):
+        """Keep the entries of a gap that the run does not have yet.
+
+        The listing is newest first and PIDs only grow, so an entry at or
+        above the gap's bound in both date and PID was collected before it.
+
+        :param first_page: First page of the gap the entries were fetched for.
+        :type first_page: int
+        :param entries: Entries scraped for the gap.
+        :type entries: list[src.applicant_record.ApplicantRecord]
+        :rtype: list[src.applicant_record.ApplicantRecord]
+        """
+        bound = self.bounds.get(first_page)
+        if not bound:
+            return entries
+        return [entry for entry in entries
+                if entry.pid < bound['pid'] or entry.date_added < bound['date_added']]
+
+    def state(self):
+        """Return the recorded gaps as a JSON-serializable dict; see ``restore``.
+
+        :rtype: dict
+        """
+        return {
+            'pages': sorted(self.pages),
+            'gave_up_at': self.gave_up_at,
+            'bounds': {str(page_num): bound for page_num, bound in self.bounds.items()},
+        }
+
+    def restore(self, state):
+        """Replace the recorded gaps with ones returned by ``state``.
+
+        :param state: Saved gaps; None clears them.
+        :type state: dict or None
+        """
+        state = state or {}
+        self.pages = list(state.get('pages', []))
+        self.gave_up_at = state.get('gave_up_at')
+        self.bounds = {int(page_num): bound
+                       for page_num, bound in state.get('bounds', {}).items()}
+
+
+def entry_bound(entry):
+    """Describe where an entry sits in the listing, for ``FailedPages``.
+
+    :param entry: Last entry collected before a gap, or None.
+    :type entry: src.applicant_record.ApplicantRecord or dict or None
+    :returns: Dict with the entry's ``date_added`` (YYYY-MM-DD) and ``pid``,
+        or None without an entry.
+    :rtype: dict or None
+    """
+    if entry is None:
+        return None
+    return {'date_added': entry['date_added'], 'pid': entry['pid']}
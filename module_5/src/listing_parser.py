@@ -0,0 +1,354 @@
+"""
+Module for parsing listing pages into applicant entries.
+
+``parse_listing_page`` turns the row records of one listing page, as produced
+by ``row_extractor``, into ``ApplicantRecord`` objects, stopping at the scrape's
+cutoff and skipping entries that are already stored. It has no network or
+database access, so the scraper can run it in the scraping thread or on a
+process pool.
+"""
+import re
+import time
+from datetime import datetime
+from urllib.parse import urljoin
+
+from .applicant_record import ApplicantRecord
+from .date_utils import YearInferrer, format_decision_date
+from .row_extractor import listing_rows, row_from_tag, cell_from_tag
+
+BASE_URL = 'https://www.thegradcafe.com/'
+RESULT_HREF_PATTERN = re.compile(r'/result/\d+')
+# Entry fields read from the badges of a detail row, in ApplicantRecord order.
+BADGE_FIELDS = ('gpa', 'gre', 'gre_v', 'gre_aw', 'student_type', 'semester_and_year')
+
+
+def extract_rows_timed(page_data):
+    """Extract a page's row records and time it; the parse process pool runs this.
+
+    Only the HTML walk runs in the pool. Its rows are handed back to the
+    scraping thread, which infers their years with the scrape's shared
+    ``YearInferrer``, so pooled pages get the same dates as pages parsed inline.
+
+    :param page_data: Raw HTML of the listing page.
+    :type page_data: bytes or str
+    :returns: Tuple of (rows, seconds) where rows is None for a page without a
+        results table.
+    :rtype: tuple[list[dict] or None, float]
+    """
+    started = time.perf_counter()
+    rows = listing_rows(page_data)
+    return rows, time.perf_counter() - started
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def parse_page_timed(page_data, latest_db_date, pids_on_latest_date, pid_index=None,
+                     year_inferrer=None, extracted=None):
+    """Run ``parse_listing_page`` and time it, for the scrape metrics.
+
+    :param extracted: The page's rows and the seconds taken to extract them,
+        from ``extract_rows_timed`` in a parse worker; ``page_data`` is then
+        not read again.
+    :type extracted: tuple[list[dict] or None, float] or None
+    :returns: Tuple of (new_entries, keep_going, stats) where stats holds the
+        page's row counts and its parse time in ``seconds``.
+    :rtype: tuple[list[src.applicant_record.ApplicantRecord], bool, dict]
+    """
+    rows, seconds = extracted or extract_rows_timed(page_data)
+    stats = {}
+    started = time.perf_counter()
+    page_entries, keep_going = parse_listing_rows(rows, latest_db_date, pids_on_latest_date,
+                                                  pid_index, stats, year_inferrer)
+    stats['seconds'] = seconds + time.perf_counter() - started
+    return page_entries, keep_going, stats
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def parse_listing_page(page_data, latest_db_date, pids_on_latest_date, pid_index=None,
+                       stats=None, year_inferrer=None):
+    """Parse one listing page into new entries and decide whether to continue.
+
+    Rows are processed in page order. Parsing stops at the first row older than
+    ``latest_db_date``, and rows from that date whose PID is already stored are
+    skipped. With a ``pid_index``, rows whose PID is already stored are skipped
+    whatever their date, and parsing also stops at the first PID below the
+    index's window. Pages without a results table or without any entry rows
+    also end the scrape.
+
+    :param page_data: Raw HTML of the listing page.
+    :type page_data: bytes or str
+    :param latest_db_date: Most recent date in database; parsing stops at older entries.
+    :type latest_db_date: datetime.date or None
+    :param pids_on_latest_date: Set of PIDs already present on the latest database date.
+    :type pids_on_latest_date: set[int]
+    :param pid_index: Stored PIDs to skip, and the watermark to stop at.
+    :type pid_index: src.pid_index.PidIndex or None
+    :param stats: Dict that receives the page's entry row count (``rows``) and
+        how many were ``new``, skipped as ``duplicate`` or left out as
+        ``past_cutoff``, counting from the row the scrape stopped at.
+    :type stats: dict or None
+    :param year_inferrer: Year context carried over from the previous pages;
+        without it, years are inferred from this page alone.
+    :type year_inferrer: src.date_utils.YearInferrer or None
+    :returns: Tuple of (new_entries, keep_going) where keep_going is False once the
+        scrape should stop after this page.
+    :rtype: tuple[list[src.applicant_record.ApplicantRecord], bool]
+    """
+    return parse_listing_rows(listing_rows(page_data), latest_db_date, pids_on_latest_date,
+                              pid_index, stats, year_inferrer)
+
+
+# pylint: disable-next=too-many-locals,too-many-arguments,too-many-positional-arguments
+def parse_listing_rows(rows, latest_db_date, pids_on_latest_date, pid_index=None, stats=None,
+                       year_inferrer=None):
+    """Select the new entries of a page whose row records are already extracted.
+
+    This is ``parse_listing_page`` after the HTML walk; see there for the rules.
+
+    :param rows: The page's row records from ``row_extractor.listing_rows``, or
+        None for a page without a results table.
+    :type rows: list[dict] or None
+    :returns: Tuple of (new_entries, keep_going).
+    :rtype: tuple[list[src.applicant_record.ApplicantRecord], bool]
+    """
+    counts = {'rows': 0, 'new': 0, 'duplicate': 0, 'past_cutoff': 0}
+    if stats is not None:
+        stats.update(counts)
+        counts = stats
+    if rows is None:
+        print("Could not find the results table (tbody) on the page.")
+        return [], False
+
+    main_rows = [i for i, row in enumerate(rows) if row['td_count'] > 1]
+    counts['rows'] = len(main_rows)
+
+    if not main_rows:
+        print("No valid entry rows found on this page. Reached the end.")
+        return [], False
+
+    page_date_strings = [rows[i]['cells'][2]['text'] for i in main_rows]
+    corrected_dates = (year_inferrer or YearInferrer()).infer_page(page_date_strings)
+
+    new_entries = []
+    # Look at the dates to make sure we are only adding new data.
+    for position, (date_added_str, row_index) in enumerate(zip(corrected_dates, main_rows)):
+        current_entry_date = datetime.strptime(date_added_str, '%Y-%m-%d').date()
+
+        if latest_db_date and current_entry_date < latest_db_date:
+            print(f"Found entry from {current_entry_date}, which is older than "
+                  f"the cutoff date ({latest_db_date}). Stopping scrape.")
+            counts['past_cutoff'] = len(main_rows) - position
+            return new_entries, False
+
+        cells = rows[row_index]['cells']
+
+        href = next((h for h in cells[4]['hrefs'] if RESULT_HREF_PATTERN.search(h)), None)
+        url = urljoin(BASE_URL, href) if href else ''
+        pid_match = re.search(r'/(\d+)', url)
+        if not pid_match:
+            continue
+
+        pid = int(pid_match.group(1))
+
+        if pid_index is not None:
+            if pid_index.is_past(pid):
+                print(f"Found PID {pid}, which is well below the highest stored PID "
+                      f"({pid_index.watermark}). Stopping scrape.")
+                counts['past_cutoff'] = len(main_rows) - position
+                return new_entries, False
+            if pid in pid_index:
+                counts['duplicate'] += 1
+                continue
+
+        if current_entry_date == latest_db_date and pid in pids_on_latest_date:
+            counts['duplicate'] += 1
+            continue
+
+        # Process the entry
+        entry = process_listing_row(rows, row_index, pid, url, date_added_str)
+        new_entries.append(entry)
+        counts['new'] += 1
+
+    return new_entries, True
+
+def process_listing_row(rows, row_index, pid, url, date_added_str):
+    """Build the entry for a main row from the page's row records.
+
+    The row right after the main row holds the badges; if that row and the one
+    after it each have a single cell, the second one is the comment row.
+
+    :param rows: Row records for the whole page, as produced by ``row_extractor``.
+    :type rows: list[dict]
+    :param row_index: Index of the main row in ``rows``.
+    :type row_index: int
+    :param pid: Program ID
+    :param url: URL for the entry
+    :param date_added_str: Date string for when entry was added
+    :returns: The entry record
+    :rtype: src.applicant_record.ApplicantRecord
+    """
+    detail_row = rows[row_index + 1] if row_index + 1 < len(rows) else None
+    comment_row = None
+    if detail_row and detail_row['td_count'] == 1 and row_index + 2 < len(rows):
+        if rows[row_index + 2]['td_count'] == 1:
+            comment_row = rows[row_index + 2]
+    return build_entry(rows[row_index]['cells'], pid, url, date_added_str,
+                       detail_row, comment_row)
+
+def process_table_row(row, cells, pid, url, date_added_str):
+    """Process a single table row and extract entry data.
+
+    :param row: BeautifulSoup row element
+    :param cells: List of td cells from the row
+    :param pid: Program ID
+    :param url: URL for the entry
+    :param date_added_str: Date string for when entry was added
+    :returns: The entry record
+    :rtype: src.applicant_record.ApplicantRecord
+    """
+    # Find detail and comment rows
+    detail_row = row.find_next_sibling('tr')
+    comment_row = None
+    if detail_row and len(detail_row.find_all('td', recursive=False)) == 1:
+        comment_row_candidate = detail_row.find_next_sibling('tr')
+        if (comment_row_candidate and \
+            len(comment_row_candidate.find_all('td', recursive=False)) == 1):
+            comment_row = comment_row_candidate
+
+    return build_entry([cell_from_tag(cell) for cell in cells], pid, url, date_added_str,
+                       row_from_tag(detail_row), row_from_tag(comment_row))
+
+# Both row paths pass the main row's cells and the two follow-up rows separately.
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def build_entry(cells, pid, url, date_added_str, detail_row=None, comment_row=None):
+    """Build an entry record from the cell and row records of one applicant.
+
+    :param cells: Cell records of the main row (text, span texts and hrefs).
+    :type cells: list[dict]
+    :param pid: Program ID
+    :param url: URL for the entry
+    :param date_added_str: Date string for when entry was added
+    :param detail_row: Row record holding the badges, or None.
+    :type detail_row: dict or None
+    :param comment_row: Row record holding the comment paragraph, or None.
+    :type comment_row: dict or None
+    :returns: The entry, with the badge details filled in.
+    :rtype: src.applicant_record.ApplicantRecord
+    """
+    # Parse status and decision date
+    status, decision_date_str = parse_status_text(cells[3]['text'])
+
+    # Extract program information directly
+    spans = cells[1]['spans']
+
+    gpa, gre, gre_v, gre_aw, student_type, semester_and_year = badge_values(
+        detail_row['badges'] if detail_row else None)
+    return ApplicantRecord(
+        pid=pid,
+        university=cells[0]['text'],
+        program=spans[0] if spans else '',
+        degree=spans[-1] if len(spans) > 1 else '',
+        status=status,
+        date_added=date_added_str,
+        decision_date=format_decision_date(
+            decision_date_str,
+            int(date_added_str.split('-')[0]) if date_added_str else None
+        ),
+        url=url,
+        comments=comment_row['paragraph'] if comment_row else None,
+        gpa=gpa, gre=gre, gre_v=gre_v, gre_aw=gre_aw,
+        student_type=student_type, semester_and_year=semester_and_year,
+    )
+
+def parse_status_and_date(tag):
+    """Extract application status and decision date from HTML table cell.
+
+    This function parses the status/decision cell from the scraped HTML table,
+    extracting both the application status (Accepted, Rejected, Interview, etc.)
+    and the decision date if present. It uses text analysis and regex patterns
+    to identify these components from the formatted cell content.
+
+    :param tag: BeautifulSoup tag containing the status and date information.
+    :type tag: bs4.element.Tag
+    :returns: Tuple of (status_string, decision_date_string) where date may be None.
+    :rtype: tuple[str, str]
+    """
+    return parse_status_text(tag.get_text(strip=True))
+
+def parse_status_text(text):
+    """Extract application status and decision date from the status cell text.
+
+    :param text: Stripped text of the status/decision cell.
+    :type text: str
+    :returns: Tuple of (status_string, decision_date_string) where date may be None.
+    :rtype: tuple[str, str]
+    """
+    status, decision_date_str = 'Other', None
+    if 'Accepted' in text:
+        status = 'Accepted'
+    elif 'Rejected' in text:
+        status = 'Rejected'
+    elif 'Interview' in text:
+        status = 'Interview'
+    elif 'Wait listed' in text:
+        status = 'Wait listed'
+    date_match = re.search(r'on\s+(.*)', text, re.IGNORECASE)
+    if date_match:
+        decision_date_str = date_match.group(1).strip()
+    return status, decision_date_str
+
+def parse_details_from_badges(row):
+    """Extract applicant details (GPA, GRE scores, student type, etc.) from HTML badge elements.
+
+    This function parses the detail row that contains applicant information displayed
+    as badge elements (div tags with specific classes). It extracts numerical values
+    like GPA and GRE scores, as well as categorical information like student type
+    and semester/year information.
+
+    :param row: BeautifulSoup element containing the detail row with badge information.
+    :type row: bs4.element.Tag
+    :returns: Dictionary containing parsed applicant details with None for missing values.
+    :rtype: dict
+    """
+    return parse_badge_texts(row_from_tag(row)['badges'] if row else None)
+
+def parse_badge_texts(badge_texts):
+    """Extract applicant details from the text of each badge in a detail row.
+
+    :param badge_texts: Stripped text of every badge div, in page order, or None.
+    :type badge_texts: list[str] or None
+    :returns: Dictionary containing parsed applicant details with None for missing values.
+    :rtype: dict
+    """
+    return dict(zip(BADGE_FIELDS, badge_values(badge_texts)))
+
+def badge_values(badge_texts):
+    """Extract applicant details from badge texts without building a dict.
+
+    :param badge_texts: Stripped text of every badge div, in page order, or None.
+    :type badge_texts: list[str] or None
+    :returns: Values for ``BADGE_FIELDS``, with None for missing values.
+    :rtype: tuple
+    """
+    gpa = gre = gre_v = gre_aw = student_type = semester_and_year = None
+    for text in badge_texts or ():
+        if 'GPA' in text:
+            match = re.search(r'[\d\.]+', text)
+            if match:
+                gpa = float(match.group(0))
+        elif 'GRE V' in text:
+            match = re.search(r'[\d\.]+', text)
+            if match:
+                gre_v = int(match.group(0))
+        elif 'GRE AW' in text:
+            match = re.search(r'[\d\.]+', text)
+            if match:
+                gre_aw = float(match.group(0))
+        elif 'GRE' in text:
+            match = re.search(r'[\d\.]+', text)
+            if match:
+                gre = int(match.group(0))
+        elif text in ['International', 'American', 'Other URM']:
+            student_type = text
+        elif 'Fall' in text or 'Spring' in text:
+            semester_and_year = text
+    return gpa, gre, gre_v, gre_aw, student_type, semester_and_year
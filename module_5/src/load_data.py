@@ -7,8 +7,13 @@ database table creation and bulk data insertion with conflict resolution.
 """
 import sys
 import json
+from itertools import chain
+
 import psycopg
 
+from .applicant_record import ApplicantRecord
+from .bulk_load import load_chunks
+
 # --- database connection string ---
 DB_CONN_STR = "dbname=grad_cafe user=postgres"
 
@@ -44,78 +49,76 @@ def setup_database(db_conn_str):
                     gre_aw FLOAT,
                     degree TEXT,
                     llm_generated_program TEXT,
-                    llm_generated_university TEXT
+                    llm_generated_university TEXT,
+                    content_hash TEXT
                 );
             """)
+            add_content_hash_column(cur)
     print(f"Database table 'applicants' is ready on connection: {db_conn_str}")
 
-def load_initial_json_data(file_path, db_conn_str):
+def add_content_hash_column(cur):
+    """Add the ``content_hash`` column to a table created before hashes were stored.
+
+    Both loaders call this before writing rows, so a database set up by an
+    older version picks up the column on its next load.
+
+    :param cur: Cursor on the connection being loaded through; the caller commits.
+    :type cur: psycopg.Cursor
+    """
+    cur.execute("ALTER TABLE applicants ADD COLUMN IF NOT EXISTS content_hash TEXT;")
+
+def load_initial_json_data(file_path, db_conn_str, commit_each_chunk=False):
     """Read cleaned JSON data from file and perform bulk load into database.
     
     This function handles the initial loading of processed applicant data from
-    a JSONL file into the database. It reads the file line by line, parses
-    each JSON entry, and performs bulk insertion with conflict resolution.
+    a JSONL file into the database. It reads the file line by line and inserts
+    the parsed entries in fixed-size chunks as it goes, so memory use does not
+    grow with the size of the file.
     
     The function includes comprehensive error handling for file operations and
-    JSON parsing errors. It uses ON CONFLICT (pid) DO NOTHING to handle
-    duplicate entries gracefully during the initial data load process.
+    JSON parsing errors. Each chunk is copied into a staging table and merged
+    with ON CONFLICT (pid) DO NOTHING (a small one is inserted in one pipelined
+    batch), so duplicate entries are skipped and the whole load costs a few
+    round trips instead of one per row. A malformed line rolls back the whole
+    load unless ``commit_each_chunk`` kept the chunks before it.
     
     :param file_path: Path to the JSONL file containing applicant data to load.
     :type file_path: str
     :param db_conn_str: Database connection string for establishing the connection.
     :type db_conn_str: str
+    :param commit_each_chunk: Commit after every chunk instead of once at the end.
+    :type commit_each_chunk: bool
     """
     try:
-        data = []
         with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    data.append(json.loads(line))
+            records = (ApplicantRecord.from_json(line) for line in f if line.strip())
+            first = next(records, None)
+            if first is None:
+                print("Data file is empty.")
+                return
+            # Connect to the database.
+            with psycopg.connect(db_conn_str) as conn:
+                insert_count, _ = load_chunks(conn, chain([first], records),
+                                              commit_each_chunk=commit_each_chunk)
     except FileNotFoundError:
         print(f"Error: '{file_path}' not found.")
         return
     except json.JSONDecodeError as e:
         print(f"Error decoding JSON: {e}")
         return
-    if not data:
-        print("Data file is empty.")
-        return
-
-    # Connect to the database.
-    with psycopg.connect(db_conn_str) as conn:
-        with conn.cursor() as cur:
-            insert_query = """
-                INSERT INTO applicants (
-                    pid, program, comments, date_added, url, status, term,
-                    us_or_international, gpa, gre, gre_v, gre_aw, degree,
-                    llm_generated_program, llm_generated_university
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (pid) DO NOTHING;
-            """
-            insert_count = 0
-            for entry in data:
-                llm_uni = entry.get('llm_generated_university', '')
-                llm_prog = entry.get('llm_generated_program', '')
-                record = (
-                    entry.get('pid'), f"{llm_uni}, {llm_prog}", entry.get('comments'),
-                    entry.get('date_added'), entry.get('url'), entry.get('status'),
-                    entry.get('term'), entry.get('us_or_international'), entry.get('gpa'),
-                    entry.get('gre'), entry.get('gre_v'), entry.get('gre_aw'),
-                    entry.get('degree'), llm_prog, llm_uni
-                )
-                cur.execute(insert_query, record)
-                insert_count += cur.rowcount
     print(f"Initial load complete. Added {insert_count} new record(s).")
 
 
 # This function underlying is tested but __main__ can't be tested with pytest.
 if __name__ == "__main__":  # pragma: no cover
     if len(sys.argv) < 2:
-        print("Usage: python load_data.py <path_to_json_file>")
+        print("Usage: python load_data.py <path_to_json_file> [--commit-each-chunk]")
         sys.exit(1)
 
     input_file = sys.argv[1]
+    # --commit-each-chunk keeps the chunks loaded before an interruption.
+    commit_chunks = '--commit-each-chunk' in sys.argv[2:]
 
     # Update the calls to pass the default connection string.
     setup_database(DB_CONN_STR)
-    load_initial_json_data(input_file, DB_CONN_STR)
+    load_initial_json_data(input_file, DB_CONN_STR, commit_each_chunk=commit_chunks)
@@ -3,15 +3,78 @@ Module for loading LLM-processed applicant data into the database.
 
 This module handles the final step of the data pipeline, reading cleaned
 and standardized applicant data from the LLM output file and inserting it
-into the PostgreSQL database with appropriate conflict resolution.
+into the PostgreSQL database with appropriate conflict resolution. Entries a
+re-crawl found to have changed are loaded the same way, but overwrite the
+stored rows instead of being skipped.
 """
 import json
+import sys
 import psycopg
 
-# Input from the LLM output.
-INPUT_FILE = 'new_structured_entries.json.jsonl'
+from .applicant_record import ApplicantRecord
+from .bulk_load import load_chunks
+from .load_data import add_content_hash_column
+from .pipeline_files import CLEANED_OUTPUT_FILE, CLEANED_UPDATE_FILE
 
-def main(conn):
+# LLM output for the new entries written by ``scrape_and_clean.main``.
+INPUT_FILE = CLEANED_OUTPUT_FILE
+# LLM output for the changed entries written by ``scrape_and_clean.recrawl``.
+UPDATE_INPUT_FILE = CLEANED_UPDATE_FILE
+
+def _report_missing_input(input_file):
+    """Print the error shown when the LLM output file does not exist.
+
+    :param input_file: Path of the missing file.
+    :type input_file: str
+    """
+    print(f"Error: Input file '{input_file}' not found. Did the LLM script run correctly?")
+
+def iter_entries(input_file):
+    """Lazily read the LLM output file into entry records, skipping blank and malformed lines.
+
+    :param input_file: Path of the JSONL file to read.
+    :type input_file: str
+    :returns: Generator of records in file order; opening the file happens on
+        the first ``next`` and raises FileNotFoundError there if it is missing.
+    :rtype: collections.abc.Iterator[src.applicant_record.ApplicantRecord]
+    """
+    with open(input_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                # Skip any blank lines.
+                if not line.strip():
+                    continue
+                # Parse each line as its own JSON object.
+                yield ApplicantRecord.from_json(line)
+            except json.JSONDecodeError:
+                print(f"Warning: Skipping malformed JSON line: {line.strip()}")
+
+def load_file(conn, input_file, commit_each_chunk=False, update_changed=False):
+    """Stream the LLM output file into the database in chunks.
+
+    The ``content_hash`` column is added first if the table predates it.
+
+    :param conn: Database connection object for writing the rows.
+    :type conn: psycopg.Connection
+    :param input_file: Path of the JSONL file to read.
+    :type input_file: str
+    :param commit_each_chunk: Commit after every chunk.
+    :type commit_each_chunk: bool
+    :param update_changed: Overwrite stored rows whose content hash differs.
+    :type update_changed: bool
+    :returns: Tuple of (rows written, records read), or None if the file does not exist.
+    :rtype: tuple[int, int] or None
+    """
+    with conn.cursor() as cur:
+        add_content_hash_column(cur)
+    try:
+        return load_chunks(conn, iter_entries(input_file), commit_each_chunk=commit_each_chunk,
+                           update_changed=update_changed)
+    except FileNotFoundError:
+        _report_missing_input(input_file)
+        return None
+
+def main(conn, commit_each_chunk=False):
     """Load cleaned data from LLM output file into the database.
     
     This function serves as the main entry point for loading processed applicant
@@ -19,83 +82,68 @@ def main(conn):
     reading, JSON parsing, error handling for malformed data, and database
     insertion with conflict resolution.
     
-    The function reads the JSONL file line by line, parsing each entry and
-    inserting it into the applicants table. It uses ON CONFLICT (pid) DO NOTHING
+    The function reads the JSONL file line by line and inserts the parsed
+    entries in fixed-size chunks as it goes, so memory use does not grow with
+    the size of the file: a typical pull in one pipelined batch, a large file
+    through a COPY-filled staging table. Both use ON CONFLICT (pid) DO NOTHING
     to handle duplicate entries gracefully, ensuring idempotent operation.
     
     :param conn: Database connection object for inserting the loaded data.
     :type conn: psycopg.Connection
+    :param commit_each_chunk: Commit after every chunk instead of leaving the
+        commit to the caller.
+    :type commit_each_chunk: bool
     """
     print("--- Starting Load Data Step ---")
 
-    data = []
-    try:
-        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    # Skip any blank lines.
-                    if not line.strip():
-                        continue
-                    # Parse each line as its own JSON object.
-                    entry = json.loads(line)
-                    data.append(entry)
-                except json.JSONDecodeError:
-                    print(f"Warning: Skipping malformed JSON line: {line.strip()}")
-    except FileNotFoundError:
-        print(f"Error: Input file '{INPUT_FILE}' not found. Did the LLM script run correctly?")
+    # Uses the connection passed in from app.py.
+    counts = load_file(conn, INPUT_FILE, commit_each_chunk=commit_each_chunk)
+    if counts is None:
         return
 
-    if not data:
+    insert_count, total = counts
+    if not total:
         print("No new data to load.")
         return
 
-    # Uses the connection passed in from app.py.
-    with conn.cursor() as cur:
-        insert_query = """
-            INSERT INTO applicants (
-                pid, program, comments, date_added, url, status, term,
-                us_or_international, gpa, gre, gre_v, gre_aw, degree,
-                llm_generated_program, llm_generated_university
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (pid) DO NOTHING;
-        """
-        insert_count = 0
-        for entry in data:
-
-            llm_uni = entry.get('llm_generated_university', '')
-            llm_prog = entry.get('llm_generated_program', '')
-
-            # Build the record tuple in the specified order.
-            record = (
-                entry.get('pid'),
-                f"{llm_uni}, {llm_prog}", # The combined field for the 'program' column.
-                entry.get('comments'),
-                entry.get('date_added'),
-                entry.get('url'),
-                entry.get('status'),
-                entry.get('term'),
-                entry.get('us_or_international'),
-                entry.get('gpa'),
-                entry.get('gre'),
-                entry.get('gre_v'),
-                entry.get('gre_aw'),
-                entry.get('degree'),
-                llm_prog,  # Separate LLM-generated program.
-                llm_uni    # Separate LLM-generated university.
-            )
-            cur.execute(insert_query, record)
-            # Check if a row was actually inserted.
-            insert_count += cur.rowcount
-
-    print(f"Successfully inserted {insert_count} new entries out of {len(data)} total.")
+    print(f"Successfully inserted {insert_count} new entries out of {total} total.")
     print("--- Finished Load Data Step ---")
 
+def update_changed_data(conn):
+    """Overwrite stored rows with the re-crawled entries that changed.
+
+    Reads ``UPDATE_INPUT_FILE`` and upserts every entry, in the same chunks
+    and batches as ``main``. A row is only rewritten when the entry's content
+    hash differs from the stored one, so loading the same file twice changes
+    nothing the second time.
+
+    :param conn: Database connection object for updating the rows.
+    :type conn: psycopg.Connection
+    :returns: Number of rows inserted or updated.
+    :rtype: int
+    """
+    print("--- Starting Update Data Step ---")
+
+    counts = load_file(conn, UPDATE_INPUT_FILE, update_changed=True)
+    if not counts or not counts[1]:
+        print("No changed entries to update.")
+        return 0
+
+    update_count, total = counts
+    print(f"Successfully updated {update_count} changed entries out of {total} total.")
+    print("--- Finished Update Data Step ---")
+    return update_count
+
 
 # This function underlying is tested but __main__ can't be tested with pytest.
 if __name__ == "__main__": # pragma: no cover
     DB_CONN_STR = "dbname=grad_cafe user=postgres"
     print("Running load_new_data.py as a standalone script...")
     with psycopg.connect(DB_CONN_STR) as connection:
-        main(connection)
+        # --update loads the changed entries from a re-crawl instead of new ones.
+        if '--update' in sys.argv[1:]:
+            update_changed_data(connection)
+        else:
+            main(connection)
         connection.commit() # Save changes when run standalone.
     print("Standalone run complete.")
@@ -0,0 +1,201 @@
+"""
+Module for caching fetched listing pages on disk.
+
+Each cached page is stored as a gzip-compressed body next to a small JSON
+metadata file that holds the URL, its ``ETag``/``Last-Modified`` validators and
+the time it was stored. The validators are sent back as conditional request
+headers, so an unchanged page comes back as ``304 Not Modified`` with no body
+to download again. Entries older than ``max_age`` are evicted, and the oldest
+entries are dropped once the compressed bodies grow past ``max_bytes``.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60
+
+
+class PageCache:
+    """Persistent, size- and age-bounded cache of page bodies keyed by URL.
+
+    The cache is safe to share between fetch worker threads: files are written
+    to a temporary name and moved into place, and eviction runs under a lock.
+
+    :param directory: Directory holding the cached files; created if missing.
+    :type directory: str
+    :param max_bytes: Upper bound on the total size of the compressed bodies.
+    :type max_bytes: int
+    :param max_age: Seconds after which an entry is evicted.
+    :type max_age: float
+    :param fresh_for: Seconds during which an entry is served without asking the
+        server at all; 0 always revalidates with a conditional request.
+    :type fresh_for: float
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE,
+                 fresh_for=0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.fresh_for = fresh_for
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path, _ in self._entries())
+
+    def get(self, url):
+        """Return the cached page for a URL, or None on a miss or expired entry.
+
+        :param url: URL the page was fetched from.
+        :type url: str
+        :returns: Dict with ``url``, ``body``, ``etag``, ``last_modified`` and
+            ``stored_at`` keys, or None.
+        :rtype: dict or None
+        """
+        body_path, meta_path = self._paths(url)
+        meta = _read_meta(meta_path)
+        if not meta or meta.get('url') != url:
+            return None
+        if time.time() - meta['stored_at'] >= self.max_age:
+            self._remove(body_path, meta_path)
+            return None
+        try:
+            with gzip.open(body_path, 'rb') as f:
+                meta['body'] = f.read()
+        except (OSError, EOFError):
+            self._remove(body_path, meta_path)
+            return None
+        return meta
+
+    def is_fresh(self, page):
+        """Return True if a cached page may be used without revalidating it.
+
+        :param page: Cached page returned by ``get``.
+        :type page: dict
+        :rtype: bool
+        """
+        return time.time() - page['stored_at'] < self.fresh_for
+
+    @staticmethod
+    def body(page):
+        """Return the body of a cached page.
+
+        :param page: Cached page returned by ``get``.
+        :type page: dict
+        :rtype: bytes
+        """
+        return page['body']
+
+    @staticmethod
+    def conditional_headers(page):
+        """Build the conditional request headers for a cached page.
+
+        :param page: Cached page returned by ``get``, or None.
+        :type page: dict or None
+        :returns: ``If-None-Match``/``If-Modified-Since`` headers for its validators.
+        :rtype: dict[str, str]
+        """
+        headers = {}
+        if page and page.get('etag'):
+            headers['If-None-Match'] = page['etag']
+        if page and page.get('last_modified'):
+            headers['If-Modified-Since'] = page['last_modified']
+        return headers
+
+    def put(self, url, body, etag=None, last_modified=None):
+        """Store a page body and its validators, evicting old entries if needed.
+
+        :param url: URL the page was fetched from.
+        :type url: str
+        :param body: Page body as received.
+        :type body: bytes
+        :param etag: ``ETag`` response header, if any.
+        :type etag: str or None
+        :param last_modified: ``Last-Modified`` response header, if any.
+        :type last_modified: str or None
+        """
+        body_path, meta_path = self._paths(url)
+        old_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+        _atomic_write(body_path, gzip.compress(body, compresslevel=6))
+        _atomic_write(meta_path, json.dumps({
+            'url': url, 'etag': etag, 'last_modified': last_modified,
+            'stored_at': time.time(),
+        }).encode('utf-8'))
+
+        with self._lock:
+            self._size += os.path.getsize(body_path) - old_size
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def touch(self, url):
+        """Mark a cached page as just revalidated after a ``304`` response.
+
+        :param url: URL the page was fetched from.
+        :type url: str
+        """
+        _, meta_path = self._paths(url)
+        meta = _read_meta(meta_path)
+        if meta:
+            meta['stored_at'] = time.time()
+            _atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def evict(self):
+        """Drop expired entries, then the oldest ones until under ``max_bytes``."""
+        with self._lock:
+            now = time.time()
+            live = []
+            for body_path, meta_path in self._entries():
+                meta = _read_meta(meta_path)
+                if not meta or now - meta['stored_at'] >= self.max_age:
+                    self._remove(body_path, meta_path)
+                else:
+                    live.append((meta['stored_at'], os.path.getsize(body_path),
+                                 body_path, meta_path))
+
+            live.sort()
+            self._size = sum(size for _, size, _, _ in live)
+            for _, size, body_path, meta_path in live:
+                if self._size <= self.max_bytes:
+                    break
+                self._remove(body_path, meta_path)
+                self._size -= size
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return f'{base}.html.gz', f'{base}.json'
+
+    def _entries(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.html.gz'):
+                body_path = os.path.join(self.directory, name)
+                yield body_path, body_path[:-len('.html.gz')] + '.json'
+
+    @staticmethod
+    def _remove(*paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _read_meta(meta_path):
+    """Read an entry's metadata, treating missing or corrupt files as a miss."""
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _atomic_write(path, data):
+    """Write bytes to a temporary file and move it over ``path``."""
+    tmp_path = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,195 @@
+"""
+Module for fetching survey listing pages over a shared connection pool.
+
+``PageFetcher`` is the single place where listing pages are requested. It
+reports network errors and bad statuses the same way for every caller (the
+thread-pool scraper, the re-crawl and the cutoff probe). When given a
+``PageCache`` it turns repeat requests into conditional GETs, and when given a
+``RateLimiter`` it paces every request and reports throttling back to it.
+Given a ``RetryPolicy``, transient failures are retried with backoff, and
+given a ``ScrapeMetrics`` every fetch is timed and measured for the run summary.
+
+Every request offers gzip and deflate (and brotli when the ``brotli`` package
+is installed), since listing pages are highly compressible table HTML. The
+body is read as a stream, so each compressed chunk is decoded as it arrives
+and the compressed page is never held in memory as a whole.
+"""
+import time
+
+import urllib3
+
+from .rate_limiter import THROTTLE_STATUSES, parse_retry_after
+from .retry_policy import RETRY_STATUSES
+
+# Content codings urllib3 can decode here: "gzip,deflate", plus "br" with brotli.
+ACCEPT_ENCODING = urllib3.util.make_headers(accept_encoding=True)['accept-encoding']
+# Bytes read from the connection per decoded chunk.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class PageFetcher:
+    """Fetch listing pages by number through one ``urllib3.PoolManager``.
+
+    :param http: Connection pool shared by every request; safe to use from threads.
+    :type http: urllib3.PoolManager
+    :param target_url: Listing URL that ``?page=N`` is appended to.
+    :type target_url: str
+    :param user_agent: ``User-Agent`` header sent with each request.
+    :type user_agent: str
+    :param cache: Optional on-disk cache used for conditional requests.
+    :type cache: src.page_cache.PageCache or None
+    :param limiter: Optional rate limiter shared by every worker using this fetcher.
+    :type limiter: src.rate_limiter.RateLimiter or None
+    :param retry: Optional retry policy for network errors and transient statuses.
+    :type retry: src.retry_policy.RetryPolicy or None
+    :param metrics: Optional collector told the latency, size and outcome of every fetch.
+    :type metrics: src.scrape_metrics.ScrapeMetrics or None
+    """
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(self, http, target_url, user_agent, cache=None, limiter=None, retry=None,
+                 metrics=None):
+        self.http = http
+        self.target_url = target_url
+        self.user_agent = user_agent
+        self.cache = cache
+        self.limiter = limiter
+        self.retry = retry
+        self.metrics = metrics
+
+    def page_url(self, page_num):
+        """Return the URL of a listing page.
+
+        :param page_num: Listing page number.
+        :type page_num: int
+        :rtype: str
+        """
+        return f'{self.target_url}?page={page_num}'
+
+    def fetch(self, page_num):
+        """Fetch the raw HTML for a single listing page.
+
+        Network errors, bodies that break off or cannot be decoded, and non-200
+        responses are reported and returned as ``None`` so the caller can stop
+        at, or skip, the failed page. With a retry policy, network errors, broken
+        bodies and transient statuses are retried after a jittered backoff while
+        the policy allows it. With a cache, a
+        ``304 Not Modified`` answer returns the cached body, and a cached page
+        still within its freshness window is returned without any request.
+
+        The latency reported to the metrics runs from sending the final request,
+        after any rate-limit wait, to reading the last byte of its body.
+
+        :param page_num: Listing page number to fetch.
+        :type page_num: int
+        :returns: The response body, or None if the page could not be fetched.
+        :rtype: bytes or None
+        """
+        url = self.page_url(page_num)
+        headers = {'User-Agent': self.user_agent, 'Accept-Encoding': ACCEPT_ENCODING}
+        cached = self.cache.get(url) if self.cache else None
+        if cached:
+            if self.cache.is_fresh(cached):
+                print(f"Using cached page {page_num}.")
+                self._record('cached')
+                return self.cache.body(cached)
+            headers.update(self.cache.conditional_headers(cached))
+
+        attempt = 0
+        while True:
+            if self.limiter:
+                self.limiter.acquire()
+            started = time.perf_counter()
+            response, retry_after = self._send(page_num, url, headers)
+            if response is not None and response.status == 304 and cached:
+                response.drain_conn()
+                self.cache.touch(url)
+                self._record('not_modified', time.perf_counter() - started, retries=attempt)
+                return self.cache.body(cached)
+            if response is not None and response.status == 200:
+                body = self._read(page_num, response)
+                if body is not None:
+                    break
+            elif response is not None:
+                response.drain_conn()
+                print(f"Failed to fetch page {page_num}. Status: {response.status}")
+                if response.status not in RETRY_STATUSES:
+                    self._record('failed', retries=attempt)
+                    return None
+            if not (self.retry and self.retry.allow(attempt)):
+                self._record('failed', retries=attempt)
+                return None
+
+            delay = self.retry.backoff(attempt, retry_after)
+            print(f"Retrying page {page_num} in {delay:.1f}s...")
+            time.sleep(delay)
+            attempt += 1
+
+        self._record('fetched', time.perf_counter() - started, wire_bytes=response.tell(),
+                     decoded_bytes=len(body), retries=attempt)
+        if self.cache:
+            self.cache.put(url, body,
+                           etag=response.headers.get('ETag'),
+                           last_modified=response.headers.get('Last-Modified'))
+        return body
+
+    def _record(self, outcome, seconds=None, **sizes):
+        """Report how a fetch ended to the metrics collector, if there is one."""
+        if self.metrics:
+            self.metrics.record_fetch(outcome, seconds, **sizes)
+
+    def _read(self, page_num, response):
+        """Read a 200 response's body, treating a broken or undecodable stream as a network error.
+
+        :returns: The decoded body, or None if it could not be read in full.
+        :rtype: bytes or None
+        """
+        try:
+            return read_body(response)
+        except urllib3.exceptions.HTTPError as e:
+            print(f"Network error while reading page {page_num}: {e}")
+            if self.metrics:
+                self.metrics.record_response('network_error')
+            return None
+
+    def _send(self, page_num, url, headers):
+        """Make one request and report how it went to the limiter and the metrics.
+
+        :returns: Tuple of (response, retry_after), where response is None after a
+            network error and retry_after is the server's requested wait, if any.
+        :rtype: tuple[urllib3.BaseHTTPResponse or None, float or None]
+        """
+        print(f"Scraping page {page_num}...")
+        try:
+            response = self.http.request('GET', url, headers=headers, preload_content=False)
+        except urllib3.exceptions.MaxRetryError as e:
+            print(f"Network error while fetching page {page_num}: {e}")
+            if self.metrics:
+                self.metrics.record_response('network_error')
+            return None, None
+
+        if self.metrics:
+            self.metrics.record_response(response.status)
+
+        retry_after = None
+        if response.status in RETRY_STATUSES and (self.limiter or self.retry):
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        if self.limiter and response.status in THROTTLE_STATUSES:
+            self.limiter.on_throttle(retry_after)
+        elif self.limiter:
+            self.limiter.on_success()
+        return response, retry_after
+
+
+def read_body(response):
+    """Read a streamed response to the end, decoding its content coding chunk by chunk.
+
+    :param response: Response requested with ``preload_content=False``.
+    :type response: urllib3.BaseHTTPResponse
+    :returns: The decoded body.
+    :rtype: bytes
+    """
+    try:
+        return b''.join(response.stream(STREAM_CHUNK_SIZE, decode_content=True))
+    finally:
+        response.release_conn()
@@ -0,0 +1,168 @@
+"""
+Module for walking a scrape's parsed pages in order.
+
+Every scraping path feeds its pages, in page order, through a ``PageWalk``.
+The walk collects each page's entries, decides whether a page that could not
+be fetched is skipped or ends the scrape, and keeps the checkpoint up to date
+so an interrupted scrape can resume after the last saved page, with the same
+year context for the dates of the page it resumes at. Skipped pages, and the
+range left unwalked when the walk gives up, are recorded in a ``FailedPages``
+with the bound of the last entry collected before them.
+"""
+from .applicant_record import ApplicantRecord
+from .failed_pages import entry_bound
+
+# Consecutive failed pages after which a scrape gives up instead of skipping ahead.
+MAX_FAILED_IN_A_ROW = 3
+# Pages scraped between checkpoint writes.
+CHECKPOINT_EVERY = 10
+
+
+class PageWalk:  # pylint: disable=too-many-instance-attributes
+    """Bookkeeping for one pass over the listing pages.
+
+    :param collect: Called with each page's entries; None leaves them to the caller.
+    :type collect: callable or None
+    :param failed_pages: Receives the pages skipped after failing, and the
+        page the walk gave up at; without it a failed page ends the walk.
+    :type failed_pages: src.failed_pages.FailedPages or None
+    :param checkpoint: Where to save progress, or None.
+    :type checkpoint: src.checkpoint.ScrapeCheckpoint or None
+    :param year_inferrer: Year context shared by the walked pages; saved with
+        each checkpoint and restored on resume.
+    :type year_inferrer: src.date_utils.YearInferrer or None
+    """
+
+    def __init__(self, collect=None, failed_pages=None, checkpoint=None, year_inferrer=None):
+        self.collect = collect
+        self.failed_pages = failed_pages
+        self.checkpoint = checkpoint
+        self.year_inferrer = year_inferrer
+        self.completed_page = 0
+        self.finished = False
+        self.last_bound = None
+        self._unsaved = []
+        self._failed_in_a_row = 0
+
+    def start(self, cutoff, stop_page):
+        """Begin a fresh walk up to ``stop_page``, replacing any saved progress.
+
+        :param cutoff: Cutoff key from ``src.checkpoint.cutoff_key``.
+        :type cutoff: dict
+        :param stop_page: Last page of the planned range.
+        :type stop_page: int
+        """
+        if self.checkpoint:
+            self.checkpoint.start(cutoff, stop_page)
+
+    def resume(self, cutoff, progress):
+        """Pick up from saved progress, handing back what the earlier run collected.
+
+        :param cutoff: Cutoff key the progress was loaded for.
+        :type cutoff: dict
+        :param progress: Progress returned by ``ScrapeCheckpoint.load``.
+        :type progress: dict
+        :returns: Tuple of (first_page, stop_page) still to scrape, or None if
+            the earlier run had already finished.
+        :rtype: tuple[int, int] or None
+        """
+        print(f"Resuming from checkpoint after page {progress['last_page']} "
+              f"with {len(progress['entries'])} entries.")
+        self.checkpoint.resume(cutoff, progress)
+        if self.collect:
+            self.collect([ApplicantRecord.from_dict(entry) for entry in progress['entries']])
+        if self.failed_pages is not None:
+            self.failed_pages.restore(progress['failed_pages'])
+        if progress['entries']:
+            self.last_bound = entry_bound(progress['entries'][-1])
+        if self.year_inferrer:
+            self.year_inferrer.restore(progress['year_state'])
+        if progress['done']:
+            return None
+        self.completed_page = progress['last_page']
+        return progress['last_page'] + 1, progress['stop_page']
+
+    def page_failed(self, page_num):
+        """Record a page that could not be fetched.
+
+        After ``MAX_FAILED_IN_A_ROW`` failures in a row the walk ends, and the
+        first of them is recorded as where the rest of the range was left
+        unwalked.
+
+        :param page_num: Number of the failed page.
+        :type page_num: int
+        :returns: Whether the walk should carry on with the next page.
+        :rtype: bool
+        """
+        if self.failed_pages is None:
+            return False
+        self._failed_in_a_row += 1
+        self.failed_pages.add(page_num, self.last_bound)
+        if self._failed_in_a_row >= MAX_FAILED_IN_A_ROW:
+            first_page = page_num - self._failed_in_a_row + 1
+            self.failed_pages.give_up(first_page, self.last_bound)
+            print(f"{self._failed_in_a_row} pages in a row failed. Giving up at page "
+                  f"{page_num}; pages from {first_page} on are left for a later pass.")
+            return False
+        print(f"Skipping page {page_num}; it will be retried after this pass.")
+        self.completed_page = page_num
+        return True
+
+    def page_parsed(self, page_num, page_entries, keep_going):
+        """Collect a parsed page's entries, saving a checkpoint every few pages.
+
+        :param page_num: Number of the parsed page.
+        :type page_num: int
+        :param page_entries: New entries found on the page.
+        :type page_entries: list[src.applicant_record.ApplicantRecord]
+        :param keep_going: Whether the page ended before the cutoff.
+        :type keep_going: bool
+        :returns: Whether the walk should carry on with the next page.
+        :rtype: bool
+        """
+        self._failed_in_a_row = 0
+        if page_entries:
+            self.last_bound = entry_bound(page_entries[-1])
+        if self.collect:
+            self.collect(page_entries)
+        self.completed_page = page_num
+        if self.checkpoint:
+            self._unsaved.extend(page_entries)
+            if page_num % CHECKPOINT_EVERY == 0:
+                self._record(page_num)
+        if not keep_going:
+            self.finished = True
+        return keep_going
+
+    def run(self, parsed):
+        """Walk parsed pages until the cutoff, a page failure or the end of the pages.
+
+        The checkpoint is saved however the walk ends, including on an
+        exception; only a finished walk marks it done.
+
+        :param parsed: Tuples of (page_num, page_entries, keep_going) as produced
+            by ``parse_pages_in_order``.
+        :type parsed: iterator[tuple[int, list or None, bool]]
+        """
+        try:
+            for page_num, page_entries, keep_going in parsed:
+                if page_entries is None:
+                    if not self.page_failed(page_num):
+                        return
+                elif not self.page_parsed(page_num, page_entries, keep_going):
+                    return
+            self.finished = True
+        finally:
+            self.save()
+
+    def save(self):
+        """Save the pages walked since the last checkpoint write."""
+        if self.checkpoint:
+            self._record(self.completed_page, done=self.finished)
+
+    def _record(self, last_page, done=False):
+        year_state = self.year_inferrer.state() if self.year_inferrer else None
+        failed_state = self.failed_pages.state() if self.failed_pages is not None else None
+        self.checkpoint.record(last_page, self._unsaved, done=done,
+                               failed_pages=failed_state, year_state=year_state)
+        self._unsaved = []
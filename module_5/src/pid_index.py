@@ -0,0 +1,87 @@
+"""
+Module for telling already-stored results apart by PID alone.
+
+GradCafe result IDs only ever increase, and the listing shows the newest
+results first. A scrape can therefore stop at the first row whose PID is well
+below the highest PID already stored (the watermark), without trusting the
+listing's dates. Close to the watermark, results can arrive slightly out of
+order, so the stored PIDs in a window below it are kept in a sorted
+``array`` and checked with a binary search. That costs 8 bytes per PID and one
+indexed range query, instead of a scan of every row from the latest day.
+"""
+from array import array
+from bisect import bisect_left
+
+import psycopg
+
+# How far below the watermark stored PIDs are tracked one by one.
+RECENT_PID_WINDOW = 5000
+
+
+class PidIndex:
+    """Watermark plus sorted recent PIDs, answering "is this result stored?".
+
+    PIDs at or below ``floor`` (the watermark minus the window) are all treated
+    as stored; above it, only those listed in ``recent_pids`` are.
+
+    :param watermark: Highest PID already stored.
+    :type watermark: int
+    :param recent_pids: Stored PIDs; those at or below the floor are dropped.
+    :type recent_pids: iterable[int]
+    :param window: Number of PIDs below the watermark tracked individually.
+    :type window: int
+    """
+
+    def __init__(self, watermark, recent_pids=(), window=RECENT_PID_WINDOW):
+        self.watermark = watermark
+        self.floor = watermark - window
+        self._recent = array('q', sorted(pid for pid in recent_pids if pid > self.floor))
+
+    def __contains__(self, pid):
+        if pid <= self.floor:
+            return True
+        i = bisect_left(self._recent, pid)
+        return i < len(self._recent) and self._recent[i] == pid
+
+    def __len__(self):
+        return len(self._recent)
+
+    def is_past(self, pid):
+        """Return True if ``pid`` is old enough that the scrape can stop.
+
+        :param pid: PID of a listing row.
+        :type pid: int
+        :rtype: bool
+        """
+        return pid <= self.floor
+
+
+def load_pid_index(conn, window=RECENT_PID_WINDOW):
+    """Build a ``PidIndex`` from the applicants table.
+
+    Both queries only touch the primary key index on ``pid``.
+
+    :param conn: Database connection for querying applicant data.
+    :type conn: psycopg.Connection
+    :param window: Number of PIDs below the watermark tracked individually.
+    :type window: int
+    :returns: The index, or None if the table is empty or cannot be read.
+    :rtype: PidIndex or None
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT MAX(pid) FROM applicants;")
+            result = cur.fetchone()
+            watermark = result[0] if result else None
+            if watermark is None:
+                return None
+
+            cur.execute("SELECT pid FROM applicants WHERE pid > %s;", (watermark - window,))
+            index = PidIndex(watermark, (row[0] for row in cur.fetchall()), window)
+            print(f"Highest stored PID: {watermark}. "
+                  f"Tracking {len(index)} PIDs above {index.floor}.")
+            return index
+
+    except psycopg.Error as e:
+        print(f"Database error while loading the PID index: {e}")
+        return None
@@ -0,0 +1,20 @@
+"""
+Module naming the files the data pipeline hands from one step to the next.
+
+The scraper writes the entries it finds for the LLM step, the LLM step
+prints them back cleaned, and the loaders read that output into the
+database. Each step imports the names it needs from here rather than from
+the step on the other side, so the loaders do not pull in the scraper.
+"""
+
+# JSON Lines file the scraper writes new entries to, for the LLM step.
+SCRAPE_OUTPUT_FILE = 'new_structured_entries.jsonl'
+# JSON Lines file a re-crawl writes the stored entries whose content changed to.
+RECRAWL_OUTPUT_FILE = 'updated_entries.jsonl'
+# LLM output for the new entries, read by ``load_new_data.main``.
+CLEANED_OUTPUT_FILE = 'new_structured_entries.cleaned.jsonl'
+# LLM output for the changed entries, read by ``load_new_data.update_changed_data``.
+CLEANED_UPDATE_FILE = 'updated_entries.cleaned.jsonl'
+# The LLM step (``llm_hosting/app.py``, outside this repo), run on a scraper
+# output named after it; with ``--stdout`` it prints one cleaned entry per line.
+LLM_COMMAND = ("python", "src/llm_hosting/app.py", "--stdout", "--file")
@@ -0,0 +1,136 @@
+"""
+Module for pacing requests to the survey site.
+
+``RateLimiter`` is a token bucket shared by every fetch worker. Its ceiling
+comes from the ``Crawl-delay`` and ``Request-rate`` rules of the site's
+robots.txt, so the scraper never asks for pages faster than the site allows.
+Within that ceiling the rate adapts AIMD-style: every successful response adds
+a small fixed step, and every ``429 Too Many Requests`` or ``503 Service
+Unavailable`` halves it. A ``Retry-After`` header on such a response also
+holds back every worker for the time the server asked for.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.robotparser import RequestRate
+
+# Requests per second when robots.txt sets no limit.
+DEFAULT_MAX_RATE = 5.0
+# Statuses a server uses to say it is being asked too often.
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+# The bucket state sits next to the adaptive-rate knobs that adjust it.
+class RateLimiter:  # pylint: disable=too-many-instance-attributes
+    """Thread-safe token bucket with additive increase and multiplicative decrease.
+
+    :param max_rate: Highest rate, in requests per second, ever allowed.
+    :type max_rate: float
+    :param burst: Number of requests that may be sent back to back after a pause.
+    :type burst: int
+    :param min_rate: Lowest rate the limiter backs off to; defaults to 1/32 of ``max_rate``.
+    :type min_rate: float or None
+    :param increase: Requests per second added after each success; defaults to
+        1/20 of ``max_rate``.
+    :type increase: float or None
+    :param decrease: Factor the rate is multiplied by after a throttling response.
+    :type decrease: float
+
+    Every argument after ``max_rate`` is keyword-only.
+    """
+
+    # The keyword-only tuning knobs each have a working default; most callers set none.
+    # pylint: disable-next=too-many-arguments
+    def __init__(self, max_rate, *, burst=1, min_rate=None, increase=None, decrease=0.5):
+        self.max_rate = max_rate
+        self.burst = burst
+        self.min_rate = min_rate if min_rate is not None else max_rate / 32
+        self.increase = increase if increase is not None else max_rate / 20
+        self.decrease = decrease
+        self.rate = max_rate
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_robots(cls, parser, user_agent, default_rate=DEFAULT_MAX_RATE, **kwargs):
+        """Build a limiter whose ceiling honours a parsed robots.txt.
+
+        The strictest of ``Crawl-delay``, ``Request-rate`` and ``default_rate``
+        becomes the maximum rate.
+
+        :param parser: Parser that has already read the site's robots.txt.
+        :type parser: urllib.robotparser.RobotFileParser
+        :param user_agent: User agent whose rules apply.
+        :type user_agent: str
+        :param default_rate: Ceiling used when robots.txt sets no stricter limit.
+        :type default_rate: float
+        :param kwargs: Further ``RateLimiter`` arguments.
+        :returns: A limiter for that site.
+        :rtype: RateLimiter
+        """
+        limits = [default_rate]
+        delay = parser.crawl_delay(user_agent)
+        if isinstance(delay, (int, float)) and delay > 0:
+            limits.append(1 / delay)
+        request_rate = parser.request_rate(user_agent)
+        if isinstance(request_rate, RequestRate) and request_rate.seconds > 0:
+            limits.append(request_rate.requests / request_rate.seconds)
+        return cls(min(limits), **kwargs)
+
+    def acquire(self):
+        """Block until the calling worker may send its next request."""
+        with self._lock:
+            self._refill()
+            # Taking a token may leave the bucket in debt; the debt is the wait.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_success(self):
+        """Raise the rate by one additive step, up to ``max_rate``."""
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after=None):
+        """Cut the rate after a throttling response and honour its ``Retry-After``.
+
+        :param retry_after: Seconds the server asked clients to wait, if any.
+        :type retry_after: float or None
+        """
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            if retry_after:
+                # Put the bucket into enough debt that no worker sends before then.
+                self._tokens = min(self._tokens, 0) - retry_after * self.rate
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+def parse_retry_after(value):
+    """Convert a ``Retry-After`` header into seconds from now.
+
+    :param value: Header value, either a number of seconds or an HTTP date.
+    :type value: str or None
+    :returns: Seconds to wait, or None if the header is missing or malformed.
+    :rtype: float or None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,64 @@
+"""
+Module for retrying failed page requests.
+
+``RetryPolicy`` decides whether a failed request is tried again and how long
+to wait first. Delays grow exponentially with "full jitter" (a random wait
+between zero and the exponential bound) so parallel workers that failed
+together do not retry together. A retry budget shared by every worker caps the
+total number of retries in one scrape, so an outage makes pages fail fast
+instead of multiplying the load on a struggling site.
+"""
+import random
+import threading
+
+# Statuses worth asking again for; anything else is treated as final.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryPolicy:
+    """Jittered exponential backoff with a retry budget shared across workers.
+
+    :param attempts: Most requests made for one page, including the first.
+    :type attempts: int
+    :param base_delay: Upper bound, in seconds, of the wait before the first retry.
+    :type base_delay: float
+    :param max_delay: Cap on the upper bound of any single wait.
+    :type max_delay: float
+    :param budget: Total retries allowed across all pages.
+    :type budget: int
+    """
+
+    def __init__(self, attempts=4, base_delay=1.0, max_delay=30.0, budget=50):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self._lock = threading.Lock()
+
+    def allow(self, attempt):
+        """Return True, and spend one retry from the budget, if another try may be made.
+
+        :param attempt: Zero-based number of the attempt that just failed.
+        :type attempt: int
+        :rtype: bool
+        """
+        if attempt + 1 >= self.attempts:
+            return False
+        with self._lock:
+            if self.budget <= 0:
+                return False
+            self.budget -= 1
+            return True
+
+    def backoff(self, attempt, retry_after=None):
+        """Return how long to wait before the next attempt.
+
+        :param attempt: Zero-based number of the attempt that just failed.
+        :type attempt: int
+        :param retry_after: Seconds the server asked clients to wait, if any.
+        :type retry_after: float or None
+        :returns: Seconds to sleep.
+        :rtype: float
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after or 0)
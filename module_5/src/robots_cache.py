@@ -0,0 +1,140 @@
+"""
+Module for caching robots.txt policies between scraper runs.
+
+Reading robots.txt is a blocking round trip at the start of every scrape.
+``RobotsCache`` keeps each site's policy in memory and in a small JSON file,
+so a run within the TTL fills its parser from the cache without any request.
+Once the TTL has passed, the cached policy is still used, and a background
+thread fetches a fresh copy for the next run. Only a missing policy, or one
+too old to trust, is fetched before the scrape can start.
+
+A policy is stored as the rules text produced by ``str(RobotFileParser)``,
+which ``RobotFileParser.parse`` reads back to the same rules, together with
+the ``allow_all``/``disallow_all`` flags set when robots.txt itself could not
+be read.
+"""
+import json
+import os
+import threading
+import time
+
+# Seconds a cached policy is used without refreshing it.
+DEFAULT_TTL = 24 * 60 * 60
+# Seconds after which a cached policy is refetched before scraping starts.
+DEFAULT_MAX_STALE = 7 * 24 * 60 * 60
+
+
+# Callers only ever ask for a policy; storing and refreshing happen behind load().
+class RobotsCache:  # pylint: disable=too-few-public-methods
+    """In-memory and on-disk cache of robots.txt policies keyed by URL.
+
+    :param path: JSON file shared by every scraper entry point; None keeps
+        policies in memory only.
+    :type path: str or None
+    :param ttl: Seconds a policy is used before it is refreshed in the background.
+    :type ttl: float
+    :param max_stale: Seconds after which a policy is refetched synchronously.
+    :type max_stale: float
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_stale=DEFAULT_MAX_STALE):
+        self.path = path
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._policies = {}
+        self._refreshing = {}
+        self._lock = threading.Lock()
+
+    def load(self, parser, url):
+        """Fill a robots.txt parser from the cache, reading the site only if needed.
+
+        :param parser: Parser to fill; it must already have ``url`` set.
+        :type parser: urllib.robotparser.RobotFileParser
+        :param url: URL of the robots.txt file.
+        :type url: str
+        :returns: The background refresh thread if one was started, else None.
+        :rtype: threading.Thread or None
+        """
+        policy = self._lookup(url)
+        age = time.time() - policy['fetched_at'] if policy else None
+        if policy is None or age >= self.max_stale:
+            parser.read()
+            self._store(url, parser)
+            return None
+
+        parser.parse(policy['rules'].splitlines())
+        parser.allow_all = policy['allow_all']
+        parser.disallow_all = policy['disallow_all']
+        if age >= self.ttl:
+            return self._refresh_in_background(url, type(parser))
+        return None
+
+    def _lookup(self, url):
+        """Return the newest known policy, checking the file for other runs' updates."""
+        with self._lock:
+            policy = self._policies.get(url)
+        if policy and time.time() - policy['fetched_at'] < self.ttl:
+            return policy
+        on_disk = self._read_file().get(url)
+        if on_disk and (policy is None or on_disk['fetched_at'] > policy['fetched_at']):
+            with self._lock:
+                self._policies[url] = on_disk
+            return on_disk
+        return policy
+
+    def _store(self, url, parser):
+        """Cache the policy a parser has just read, unless the read failed."""
+        if not (parser.mtime() or parser.allow_all or parser.disallow_all):
+            # A 5xx answer sets neither the rules' mtime nor a flag; try again next run.
+            return
+        policy = {
+            'rules': str(parser),
+            'allow_all': parser.allow_all is True,
+            'disallow_all': parser.disallow_all is True,
+            'fetched_at': time.time(),
+        }
+        with self._lock:
+            self._policies[url] = policy
+            if self.path:
+                policies = self._read_file()
+                policies[url] = policy
+                tmp_path = f'{self.path}.{threading.get_ident()}.tmp'
+                try:
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(policies, f)
+                    os.replace(tmp_path, self.path)
+                except OSError as e:
+                    # The policy stays cached in memory; the next run reads robots.txt again.
+                    print(f"Could not save the robots.txt cache to {self.path}: {e}")
+
+    def _refresh_in_background(self, url, parser_class):
+        """Start refreshing a policy on a daemon thread unless one is already running."""
+        with self._lock:
+            running = self._refreshing.get(url)
+            if running and running.is_alive():
+                return running
+            thread = threading.Thread(target=self._refresh, args=(url, parser_class),
+                                      daemon=True)
+            self._refreshing[url] = thread
+        thread.start()
+        return thread
+
+    def _refresh(self, url, parser_class):
+        parser = parser_class()
+        parser.set_url(url)
+        try:
+            parser.read()
+        except OSError as e:
+            # The cached policy stays in use; the next run tries again.
+            print(f"Could not refresh {url}: {e}")
+            return
+        self._store(url, parser)
+
+    def _read_file(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
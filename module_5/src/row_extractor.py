@@ -0,0 +1,286 @@
+"""
+Module for extracting listing table rows from raw survey page HTML.
+
+This module walks the results ``<tbody>`` of a listing page once, driven by
+``html.parser.HTMLParser`` events, and records only what the scraper reads
+from each top-level row: cell text, program spans, result links, badge text
+and the first comment paragraph. No document tree is built.
+
+Pages whose markup the streaming extractor cannot follow exactly (unbalanced
+tags, nested tables, script content, unknown encodings) are reported back to
+the caller, which falls back to BeautifulSoup. Both paths produce the same
+row records, so the rest of the scraper does not care which one ran.
+"""
+import re
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+BADGE_CLASS = 'tw-inline-flex'
+
+# Elements that never have content or an end tag.
+VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+})
+
+# Elements whose content BeautifulSoup does not treat as plain text, plus
+# table structure the listing rows never contain.
+UNSUPPORTED_ELEMENTS = frozenset({'script', 'style', 'template', 'table', 'tbody', 'thead',
+                                  'tfoot', 'th'})
+
+CHARSET_PATTERN = re.compile(rb'charset\s*=\s*["\']?\s*([\w-]+)', re.IGNORECASE)
+
+
+class UnsupportedMarkup(Exception):
+    """Raised when the streaming extractor cannot mirror BeautifulSoup's tree."""
+
+
+# The parser tracks each kind of element a row record is built from.
+class ListingRowExtractor(HTMLParser):  # pylint: disable=too-many-instance-attributes
+    """Streaming parser that collects row records from the first ``<tbody>``.
+
+    After ``feed``/``close``, ``rows`` holds one record per top-level ``<tr>``
+    of the first ``<tbody>``, or None if the page has no ``<tbody>``. Each
+    record is a dict with ``td_count`` (direct ``<td>`` children), ``cells``
+    (text, span texts and link hrefs per cell), ``badges`` (text of badge
+    divs) and ``paragraph`` (text of the first ``<p>`` or None).
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = None
+        self._done = False
+        self._stack = []
+        self._pending_text = []
+        self._row = None
+        self._cell = None
+        self._open_spans = []
+        self._open_badges = []
+        self._paragraph = None
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if self._done:
+            return
+        if self.rows is None:
+            if tag == 'tbody':
+                self.rows = []
+                self._stack.append(('tbody', 'tbody'))
+            return
+        if tag in UNSUPPORTED_ELEMENTS:
+            raise UnsupportedMarkup(f"<{tag}> inside the results table")
+
+        parent = self._stack[-1][0]
+        kind = None
+        if tag == 'tr':
+            if parent != 'tbody':
+                raise UnsupportedMarkup("nested <tr>")
+            self._row = {'td_count': 0, 'cells': [], 'badges': [], 'paragraph': None}
+            kind = 'tr'
+        elif parent == 'tbody':
+            raise UnsupportedMarkup(f"<{tag}> directly inside <tbody>")
+        elif tag == 'td':
+            if parent != 'tr':
+                raise UnsupportedMarkup("nested <td>")
+            self._cell = {'text': [], 'spans': [], 'hrefs': []}
+            self._row['td_count'] += 1
+            self._row['cells'].append(self._cell)
+            kind = 'td'
+        elif parent == 'tr':
+            raise UnsupportedMarkup(f"<{tag}> directly inside <tr>")
+        else:
+            kind = self._open_collector(tag, dict(attrs))
+
+        if tag not in VOID_ELEMENTS:
+            self._stack.append((tag, kind))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if self._done or self.rows is None:
+            return
+        if self._stack[-1][0] != tag:
+            raise UnsupportedMarkup(f"unexpected </{tag}>")
+
+        _, kind = self._stack.pop()
+        if kind == 'span':
+            self._open_spans.pop()
+        elif kind == 'badge':
+            self._open_badges.pop()
+        elif kind == 'p':
+            self._paragraph = None
+        elif kind == 'td':
+            self._cell = None
+        elif kind == 'tr':
+            self.rows.append(_finish_row(self._row))
+            self._row = None
+        elif kind == 'tbody':
+            self._done = True
+
+    def handle_data(self, data):
+        if self.rows is not None and not self._done:
+            self._pending_text.append(data)
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+    def handle_decl(self, decl):
+        self._flush_text()
+
+    def handle_pi(self, data):
+        self._flush_text()
+
+    def unknown_decl(self, data):
+        if self.rows is not None and not self._done:
+            raise UnsupportedMarkup("CDATA inside the results table")
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        if self.rows is not None and not self._done:
+            raise UnsupportedMarkup("unclosed <tbody>")
+
+    def _open_collector(self, tag, attrs):
+        """Start collecting text for a span, badge or paragraph inside a cell."""
+        if tag == 'span':
+            parts = []
+            self._cell['spans'].append(parts)
+            self._open_spans.append(parts)
+            return 'span'
+        if tag == 'div' and BADGE_CLASS in (attrs.get('class') or ''):
+            parts = []
+            self._row['badges'].append(parts)
+            self._open_badges.append(parts)
+            return 'badge'
+        if tag == 'p' and self._row['paragraph'] is None:
+            self._paragraph = []
+            self._row['paragraph'] = self._paragraph
+            return 'p'
+        if tag == 'a' and 'href' in attrs:
+            self._cell['hrefs'].append(attrs['href'] or '')
+        return None
+
+    def _flush_text(self):
+        """Hand the text node that just ended to every open collector."""
+        if not self._pending_text:
+            return
+        text = ''.join(self._pending_text).strip()
+        self._pending_text.clear()
+        if not text or self._cell is None:
+            return
+        self._cell['text'].append(text)
+        for parts in self._open_spans:
+            parts.append(text)
+        for parts in self._open_badges:
+            parts.append(text)
+        if self._paragraph is not None:
+            self._paragraph.append(text)
+
+
+def _finish_row(row):
+    """Join the collected text parts of a row record into strings."""
+    for cell in row['cells']:
+        cell['text'] = ''.join(cell['text'])
+        cell['spans'] = [''.join(parts) for parts in cell['spans']]
+    row['badges'] = [''.join(parts) for parts in row['badges']]
+    if row['paragraph'] is not None:
+        row['paragraph'] = ''.join(row['paragraph'])
+    return row
+
+
+def extract_listing_rows(page_data):
+    """Extract row records from a listing page with the streaming parser.
+
+    :param page_data: Raw HTML of the listing page.
+    :type page_data: bytes or str
+    :returns: Row records for the first ``<tbody>``, or None if the page has no
+        ``<tbody>`` or must be handled by the BeautifulSoup fallback.
+    :rtype: list[dict] or None
+    """
+    if isinstance(page_data, bytes):
+        declared = CHARSET_PATTERN.search(page_data, 0, 2048)
+        if declared and declared.group(1).lower() not in (b'utf-8', b'utf8'):
+            return None
+        try:
+            page_data = page_data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            return None
+
+    parser = ListingRowExtractor()
+    try:
+        parser.feed(page_data)
+        parser.close()
+    except UnsupportedMarkup:
+        return None
+    return parser.rows
+
+
+def row_from_tag(row):
+    """Build a row record from a BeautifulSoup ``<tr>`` tag.
+
+    :param row: BeautifulSoup row element, or None.
+    :type row: bs4.element.Tag or None
+    :returns: Row record in the same shape the streaming extractor produces.
+    :rtype: dict or None
+    """
+    if row is None:
+        return None
+    first_paragraph = row.find('p')
+    return {
+        'td_count': len(row.find_all('td', recursive=False)),
+        'cells': [cell_from_tag(cell) for cell in row.find_all('td')],
+        'badges': [badge.get_text(strip=True)
+                   for badge in row.find_all('div', class_=re.compile(BADGE_CLASS))],
+        'paragraph': first_paragraph.get_text(strip=True) if first_paragraph else None,
+    }
+
+
+def cell_from_tag(cell):
+    """Build a cell record from a BeautifulSoup ``<td>`` tag.
+
+    :param cell: BeautifulSoup cell element.
+    :type cell: bs4.element.Tag
+    :returns: Dict with the cell text, span texts and link hrefs.
+    :rtype: dict
+    """
+    return {
+        'text': cell.get_text(strip=True),
+        'spans': [span.get_text(strip=True) for span in cell.find_all('span')],
+        'hrefs': [link['href'] for link in cell.find_all('a', href=True)],
+    }
+
+
+def rows_from_soup(page_data):
+    """Extract row records by building a full BeautifulSoup tree.
+
+    This is the fallback for pages the streaming extractor cannot handle.
+
+    :param page_data: Raw HTML of the listing page.
+    :type page_data: bytes or str
+    :returns: Row records for the first ``<tbody>``, or None if there is none.
+    :rtype: list[dict] or None
+    """
+    soup = BeautifulSoup(page_data, 'html.parser')
+    tbody = soup.find('tbody')
+    if not tbody:
+        return None
+    return [row_from_tag(row) for row in tbody.find_all('tr', recursive=False)]
+
+
+def listing_rows(page_data):
+    """Extract row records from a listing page, by whichever path can read it.
+
+    :param page_data: Raw HTML of the listing page.
+    :type page_data: bytes or str
+    :returns: Row records for the first ``<tbody>``, or None if there is none.
+    :rtype: list[dict] or None
+    """
+    rows = extract_listing_rows(page_data)
+    if rows is None:
+        rows = rows_from_soup(page_data)
+    return rows
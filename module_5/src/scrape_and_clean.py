@@ -5,24 +5,64 @@ This module handles web scraping of graduate school admission results,
 respecting robots.txt, parsing HTML data, and performing initial data
 cleaning before further processing.
 """
+import argparse
 import json
-import re
-from datetime import datetime, date
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
+from datetime import date, timedelta
 from urllib.robotparser import RobotFileParser
 from urllib.parse import urljoin
 
 import urllib3
 import psycopg
-from bs4 import BeautifulSoup
 
-from .date_utils import infer_years, format_decision_date
+from . import pipeline_files
+from .checkpoint import ScrapeCheckpoint, cutoff_key
+from .cutoff_probe import find_cutoff_page
+from .date_utils import YearInferrer
+from .entry_writer import EntryWriter
+from .failed_pages import FailedPages
+from .listing_parser import BASE_URL, extract_rows_timed, parse_page_timed
+from .page_cache import PageCache
+from .page_fetcher import PageFetcher
+from .page_walk import PageWalk
+from .pid_index import PidIndex, load_pid_index
+from .rate_limiter import RateLimiter
+from .retry_policy import RetryPolicy
+from .robots_cache import RobotsCache
+from .scrape_metrics import ScrapeMetrics
+from .scrape_options import ScrapeOptions
 
 # --- Constants ---
-OUTPUT_FILE = 'new_structured_entries.json'
-BASE_URL = 'https://www.thegradcafe.com/'
+# JSON Lines output, gzip-compressed when the name ends in .gz.
+OUTPUT_FILE = pipeline_files.SCRAPE_OUTPUT_FILE
 ROBOTS_URL = urljoin(BASE_URL, 'robots.txt')
 TARGET_URL = urljoin(BASE_URL, 'survey/index.php')
 USER_AGENT = 'Burch'
+# robots.txt policies cached between runs; module_2's scraper shares this file.
+ROBOTS_CACHE_FILE = 'robots_cache.json'
+ROBOTS_CACHE = RobotsCache(ROBOTS_CACHE_FILE)
+FETCH_WORKERS = 4
+# Processes that parse fetched pages; 0 parses them in the scraping thread.
+PARSE_WORKERS = 0
+PROBE_CUTOFF = True
+# Directory for the on-disk page cache; None disables caching.
+PAGE_CACHE_DIR = None
+# State file for crash-safe checkpoints; None disables checkpointing.
+CHECKPOINT_FILE = None
+# Days before the newest stored date that a re-crawl checks for edited entries.
+RECRAWL_DAYS = 14
+# JSON Lines output of a re-crawl: stored entries whose content has changed.
+RECRAWL_OUTPUT_FILE = pipeline_files.RECRAWL_OUTPUT_FILE
+# Pages that still failed after retries, saved for a later pass.
+FAILED_PAGES_FILE = 'failed_pages.json'
+# Fetch and parse metrics of the last run, read by the web app.
+METRICS_FILE = 'scrape_metrics.json'
+# Whether a scrape picks up from a matching checkpoint instead of page 1.
+RESUME = False
 DB_CONN_STR = "dbname=grad_cafe user=postgres"
 
 # --- Main Entry Point for the Pipeline ---
@@ -31,7 +71,8 @@ def main(conn):
 
     This function serves as the main entry point for the scraping pipeline. It checks
     robots.txt permissions, determines the starting point for scraping based on existing
-    database data, performs the scraping operation, and saves results to a JSON file.
+    database data, performs the scraping operation, and streams results to a JSON Lines
+    file as each page is parsed.
 
     The function will start scraping from the most recent date in the database, or from
     January 1, 2020 if the database is empty (which typically yields about 44k records).
@@ -43,35 +84,263 @@ def main(conn):
     """
     print("--- Starting Scrape & Clean Step ---")
 
-    # Check for robots.txt rules.
-    rp = RobotFileParser()
-    rp.set_url(ROBOTS_URL)
-    rp.read()
-    if not rp.can_fetch(USER_AGENT, TARGET_URL):
-        print("Scraping disallowed by robots.txt. Aborting.")
+    limiter = robots_limiter()
+    if limiter is None:
         return 0
 
-    latest_date, pids_on_latest_date = get_latest_day_info(conn)
+    # The PID index makes the per-day PID query unnecessary when it is available.
+    pid_index = load_pid_index(conn)
+    latest_date, pids_on_latest_date = get_latest_day_info(conn, with_pids=pid_index is None)
 
     # Set a default latest date, currently gives about 44k records.
     if not latest_date:
         latest_date = date(2020, 1, 1)
         print(f"No existing data found. Starting initial scrape from {latest_date}.")
 
-    new_data = scrape_and_clean(latest_db_date=latest_date, pids_on_latest_date=pids_on_latest_date)
-
-    if new_data:
-        print(f"Scraping complete. Found {len(new_data)} new entries.")
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            json.dump(new_data, f, indent=4, default=str)
+    failed_pages = FailedPages()
+    metrics = ScrapeMetrics()
+    with EntryWriter(OUTPUT_FILE) as writer:
+        options = ScrapeOptions(sink=writer, limiter=limiter, retry=RetryPolicy(),
+                                failed_pages=failed_pages, pid_index=pid_index, metrics=metrics)
+        new_data = scrape_and_clean(latest_db_date=latest_date,
+                                    pids_on_latest_date=pids_on_latest_date, options=options)
+        # Anything the scraper returned instead of streaming.
+        writer.write(new_data)
+
+        # One follow-up pass over skipped pages, now that the main pass is done.
+        if failed_pages:
+            print(f"Retrying the pages that failed: {failed_pages}")
+            still_failed = FailedPages()
+            options = ScrapeOptions(limiter=limiter, retry=RetryPolicy(),
+                                    failed_pages=still_failed, pid_index=pid_index,
+                                    metrics=metrics)
+            writer.write(scrape_pages(failed_pages, latest_date, pids_on_latest_date,
+                                      options=options))
+            failed_pages = still_failed
+    save_failed_pages(failed_pages, latest_date, pids_on_latest_date, pid_index)
+    report_metrics(metrics)
+
+    if writer.count:
+        print(f"Scraping complete. Found {writer.count} new entries.")
         print(f"Successfully saved structured data to {OUTPUT_FILE}")
-        return len(new_data)
+        return writer.count
 
     print("No new entries were found.")
     return 0
 
 
-def get_latest_day_info(conn):
+def robots_limiter():
+    """Check robots.txt and build the rate limiter it asks for.
+
+    The policy comes from ``ROBOTS_CACHE`` while it is fresh.
+
+    :returns: Rate limiter honouring the site's crawl delay, or None if
+        robots.txt disallows scraping the listing.
+    :rtype: src.rate_limiter.RateLimiter or None
+    """
+    rp = RobotFileParser()
+    rp.set_url(ROBOTS_URL)
+    ROBOTS_CACHE.load(rp, ROBOTS_URL)
+    if not rp.can_fetch(USER_AGENT, TARGET_URL):
+        print("Scraping disallowed by robots.txt. Aborting.")
+        return None
+    limiter = RateLimiter.from_robots(rp, USER_AGENT)
+    print(f"Pacing requests at up to {limiter.max_rate:g} per second.")
+    return limiter
+
+
+def recrawl(conn, days=RECRAWL_DAYS):
+    """Re-fetch recent listing pages and save the stored entries that have changed since.
+
+    The regular scrape never looks below the newest stored date, and the
+    loaders skip PIDs they already have, so edits to a post (a new status or
+    decision date, say) would otherwise never be picked up. This pass scrapes
+    every row from the last ``days`` days before the newest stored date and
+    compares each row's content hash with the stored one. Only rows whose hash
+    differs are written to ``RECRAWL_OUTPUT_FILE``, for the LLM step and
+    ``load_new_data.update_changed_data``. Rows that are not stored yet are
+    left to the regular scrape, and rows stored before hashes were kept count
+    as changed once.
+
+    :param conn: Database connection for reading the stored hashes.
+    :type conn: psycopg.Connection
+    :param days: How many days back from the newest stored date to re-crawl.
+    :type days: int
+    :returns: Number of changed entries written.
+    :rtype: int
+    """
+    print("--- Starting Re-crawl Step ---")
+
+    limiter = robots_limiter()
+    if limiter is None:
+        return 0
+
+    latest_date, _ = get_latest_day_info(conn, with_pids=False)
+    if not latest_date:
+        print("No existing data found. Nothing to re-crawl.")
+        return 0
+    since = latest_date - timedelta(days=days)
+    stored_hashes = load_content_hashes(conn, since)
+    print(f"Re-crawling entries added since {since}; {len(stored_hashes)} are stored.")
+
+    failed_pages = FailedPages()
+    entries = scrape_and_clean(since, set(), options=ScrapeOptions(
+        limiter=limiter, retry=RetryPolicy(), failed_pages=failed_pages
+    ))
+    changed = changed_entries(entries, stored_hashes)
+    with EntryWriter(RECRAWL_OUTPUT_FILE) as writer:
+        writer.write(changed)
+    if failed_pages:
+        print(f"Could not fetch every page ({failed_pages}); "
+              "their rows are checked on the next re-crawl.")
+
+    print(f"Re-crawl complete. {len(changed)} of {len(entries)} entries have changed.")
+    if changed:
+        print(f"Successfully saved changed entries to {RECRAWL_OUTPUT_FILE}")
+    return len(changed)
+
+
+def load_content_hashes(conn, since):
+    """Fetch the stored content hash of every entry added on or after a date.
+
+    :param conn: Database connection for querying applicant data.
+    :type conn: psycopg.Connection
+    :param since: Earliest ``date_added`` to include.
+    :type since: datetime.date
+    :returns: Mapping of PID to stored hash; the hash is None for rows stored
+        before hashes were kept. Empty if the table cannot be read.
+    :rtype: dict[int, str or None]
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pid, content_hash FROM applicants WHERE date_added >= %s;",
+                        (since,))
+            return dict(cur.fetchall())
+    except psycopg.Error as e:
+        print(f"Database error while loading content hashes: {e}")
+        return {}
+
+
+def changed_entries(entries, stored_hashes):
+    """Keep the entries that are stored but whose content no longer matches.
+
+    :param entries: Freshly scraped entries.
+    :type entries: list[src.applicant_record.ApplicantRecord]
+    :param stored_hashes: Stored content hash by PID, from ``load_content_hashes``.
+    :type stored_hashes: dict[int, str or None]
+    :returns: Entries whose PID is stored with a different (or no) hash, in page order.
+    :rtype: list[src.applicant_record.ApplicantRecord]
+    """
+    return [entry for entry in entries
+            if entry.pid in stored_hashes and entry.content_hash() != stored_hashes[entry.pid]]
+
+
+def save_failed_pages(failed_pages, latest_db_date, pids_on_latest_date, pid_index=None):
+    """Record pages that could not be fetched so a later ``scrape_pages`` call can fill them in.
+
+    The cutoff is saved with the gaps, since the same pages must be parsed
+    against the same cutoff, and each gap keeps the date and PID bound of the
+    last entry before it. ``retry_failed_pages`` reads the record back. A run
+    with no failures removes any stale record.
+
+    :param failed_pages: Pages that still failed after retries, and where the walk gave up.
+    :type failed_pages: src.failed_pages.FailedPages
+    :param latest_db_date: Cutoff date the pages were scraped against.
+    :type latest_db_date: datetime.date
+    :param pids_on_latest_date: PIDs already stored on the cutoff date.
+    :type pids_on_latest_date: set[int]
+    :param pid_index: PID index the pages were scraped against, if any; its
+        watermark is saved so the same index can be rebuilt.
+    :type pid_index: src.pid_index.PidIndex or None
+    """
+    if not failed_pages:
+        if os.path.exists(FAILED_PAGES_FILE):
+            os.remove(FAILED_PAGES_FILE)
+        return
+    record = {
+        **failed_pages.state(),
+        'latest_db_date': latest_db_date.isoformat(),
+        'pids_on_latest_date': sorted(pids_on_latest_date),
+    }
+    if pid_index is not None:
+        record['pid_watermark'] = pid_index.watermark
+    with open(FAILED_PAGES_FILE, 'w', encoding='utf-8') as f:
+        json.dump(record, f)
+    print(f"Warning: some pages could not be fetched ({failed_pages}); "
+          f"they are listed in {FAILED_PAGES_FILE}.")
+
+
+def load_failed_pages():
+    """Read back the pages recorded by ``save_failed_pages``.
+
+    :returns: Tuple of (failed_pages, latest_db_date, pids_on_latest_date,
+        pid_index), where pid_index is rebuilt from the saved watermark, or
+        None if there is no readable record.
+    :rtype: tuple[src.failed_pages.FailedPages, datetime.date, set[int],
+        src.pid_index.PidIndex or None] or None
+    """
+    try:
+        with open(FAILED_PAGES_FILE, 'r', encoding='utf-8') as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    failed_pages = FailedPages()
+    failed_pages.restore(record)
+    pid_watermark = record.get('pid_watermark')
+    return (failed_pages, date.fromisoformat(record['latest_db_date']),
+            set(record['pids_on_latest_date']),
+            PidIndex(pid_watermark) if pid_watermark is not None else None)
+
+
+def retry_failed_pages():
+    """Fill in the pages an earlier run recorded in ``FAILED_PAGES_FILE``.
+
+    The pages are scraped with ``scrape_pages`` against the cutoff they were
+    recorded with, and the entries are written to ``OUTPUT_FILE`` for the
+    loader. Pages that fail again are recorded in place of the old ones.
+
+    :returns: Number of entries written.
+    :rtype: int
+    """
+    print("--- Retrying Failed Pages ---")
+    saved = load_failed_pages()
+    if saved is None:
+        print(f"No failed pages are recorded in {FAILED_PAGES_FILE}.")
+        return 0
+    limiter = robots_limiter()
+    if limiter is None:
+        return 0
+
+    failed_pages, latest_date, pids_on_latest_date, pid_index = saved
+    still_failed = FailedPages()
+    with EntryWriter(OUTPUT_FILE) as writer:
+        writer.write(scrape_pages(failed_pages, latest_date, pids_on_latest_date, options=(
+            ScrapeOptions(limiter=limiter, retry=RetryPolicy(), failed_pages=still_failed,
+                          pid_index=pid_index)
+        )))
+    save_failed_pages(still_failed, latest_date, pids_on_latest_date, pid_index)
+    print(f"Filled in {writer.count} entries from the failed pages.")
+    return writer.count
+
+
+def report_metrics(metrics):
+    """Save a run's metrics to ``METRICS_FILE`` and print where its time went.
+
+    :param metrics: Metrics collected during the run.
+    :type metrics: src.scrape_metrics.ScrapeMetrics
+    :returns: The summary that was saved.
+    :rtype: dict
+    """
+    summary = metrics.write(METRICS_FILE)
+    fetch, parse = summary['histograms']['fetch_seconds'], summary['histograms']['parse_seconds']
+    print(f"Fetched {summary['pages']['fetched']} pages (p50 {fetch['p50']}s, "
+          f"p90 {fetch['p90']}s), parsed {summary['pages']['parsed']} "
+          f"(p50 {parse['p50']}s), {summary['retries']} retries; "
+          f"details in {METRICS_FILE}.")
+    return summary
+
+
+def get_latest_day_info(conn, with_pids=True):
     """Get the most recent entry date from database and all PIDs from that date.
 
     This function queries the database to find the latest date_added value and
@@ -81,6 +350,9 @@ def get_latest_day_info(conn):
 
     :param conn: Database connection for querying applicant data.
     :type conn: psycopg.Connection
+    :param with_pids: Whether to look up the PIDs on the latest date; a scrape
+        deduplicating with a ``PidIndex`` does not need them.
+    :type with_pids: bool
     :returns: Tuple of (latest_date, set_of_pids) or (None, empty_set) if no data or error.
     :rtype: tuple[datetime.date, set[int]]
     """
@@ -92,6 +364,9 @@ def get_latest_day_info(conn):
 
             if not latest_date:
                 return None, set()
+            if not with_pids:
+                print(f"Most recent entry date: {latest_date}.")
+                return latest_date, set()
 
             cur.execute("SELECT pid FROM applicants WHERE date_added = %s;", (latest_date,))
             pids_on_date = {row[0] for row in cur.fetchall()}
@@ -104,218 +379,394 @@ def get_latest_day_info(conn):
         return None, set()
 
 
-def scrape_and_clean(latest_db_date=None, pids_on_latest_date=None, page_limit=100):
-    """Scrape and parse graduate school application data from the target website.
-
-    This function performs the core scraping logic, fetching pages sequentially
-    and parsing HTML to extract structured application data. It stops scraping
-    when it encounters entries older than the latest database date to avoid
-    processing unnecessary historical data.
-
-    The function handles duplicate detection by checking PIDs against those
-    already present on the latest database date, and includes comprehensive
-    error handling for network issues and malformed HTML.
-
-    :param latest_db_date: Most recent date in database; scraping stops when older entries found.
-    :type latest_db_date: datetime.date
-    :param pids_on_latest_date: Set of PIDs already present on the latest database date.
-    :type pids_on_latest_date: set[int]
-    :param page_limit: Maximum number of pages to scrape before stopping.
-    :type page_limit: int
-    :returns: List of dictionaries containing structured entry data for new records.
-    :rtype: list[dict]
+def make_fetcher(pool_size, cache=None, limiter=None, retry=None, metrics=None):
+    """Build the page fetcher shared by every scraping path.
+
+    :param pool_size: Number of connections kept open in the pool.
+    :type pool_size: int
+    :param cache: Page cache for conditional requests; when None, a cache in
+        ``PAGE_CACHE_DIR`` is used if that directory is set.
+    :type cache: src.page_cache.PageCache or None
+    :param limiter: Rate limiter shared by every request the fetcher makes.
+    :type limiter: src.rate_limiter.RateLimiter or None
+    :param retry: Retry policy for failed requests, with its budget shared by every worker.
+    :type retry: src.retry_policy.RetryPolicy or None
+    :param metrics: Collector told about every fetch the fetcher makes.
+    :type metrics: src.scrape_metrics.ScrapeMetrics or None
+    :returns: Fetcher for the listing pages.
+    :rtype: src.page_fetcher.PageFetcher
     """
-    # pylint: disable=too-many-locals,too-many-branches,too-many-statements
-    if pids_on_latest_date is None:
-        pids_on_latest_date = set()
+    if cache is None and PAGE_CACHE_DIR:
+        cache = PageCache(PAGE_CACHE_DIR)
+    return PageFetcher(urllib3.PoolManager(maxsize=pool_size), TARGET_URL, USER_AGENT,
+                       cache, limiter, retry, metrics)
+
+
+def fetch_pages_in_order(fetcher, page_numbers, max_workers=FETCH_WORKERS):
+    """Fetch pages concurrently and yield them back in page order.
+
+    Up to ``max_workers`` pages are kept in flight on a thread pool. Results
+    are yielded strictly in the order of ``page_numbers``, so the caller sees
+    exactly the sequence the sequential loop would have produced. Closing the
+    generator cancels any fetches that have not started yet.
+
+    :param fetcher: Page fetcher shared by every worker.
+    :type fetcher: src.page_fetcher.PageFetcher
+    :param page_numbers: Page numbers to fetch, in the order they should be yielded.
+    :type page_numbers: iterable[int]
+    :param max_workers: Maximum number of pages fetched at the same time.
+    :type max_workers: int
+    :yields: Tuples of (page_num, page_data) where page_data is None on failure.
+    :rtype: iterator[tuple[int, bytes or None]]
+    """
+    pages = iter(page_numbers)
+    in_flight = deque()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
 
-    http = urllib3.PoolManager()
-    new_entries = []
-    stop_scraping = False
+    def submit(page_num):
+        in_flight.append((page_num, executor.submit(fetcher.fetch, page_num)))
 
-    # Goes out to the page limit, the default is 100.
-    for page_num in range(1, page_limit + 1):
-        if stop_scraping:
-            break
-
-        url = f'{TARGET_URL}?page={page_num}'
-        print(f"Scraping page {page_num}...")
-        try:
-            response = http.request('GET', url, headers={'User-Agent': USER_AGENT})
-            if response.status != 200:
-                print(f"Failed to fetch page {page_num}. Status: {response.status}")
+    try:
+        for page_num in pages:
+            submit(page_num)
+            if len(in_flight) >= max_workers:
                 break
-        except urllib3.exceptions.MaxRetryError as e:
-            print(f"Network error while fetching page {page_num}: {e}")
-            break
 
-        # Parse out the page to get just the data in the table.
-        soup = BeautifulSoup(response.data, 'html.parser')
-        tbody = soup.find('tbody')
-        if not tbody:
-            print("Could not find the results table (tbody) on the page.")
-            break
+        while in_flight:
+            page_num, future = in_flight.popleft()
+            data = future.result()
 
-        all_rows = tbody.find_all('tr', recursive=False)
-        main_rows = [row for row in all_rows if len(row.find_all('td', recursive=False)) > 1]
+            # Refill the window before handing the page back to the caller.
+            next_page = next(pages, None)
+            if next_page is not None:
+                submit(next_page)
 
-        if not main_rows:
-            print("No valid entry rows found on this page. Reached the end.")
-            break
+            yield page_num, data
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
-        page_date_strings = [row.find_all('td')[2].get_text(strip=True) for row in main_rows]
-        corrected_dates = infer_years(page_date_strings)
 
-        # Look at the dates to make sure we are only adding new data.
-        for i, row in enumerate(main_rows):
-            date_added_str = corrected_dates[i]
+def parse_pages_in_order(pages, latest_db_date, pids_on_latest_date, options, year_inferrer):
+    """Parse fetched pages, optionally on a process pool, and yield them in page order.
 
-            current_entry_date = datetime.strptime(date_added_str, '%Y-%m-%d').date()
+    Fetching is I/O-bound but parsing is CPU-bound, so with
+    ``options.parse_workers`` set the HTML of each page is walked in a
+    separate process. At most twice as many pages as there are workers wait
+    to be parsed; until one is handed back, no more pages are taken from
+    ``pages``, which in turn stops the fetch workers from running further ahead.
 
-            if latest_db_date and current_entry_date < latest_db_date:
-                stop_scraping = True
-                print(f"Found entry from {current_entry_date}, which is older than "
-                      f"the cutoff date ({latest_db_date}). Stopping scrape.")
-                break
+    The extracted rows come back to this thread, where every page, pooled or
+    not, is dated with one ``YearInferrer``: year-less dates at the top of a
+    page take their year from the page before, whichever path parsed it.
 
-            cells = row.find_all('td')
+    :param pages: Iterator of (page_num, page_data) tuples, as produced by
+        ``fetch_pages_in_order``.
+    :type pages: iterator[tuple[int, bytes or None]]
+    :param latest_db_date: Most recent date in database; parsing stops at older entries.
+    :type latest_db_date: datetime.date or None
+    :param pids_on_latest_date: Set of PIDs already present on the latest database date.
+    :type pids_on_latest_date: set[int]
+    :param options: The scrape's parser process count (0 or 1 parses in this
+        thread), PID index and metrics collector.
+    :type options: src.scrape_options.ScrapeOptions
+    :param year_inferrer: Year context shared by the scrape's pages, restored
+        from the checkpoint when the scrape resumes.
+    :type year_inferrer: src.date_utils.YearInferrer
+    :yields: Tuples of (page_num, page_entries, keep_going) where page_entries is
+        None for a page that could not be fetched; the caller decides whether
+        to skip it or stop.
+    :rtype: iterator[tuple[int, list[src.applicant_record.ApplicantRecord] or None, bool]]
+    """
+    def parsed(page_num, page_data, extracted=None):
+        page_entries, keep_going, stats = parse_page_timed(
+            page_data, latest_db_date, pids_on_latest_date, options.pid_index, year_inferrer,
+            extracted
+        )
+        if options.metrics:
+            options.metrics.record_parse(stats)
+        return page_num, page_entries, keep_going
+
+    if options.parse_workers <= 1:
+        for page_num, page_data in pages:
+            if page_data is None:
+                yield page_num, None, False
+            else:
+                yield parsed(page_num, page_data)
+        return
+
+    # Spawned workers do not inherit the fetch threads' locks the way forked ones would.
+    executor = ProcessPoolExecutor(max_workers=options.parse_workers,
+                                   mp_context=multiprocessing.get_context('spawn'))
+    queued = deque()
+
+    def next_result():
+        page_num, future = queued.popleft()
+        if future is None:
+            return page_num, None, False
+        return parsed(page_num, None, future.result())
 
-            url_tag = cells[4].find('a', href=re.compile(r'/result/\d+'))
-            url = urljoin(BASE_URL, url_tag['href']) if url_tag else ''
-            pid_match = re.search(r'/(\d+)', url)
-            if not pid_match:
+    try:
+        for page_num, page_data in pages:
+            if page_data is None:
+                queued.append((page_num, None))
                 continue
+            queued.append((page_num, executor.submit(extract_rows_timed, page_data)))
+            if len(queued) >= 2 * options.parse_workers:
+                yield next_result()
 
-            pid = int(pid_match.group(1))
+        while queued:
+            yield next_result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
-            if current_entry_date == latest_db_date and pid in pids_on_latest_date:
-                continue
 
-            # Process the entry
-            entry = process_table_row(row, cells, pid, url, date_added_str)
-            new_entries.append(entry)
+def scrape_and_clean(latest_db_date=None, pids_on_latest_date=None, page_limit=100, options=None):
+    """Scrape and parse graduate school application data from the target website.
 
-    return new_entries
+    This function performs the core scraping logic, fetching several pages at
+    once and parsing them in page order to extract structured application data.
+    It stops scraping when it encounters entries older than the latest database
+    date to avoid processing unnecessary historical data, and cancels any
+    fetches queued past that point.
 
-def process_table_row(row, cells, pid, url, date_added_str):
-    """Process a single table row and extract entry data.
+    When resuming from a known date, a short probe first locates the page where
+    entries become older than that date, so the whole range up to it can be
+    fetched in parallel instead of being discovered one page at a time. If
+    entries posted since the probe push the cutoff further down, the walk
+    carries on past that page one page at a time, up to ``page_limit``.
 
-    :param row: BeautifulSoup row element
-    :param cells: List of td cells from the row
-    :param pid: Program ID
-    :param url: URL for the entry
-    :param date_added_str: Date string for when entry was added
-    :returns: Dictionary containing the entry data
+    The function handles duplicate detection by checking PIDs against those
+    already present on the latest database date, or against ``pid_index`` when
+    one is given, and includes comprehensive error handling for network issues
+    and malformed HTML.
+
+    A page that cannot be fetched ends the scrape, unless ``failed_pages`` is
+    given: then its number is recorded there and the scrape moves on, giving up
+    only after ``MAX_FAILED_IN_A_ROW`` failures in a row, when the range left
+    unwalked is recorded instead (see ``PageWalk``).
+
+    With a checkpoint, the entries scraped so far are saved every
+    ``CHECKPOINT_EVERY`` pages and whenever the scrape stops, including on an
+    exception. A resumed scrape with the same cutoff continues after the last
+    saved page instead of starting from page 1.
+
+    :param latest_db_date: Most recent date in database; scraping stops when older entries found.
+    :type latest_db_date: datetime.date
+    :param pids_on_latest_date: Set of PIDs already present on the latest database date.
+    :type pids_on_latest_date: set[int]
+    :param page_limit: Maximum number of pages to scrape before stopping.
+    :type page_limit: int
+    :param options: How to scrape; unset settings come from ``FETCH_WORKERS``,
+        ``PROBE_CUTOFF``, ``PARSE_WORKERS``, ``CHECKPOINT_FILE`` and ``RESUME``.
+    :type options: src.scrape_options.ScrapeOptions or None
+    :returns: Entry records for new results; empty when the entries were
+        streamed to ``options.sink``.
+    :rtype: list[src.applicant_record.ApplicantRecord]
     """
-    # Find detail and comment rows
-    detail_row = row.find_next_sibling('tr')
-    comment_row = None
-    if detail_row and len(detail_row.find_all('td', recursive=False)) == 1:
-        comment_row_candidate = detail_row.find_next_sibling('tr')
-        if (comment_row_candidate and \
-            len(comment_row_candidate.find_all('td', recursive=False)) == 1):
-            comment_row = comment_row_candidate
-
-    # Parse status and decision date
-    status, decision_date_str = parse_status_and_date(cells[3])
-
-    # Extract program information directly
-    degree_spans = cells[1].find_all('span')
-
-    # Build entry dictionary with inline extraction
-    entry = {
-        'pid': pid,
-        'university': cells[0].get_text(strip=True),
-        'program': cells[1].find('span').get_text(strip=True) if cells[1].find('span') else '',
-        'degree': degree_spans[-1].get_text(strip=True) if len(degree_spans) > 1 else '',
-        'status': status,
-        'date_added': date_added_str,
-        'decision_date': format_decision_date(
-            decision_date_str,
-            int(date_added_str.split('-')[0]) if date_added_str else None
-        ),
-        'url': url,
-        'comments': (comment_row.find('p').get_text(strip=True) 
-                    if comment_row and comment_row.find('p') else None)
-    }
+    if pids_on_latest_date is None:
+        pids_on_latest_date = set()
+    options = (options or ScrapeOptions()).with_defaults(
+        page_limit=page_limit, max_workers=FETCH_WORKERS, probe=PROBE_CUTOFF,
+        parse_workers=PARSE_WORKERS,
+        checkpoint=ScrapeCheckpoint(CHECKPOINT_FILE) if CHECKPOINT_FILE else None,
+        resume=RESUME,
+    )
+
+    fetcher = make_fetcher(options.max_workers, options.cache, options.limiter, options.retry,
+                           options.metrics)
+    new_entries = []
+    walk = PageWalk(options.sink.write if options.sink else new_entries.extend,
+                    options.failed_pages, options.checkpoint, YearInferrer())
+    page_range = plan_pages(fetcher, walk, latest_db_date, pids_on_latest_date, options)
+    if page_range is None:
+        return new_entries
+
+    pages = fetch_planned_pages(fetcher, *page_range, options)
+    parsed = parse_pages_in_order(pages, latest_db_date, pids_on_latest_date, options,
+                                  walk.year_inferrer)
+    # Leaving the walk closes both streams, cancelling queued fetches and parses.
+    with closing(pages), closing(parsed):
+        walk.run(parsed)
+    return new_entries
 
-    # Update with parsed details
-    entry.update(parse_details_from_badges(detail_row))
-    return entry
 
-def parse_status_and_date(tag):
-    """Extract application status and decision date from HTML table cell.
+def plan_pages(fetcher, walk, latest_db_date, pids_on_latest_date, options):
+    """Decide which pages a scrape walks, resuming from its checkpoint when asked to.
 
-    This function parses the status/decision cell from the scraped HTML table,
-    extracting both the application status (Accepted, Rejected, Interview, etc.)
-    and the decision date if present. It uses text analysis and regex patterns
-    to identify these components from the formatted cell content.
+    :param fetcher: Page fetcher, used to probe for the cutoff page.
+    :type fetcher: src.page_fetcher.PageFetcher
+    :param walk: The scrape's page walk; a resume hands it the saved progress.
+    :type walk: src.page_walk.PageWalk
+    :param latest_db_date: Most recent date in database.
+    :type latest_db_date: datetime.date or None
+    :param pids_on_latest_date: Set of PIDs already present on the latest database date.
+    :type pids_on_latest_date: set[int]
+    :param options: The scrape's options, with every setting (and the page
+        limit) filled in.
+    :type options: src.scrape_options.ScrapeOptions
+    :returns: Tuple of (first_page, last_page), or None if a resumed scrape
+        had already finished.
+    :rtype: tuple[int, int] or None
+    """
+    pid_index = options.pid_index
+    cutoff = cutoff_key(latest_db_date, pids_on_latest_date, options.page_limit,
+                        pid_index.watermark if pid_index is not None else None)
+    progress = options.checkpoint.load(cutoff) if options.checkpoint and options.resume else {}
+    if progress:
+        return walk.resume(cutoff, progress)
 
-    :param tag: BeautifulSoup tag containing the status and date information.
-    :type tag: bs4.element.Tag
-    :returns: Tuple of (status_string, decision_date_string) where date may be None.
-    :rtype: tuple[str, str]
+    # Goes out to the page limit, the default is 100.
+    last_page = options.page_limit
+    if options.probe and latest_db_date:
+        last_page = find_cutoff_page(fetcher, latest_db_date, options.page_limit)
+    walk.start(cutoff, last_page)
+    return 1, last_page
+
+
+def fetch_planned_pages(fetcher, first_page, last_page, options):
+    """Fetch the planned pages in order, then any pages the listing has shifted past them.
+
+    The planned range is fetched ``options.max_workers`` at a time. Pages
+    after ``last_page`` are only requested if the walk asks for them, which
+    it does when the cutoff was not on ``last_page`` after all; they are
+    fetched one at a time, since the cutoff is then expected close by.
+
+    :param fetcher: Page fetcher shared by every worker.
+    :type fetcher: src.page_fetcher.PageFetcher
+    :param first_page: First page to fetch.
+    :type first_page: int
+    :param last_page: Last page of the planned range, from the probe or the page limit.
+    :type last_page: int
+    :param options: The scrape's options, with every setting filled in.
+    :type options: src.scrape_options.ScrapeOptions
+    :yields: Tuples of (page_num, page_data) where page_data is None on failure.
+    :rtype: iterator[tuple[int, bytes or None]]
+    """
+    yield from fetch_pages_in_order(fetcher, range(first_page, last_page + 1),
+                                    options.max_workers)
+    if last_page < options.page_limit:
+        yield from fetch_pages_in_order(fetcher, range(last_page + 1, options.page_limit + 1), 1)
+
+
+def scrape_pages(failed_pages, latest_db_date=None, pids_on_latest_date=None, page_limit=100,
+                 options=None):
+    """Fetch and parse the pages an earlier pass could not fetch.
+
+    Each skipped page is parsed on its own against the cutoff, so a page that
+    reaches past the cutoff contributes its newer rows without stopping the
+    others. If the earlier walk gave up, it is continued from the page it gave
+    up at, down to the cutoff or ``page_limit``. Rows at or above the bound of
+    their gap were collected by the earlier pass and are left out.
+
+    :param failed_pages: Pages the earlier pass skipped, and where it gave up.
+    :type failed_pages: src.failed_pages.FailedPages
+    :param latest_db_date: Most recent date in database; older entries are left out.
+    :type latest_db_date: datetime.date or None
+    :param pids_on_latest_date: Set of PIDs already present on the latest database date.
+    :type pids_on_latest_date: set[int] or None
+    :param page_limit: Last page a continued walk may reach.
+    :type page_limit: int
+    :param options: Workers, rate limiter, retry policy, PID index and metrics
+        to scrape with; ``options.failed_pages`` receives the pages that failed again.
+    :type options: src.scrape_options.ScrapeOptions or None
+    :returns: Entry records for new results.
+    :rtype: list[src.applicant_record.ApplicantRecord]
     """
+    if pids_on_latest_date is None:
+        pids_on_latest_date = set()
+    options = (options or ScrapeOptions()).with_defaults(
+        page_limit=page_limit, max_workers=FETCH_WORKERS, parse_workers=PARSE_WORKERS
+    )
 
-    text = tag.get_text(strip=True)
-    status, decision_date_str = 'Other', None
-    if 'Accepted' in text:
-        status = 'Accepted'
-    elif 'Rejected' in text:
-        status = 'Rejected'
-    elif 'Interview' in text:
-        status = 'Interview'
-    elif 'Wait listed' in text:
-        status = 'Wait listed'
-    date_match = re.search(r'on\s+(.*)', text, re.IGNORECASE)
-    if date_match:
-        decision_date_str = date_match.group(1).strip()
-    return status, decision_date_str
-
-def parse_details_from_badges(row):
-    """Extract applicant details (GPA, GRE scores, student type, etc.) from HTML badge elements.
-
-    This function parses the detail row that contains applicant information displayed
-    as badge elements (div tags with specific classes). It extracts numerical values
-    like GPA and GRE scores, as well as categorical information like student type
-    and semester/year information.
-
-    :param row: BeautifulSoup element containing the detail row with badge information.
-    :type row: bs4.element.Tag
-    :returns: Dictionary containing parsed applicant details with None for missing values.
-    :rtype: dict
+    fetcher = make_fetcher(options.max_workers, limiter=options.limiter, retry=options.retry,
+                           metrics=options.metrics)
+    new_entries = []
+    with closing(fetch_pages_in_order(fetcher, failed_pages.pages, options.max_workers)) as pages:
+        for page_num, page_data in pages:
+            if page_data is None:
+                if options.failed_pages is not None:
+                    options.failed_pages.add(page_num, failed_pages.bounds.get(page_num))
+                continue
+            page_entries, _, stats = parse_page_timed(page_data, latest_db_date,
+                                                      pids_on_latest_date, options.pid_index)
+            if options.metrics:
+                options.metrics.record_parse(stats)
+            new_entries.extend(failed_pages.missing(page_num, page_entries))
+    if failed_pages.gave_up_at is not None:
+        new_entries.extend(continue_walk(fetcher, failed_pages, latest_db_date,
+                                         pids_on_latest_date, options))
+    return new_entries
+
+
+def continue_walk(fetcher, failed_pages, latest_db_date, pids_on_latest_date, options):
+    """Walk on from the page an earlier walk gave up at, until the cutoff.
+
+    The year context starts from the last entry the earlier walk collected,
+    so year-less dates on the continued pages are read as the walk would have.
+
+    :param fetcher: Page fetcher to fetch the remaining pages with.
+    :type fetcher: src.page_fetcher.PageFetcher
+    :param failed_pages: Pages the earlier pass skipped, and where it gave up.
+    :type failed_pages: src.failed_pages.FailedPages
+    :param latest_db_date: Most recent date in database.
+    :type latest_db_date: datetime.date or None
+    :param pids_on_latest_date: Set of PIDs already present on the latest database date.
+    :type pids_on_latest_date: set[int]
+    :param options: Scrape options, with defaults already filled in.
+    :type options: src.scrape_options.ScrapeOptions
+    :returns: Entry records the earlier walk did not reach.
+    :rtype: list[src.applicant_record.ApplicantRecord]
     """
-    details = {'gpa': None, 'gre': None, 'gre_v': None, 'gre_aw': None,
-               'student_type': None, 'semester_and_year': None}
-    if not row:
-        return details
-    badges = row.find_all('div', class_=re.compile(r'tw-inline-flex'))
-    for badge in badges:
-        text = badge.get_text(strip=True)
-        if 'GPA' in text:
-            match = re.search(r'[\d\.]+', text)
-            if match:
-                details['gpa'] = float(match.group(0))
-        elif 'GRE V' in text:
-            match = re.search(r'[\d\.]+', text)
-            if match:
-                details['gre_v'] = int(match.group(0))
-        elif 'GRE AW' in text:
-            match = re.search(r'[\d\.]+', text)
-            if match:
-                details['gre_aw'] = float(match.group(0))
-        elif 'GRE' in text:
-            match = re.search(r'[\d\.]+', text)
-            if match:
-                details['gre'] = int(match.group(0))
-        elif text in ['International', 'American', 'Other URM']:
-            details['student_type'] = text
-        elif 'Fall' in text or 'Spring' in text:
-            details['semester_and_year'] = text
-    return details
+    first_page = failed_pages.gave_up_at
+    bound = failed_pages.bounds.get(first_page)
+    collected = []
+    walk = PageWalk(lambda entries: collected.extend(failed_pages.missing(first_page, entries)),
+                    options.failed_pages, None, YearInferrer())
+    if bound:
+        walk.last_bound = bound
+        walk.year_inferrer.restore({'year': int(bound['date_added'][:4]),
+                                    'previous': bound['date_added']})
+
+    pages = fetch_pages_in_order(fetcher, range(first_page, options.page_limit + 1),
+                                 options.max_workers)
+    parsed = parse_pages_in_order(pages, latest_db_date, pids_on_latest_date, options,
+                                  walk.year_inferrer)
+    with closing(pages), closing(parsed):
+        walk.run(parsed)
+    return collected
+
 
 # This function underlying is tested but __main__ can't be tested with pytest.
 if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Scrape new Grad Cafe entries.")
+    parser.add_argument("--output", default=OUTPUT_FILE,
+                        help="JSON Lines file for new entries; a .gz name writes it compressed.")
+    parser.add_argument("--cache-dir", default=PAGE_CACHE_DIR,
+                        help="Keep fetched pages in this directory and revalidate them.")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                        help="Parse pages on this many processes instead of the scraping thread.")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE,
+                        help="Save progress to this file so an interrupted scrape can resume.")
+    parser.add_argument("--resume", action="store_true", default=RESUME,
+                        help="Continue from the checkpoint instead of starting at page 1.")
+    parser.add_argument("--recrawl", type=int, nargs="?", const=RECRAWL_DAYS, metavar="DAYS",
+                        help="Re-crawl the last DAYS days of stored entries and save the "
+                             f"ones that changed to {RECRAWL_OUTPUT_FILE}.")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help=f"Fill in the pages an earlier run listed in {FAILED_PAGES_FILE} "
+                             "instead of scraping new entries.")
+    args = parser.parse_args()
+    OUTPUT_FILE = args.output
+    PAGE_CACHE_DIR = args.cache_dir
+    CHECKPOINT_FILE = args.checkpoint
+    RESUME = args.resume
+    PARSE_WORKERS = args.parse_workers
     print("Running scrape_and_clean.py as a standalone script...")
+    if args.retry_failed:
+        retry_failed_pages()
+        raise SystemExit(0)
     with psycopg.connect(DB_CONN_STR) as connection:
-        main(connection)
+        if args.recrawl is not None:
+            recrawl(connection, args.recrawl)
+        else:
+            main(connection)
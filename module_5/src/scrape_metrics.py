@@ -0,0 +1,234 @@
+"""
+Module for per-page scrape metrics and the run summary built from them.
+
+A slow pull can have three causes: the network (slow or large responses),
+the parser (CPU time per page), or the site itself (errors, throttling and
+retries). ``ScrapeMetrics`` records enough about every page to tell them
+apart. ``PageFetcher`` reports each fetch with its latency, its size on the
+wire and decoded, and the statuses it got back. The parse step reports its
+CPU time and how many rows were new, already stored, or past the cutoff.
+
+Values are aggregated into fixed-bucket histograms, so the memory a run
+needs does not grow with the number of pages. ``summary`` condenses them into
+a JSON-friendly dict that ``write`` saves as the run summary, and the Flask
+app serves the last one from ``load_summary``.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+# Upper bounds of the latency buckets, in seconds.
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Upper bounds of the response size buckets, in bytes.
+BYTES_BUCKETS = (1024, 4096, 16384, 32768, 65536, 131072, 262144, 524288, 1048576)
+# Upper bounds of the rows-per-page buckets.
+ROWS_BUCKETS = (0, 5, 10, 15, 20, 25, 30, 40, 50)
+
+
+class Histogram:
+    """Counts of observed values in fixed buckets, plus their count, sum, min and max.
+
+    :param bounds: Ascending upper bounds of the buckets; values above the last
+        bound fall into a final overflow bucket.
+    :type bounds: tuple[float]
+    """
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Record one observation.
+
+        :param value: Observed value.
+        :type value: float
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction):
+        """Estimate a percentile as the upper bound of the bucket it falls in.
+
+        :param fraction: Percentile as a fraction, e.g. 0.9.
+        :type fraction: float
+        :returns: The bucket bound, the largest value for the overflow bucket,
+            or None before any observation.
+        :rtype: float or None
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        """Return the histogram as a JSON-friendly dict.
+
+        :returns: Dict with ``count``, ``sum``, ``mean``, ``min``, ``max``,
+            ``p50``, ``p90``, ``p99`` and ``buckets``, which maps each upper
+            bound (``"+Inf"`` for the overflow bucket) to its count.
+        :rtype: dict
+        """
+        buckets = {str(bound): count for bound, count in zip(self.bounds, self.counts)}
+        buckets['+Inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'mean': round(self.total / self.count, 6) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+            'buckets': buckets,
+        }
+
+
+# One histogram or counter per reported metric, so the attributes mirror the summary.
+class ScrapeMetrics:  # pylint: disable=too-many-instance-attributes
+    """Thread-safe collector of the fetch and parse metrics of one scrape run.
+
+    One instance is shared by every fetch thread and the parse loop.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.fetch_seconds = Histogram(SECONDS_BUCKETS)
+        self.response_bytes = Histogram(BYTES_BUCKETS)
+        self.parse_seconds = Histogram(SECONDS_BUCKETS)
+        self.rows_per_page = Histogram(ROWS_BUCKETS)
+        self.pages = {'fetched': 0, 'not_modified': 0, 'cached': 0, 'failed': 0, 'parsed': 0}
+        self.rows = {'new': 0, 'duplicate': 0, 'past_cutoff': 0}
+        self.statuses = {}
+        self.retries = 0
+        self.decoded_bytes = 0
+        self._lock = threading.Lock()
+
+    def record_response(self, status):
+        """Count one answer from the site.
+
+        :param status: HTTP status, or ``'network_error'`` when no answer came.
+        :type status: int or str
+        """
+        with self._lock:
+            key = str(status)
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+
+    # The byte and retry counts are keyword-only and only some outcomes carry them.
+    # pylint: disable-next=too-many-arguments
+    def record_fetch(self, outcome, seconds=None, *, wire_bytes=0, decoded_bytes=0, retries=0):
+        """Record how one page fetch ended.
+
+        :param outcome: ``'fetched'``, ``'not_modified'``, ``'cached'`` (served
+            from the cache without a request) or ``'failed'``.
+        :type outcome: str
+        :param seconds: Time from sending the final request to reading the body.
+        :type seconds: float or None
+        :param wire_bytes: Body size as sent over the network, before decoding.
+        :type wire_bytes: int
+        :param decoded_bytes: Body size after decoding.
+        :type decoded_bytes: int
+        :param retries: Requests repeated before this outcome.
+        :type retries: int
+        """
+        with self._lock:
+            self.pages[outcome] += 1
+            self.retries += retries
+            if seconds is not None:
+                self.fetch_seconds.add(seconds)
+            if outcome == 'fetched':
+                self.response_bytes.add(wire_bytes)
+                self.decoded_bytes += decoded_bytes
+
+    def record_parse(self, stats):
+        """Record the parse statistics of one page.
+
+        :param stats: Dict with ``seconds``, ``rows``, ``new``, ``duplicate``
+            and ``past_cutoff`` keys, as filled in by ``parse_listing_page``.
+        :type stats: dict
+        """
+        with self._lock:
+            self.pages['parsed'] += 1
+            self.parse_seconds.add(stats['seconds'])
+            self.rows_per_page.add(stats['rows'])
+            for key in self.rows:
+                self.rows[key] += stats[key]
+
+    def summary(self):
+        """Return the run summary as a JSON-friendly dict.
+
+        ``time_split`` adds up the time spent waiting on responses and parsing
+        pages; fetches overlap, so it is not a share of the wall-clock time.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'started_at': datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+                'wall_seconds': round(time.time() - self.started_at, 3),
+                'pages': dict(self.pages),
+                'rows': dict(self.rows),
+                'statuses': dict(self.statuses),
+                'retries': self.retries,
+                'decoded_bytes': self.decoded_bytes,
+                'time_split': {
+                    'fetch_seconds': round(self.fetch_seconds.total, 3),
+                    'parse_seconds': round(self.parse_seconds.total, 3),
+                },
+                'histograms': {
+                    'fetch_seconds': self.fetch_seconds.summary(),
+                    'response_bytes': self.response_bytes.summary(),
+                    'parse_seconds': self.parse_seconds.summary(),
+                    'rows_per_page': self.rows_per_page.summary(),
+                },
+            }
+
+    def write(self, path):
+        """Save the run summary as JSON, replacing the previous run's.
+
+        The summary is informational, so a file that cannot be written is
+        reported and the run carries on.
+
+        :param path: Summary file path.
+        :type path: str
+        :returns: The summary, whether or not it could be saved.
+        :rtype: dict
+        """
+        summary = self.summary()
+        tmp_path = f'{path}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not save the scrape metrics to {path}: {e}")
+        return summary
+
+
+def load_summary(path):
+    """Read the last run summary written by ``ScrapeMetrics.write``.
+
+    :param path: Summary file path.
+    :type path: str
+    :returns: The summary, or None if there is no readable summary.
+    :rtype: dict or None
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,78 @@
+"""
+Module for the options shared by every scraping entry point.
+
+``scrape_and_clean`` and ``scrape_pages`` both take one ``ScrapeOptions``
+instead of a long list of keyword arguments. It holds how a scrape runs
+(concurrency, probing, checkpointing) and the helpers it reports to (the
+entry sink, the failed-page record, the metrics collector). Settings left as
+None are filled in from ``scrape_and_clean``'s module settings when the
+scrape starts.
+"""
+import copy
+
+
+class ScrapeOptions:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """How one scrape runs, and where it sends what it finds.
+
+    Every argument is keyword-only and optional. ``page_limit`` is not one of
+    them: ``scrape_and_clean`` keeps it as its own argument and fills it in here.
+
+    :param max_workers: Number of pages fetched concurrently; 1 fetches sequentially.
+    :type max_workers: int or None
+    :param probe: Whether to locate the cutoff page before scraping.
+    :type probe: bool or None
+    :param parse_workers: Number of processes parsing pages; 0 or 1 parses in
+        the scraping thread.
+    :type parse_workers: int or None
+    :param cache: Page cache for conditional requests; see ``make_fetcher``.
+    :type cache: src.page_cache.PageCache or None
+    :param checkpoint: Where to save progress so an interrupted scrape can resume.
+    :type checkpoint: src.checkpoint.ScrapeCheckpoint or None
+    :param resume: Whether to continue from a matching checkpoint.
+    :type resume: bool or None
+    :param sink: Where to stream each page's entries instead of collecting them.
+    :type sink: src.entry_writer.EntryWriter or None
+    :param limiter: Rate limiter pacing every request, including the probe.
+    :type limiter: src.rate_limiter.RateLimiter or None
+    :param retry: Retry policy for failed requests, with its budget shared by every worker.
+    :type retry: src.retry_policy.RetryPolicy or None
+    :param failed_pages: Receives the pages skipped after failing, and where
+        the walk gave up; without it a failed page ends the scrape.
+    :type failed_pages: src.failed_pages.FailedPages or None
+    :param pid_index: Stored PIDs to skip, and the watermark to stop at.
+    :type pid_index: src.pid_index.PidIndex or None
+    :param metrics: Collector for per-page fetch and parse metrics.
+    :type metrics: src.scrape_metrics.ScrapeMetrics or None
+    """
+
+    # Gathering these keywords in one place is the point of this class.
+    # pylint: disable-next=too-many-arguments
+    def __init__(self, *, max_workers=None, probe=None,
+                 parse_workers=None, cache=None, checkpoint=None, resume=None, sink=None,
+                 limiter=None, retry=None, failed_pages=None, pid_index=None, metrics=None):
+        self.page_limit = None
+        self.max_workers = max_workers
+        self.probe = probe
+        self.parse_workers = parse_workers
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.sink = sink
+        self.limiter = limiter
+        self.retry = retry
+        self.failed_pages = failed_pages
+        self.pid_index = pid_index
+        self.metrics = metrics
+
+    def with_defaults(self, **defaults):
+        """Return a copy with every setting that is still None taken from ``defaults``.
+
+        :param defaults: Values keyed by option name.
+        :returns: The filled-in copy; these options are left unchanged.
+        :rtype: ScrapeOptions
+        """
+        options = copy.copy(self)
+        for name, value in defaults.items():
+            if getattr(options, name) is None:
+                setattr(options, name, value)
+        return options
@@ -2,12 +2,43 @@
 
 This module sets up the test database and provides fixtures for testing,
 including database connections, Flask app configuration, and test data.
+It also holds the fake listing pages, ``urllib3`` responses and date strings
+shared by several test modules, which import them from ``tests.conftest``.
 """
+import io
+import json
 import os
+import subprocess
 import pytest
 import psycopg
+import urllib3
+from datetime import date, timedelta
 from src.app import app as flask_app
 from src.load_data import setup_database
+from src.pipeline_files import CLEANED_OUTPUT_FILE
+from src.robots_cache import RobotsCache
+
+
+@pytest.fixture(autouse=True)
+def isolated_robots_cache(tmp_path, monkeypatch):
+    """Give every test its own empty robots.txt cache.
+
+    Without this, a policy cached by one test (or by a real scrape run from the
+    same directory) would decide whether another test reads robots.txt at all.
+    The run's metrics summary is written to the same directory, so tests that
+    run ``main`` leave no ``scrape_metrics.json`` behind.
+
+    :param tmp_path: Per-test temporary directory provided by pytest.
+    :type tmp_path: pathlib.Path
+    :param monkeypatch: Pytest fixture used to swap the module-level cache.
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: The cache used by ``src.scrape_and_clean.main`` during the test.
+    :rtype: src.robots_cache.RobotsCache
+    """
+    cache = RobotsCache(str(tmp_path / 'robots_cache.json'))
+    monkeypatch.setattr('src.scrape_and_clean.ROBOTS_CACHE', cache)
+    monkeypatch.setattr('src.scrape_and_clean.METRICS_FILE', str(tmp_path / 'scrape_metrics.json'))
+    return cache
 
 
 @pytest.fixture(scope="session")
@@ -217,4 +248,228 @@ def reset_pipeline_flag():
     app_module.PIPELINE_IN_PROGRESS = False
     yield
     # Reset again after test completes
-    app_module.PIPELINE_IN_PROGRESS = False
\ No newline at end of file
+    app_module.PIPELINE_IN_PROGRESS = False
+
+
+def fake_llm_step(mocker, tmp_path, entries):
+    """Stand in for the pipeline's LLM step, printing ``entries`` as its cleaned output.
+
+    The app writes the output, and the loader reads it, under ``tmp_path``.
+
+    :param mocker: Pytest mocker fixture of the calling test.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Temporary directory of the calling test.
+    :type tmp_path: pathlib.Path
+    :param entries: Cleaned entries the fake LLM prints, one JSON object per line.
+    :type entries: list[dict]
+    :returns: The ``subprocess.run`` mock.
+    :rtype: unittest.mock.MagicMock
+    """
+    cleaned_file = str(tmp_path / os.path.basename(CLEANED_OUTPUT_FILE))
+    mocker.patch('src.app.CLEANED_OUTPUT_FILE', cleaned_file)
+    mocker.patch('src.load_new_data.INPUT_FILE', cleaned_file)
+
+    def _run(args, stdout=None, **_kwargs):
+        for entry in entries:
+            stdout.write(json.dumps(entry) + '\n')
+        return subprocess.CompletedProcess(args, 0)
+    return mocker.patch('src.app.subprocess.run', side_effect=_run)
+
+
+# Fake listing pages and HTTP responses shared by the scraper test modules.
+
+# This has three realistic html entries from a scrape in order to test.
+FAKE_HTML = """
+<html><body><table><tbody>
+    
+    <tr>
+        <td class="tw-py-5 tw-pr-3"><div class="tw-font-medium">Test University</div></td>
+        <td class="tw-px-3 tw-py-5"><div><span>Software Engineering</span><span class="tw-text-gray-500">MS</span></div></td>
+        <td class="tw-px-3 tw-py-5">September 23, 2025</td>
+        <td class="tw-px-3 tw-py-5"><div class="tw-bg-green-50">Accepted on 23 Sep</div></td>
+        <td class="tw-relative tw-py-5"><a href="/result/103">Note</a></td>
+    </tr>
+    <tr class="tw-border-none">
+        <td colspan="3" class="tw-pt-2 tw-pb-5">
+            <div class="tw-gap-2 tw-flex">
+                <div class="tw-inline-flex">American</div>
+                <div class="tw-inline-flex">GPA 4.00</div>
+                <div class="tw-inline-flex">GRE 330</div>
+            </div>
+        </td>
+    </tr>
+    <tr class="tw-border-none">
+        <td colspan="100%" class="tw-pb-5"><p>This is a new comment.</p></td>
+    </tr>
+
+    <tr>
+        <td class="tw-py-5 tw-pr-3"><div class="tw-font-medium">Another University</div></td>
+        <td class="tw-px-3 tw-py-5"><div><span>Mechanical Engineering</span><span class="tw-text-gray-500">PhD</span></div></td>
+        <td class="tw-px-3 tw-py-5">September 22, 2025</td>
+        <td class="tw-px-3 tw-py-5"><div class="tw-bg-red-50">Rejected on 22 Sep</div></td>
+        <td class="tw-relative tw-py-5"><a href="/result/101">Note</a></td>
+    </tr>
+    <tr class="tw-border-none"><td colspan="3"><div>Details...</div></td></tr>
+    <tr class="tw-border-none"><td colspan="100%"><p>This is a duplicate comment.</p></td></tr>
+
+    <tr>
+        <td class="tw-py-5 tw-pr-3"><div class="tw-font-medium">Older University</div></td>
+        <td class="tw-px-3 tw-py-5"><div><span>Electrical Engineering</span><span class="tw-text-gray-500">MS</span></div></td>
+        <td class="tw-px-3 tw-py-5">September 21, 2025</td>
+        <td class="tw-px-3 tw-py-5"><div class="tw-bg-blue-50">Interview</div></td>
+        <td class="tw-relative tw-py-5"><a href="/result/100">Note</a></td>
+    </tr>
+    <tr class="tw-border-none"><td colspan="100%"><p>This comment should not be scraped.</p></td></tr>
+
+</tbody></table></body></html>
+"""
+
+
+def fake_response(status, data=b'', headers=None):
+    """Build an unread urllib3 response, as returned with ``preload_content=False``.
+
+    :param status: HTTP status code.
+    :type status: int
+    :param data: Response body as sent on the wire.
+    :type data: bytes
+    :param headers: Response headers.
+    :type headers: dict or None
+    :rtype: urllib3.HTTPResponse
+    """
+    return urllib3.HTTPResponse(body=io.BytesIO(data), status=status, headers=headers or {},
+                                preload_content=False)
+
+
+def truncated_response():
+    """Build a 200 response whose connection closes after 13 of 1000 announced bytes.
+
+    :rtype: urllib3.HTTPResponse
+    """
+    return fake_response(200, b'<html><body>\n', {'Content-Length': '1000'})
+
+
+def respond_with(status, data=b'', headers=None):
+    """Return a ``PoolManager.request`` replacement answering every request the same way.
+
+    A streamed response can only be read once, so each request gets a new one.
+
+    :rtype: callable
+    """
+    return lambda *_args, **_kwargs: fake_response(status, data, headers)
+
+
+def build_listing_page(rows):
+    """Build a minimal listing page with one main row and one badge row per entry.
+
+    :param rows: Sequence of (pid, date_text) tuples to render, newest first.
+    :type rows: list[tuple[int, str]]
+    :returns: HTML for a listing page.
+    :rtype: str
+    """
+    body = []
+    for pid, date_text in rows:
+        body.append(f"""
+        <tr>
+            <td>University {pid}</td>
+            <td><span>Program {pid}</span><span>MS</span></td>
+            <td>{date_text}</td>
+            <td>Accepted on 01 Sep</td>
+            <td><a href="/result/{pid}">Note</a></td>
+        </tr>
+        <tr><td colspan="3"><div class="tw-inline-flex">GPA 3.50</div></td></tr>
+        """)
+    return "<html><body><table><tbody>" + "".join(body) + "</tbody></table></body></html>"
+
+
+# Five pages of two entries each, newest first, spread over September 2025.
+FAKE_SITE = {
+    page: build_listing_page([
+        (1000 - (page * 2), f"{30 - (page * 2)} Sep 2025"),
+        (999 - (page * 2), f"{29 - (page * 2)} Sep 2025"),
+    ])
+    for page in range(1, 6)
+}
+
+
+def fake_site_request(requested_urls=None, site=None):
+    """Return a ``PoolManager.request`` replacement that serves ``FAKE_SITE`` pages.
+
+    :param requested_urls: Optional list that records every URL requested.
+    :type requested_urls: list or None
+    :param site: Pages to serve instead of ``FAKE_SITE``, keyed by page number.
+    :type site: dict[int, str] or None
+    :returns: A callable suitable as a mock ``side_effect``.
+    :rtype: callable
+    """
+    pages = FAKE_SITE if site is None else site
+
+    def _request(_method, url, **_kwargs):
+        if requested_urls is not None:
+            requested_urls.append(url)
+        page_num = int(url.rsplit('=', 1)[1])
+        response = fake_response(200, pages.get(page_num, "<tbody></tbody>").encode('utf-8'))
+        return response
+    return _request
+
+
+def dated_site_request(page_count, requested_urls, failing_pages=()):
+    """Serve a site where page N holds two entries dated N days before 30 Sep 2025.
+
+    :param page_count: Number of pages with entries; later pages are empty.
+    :type page_count: int
+    :param requested_urls: List that records every URL requested.
+    :type requested_urls: list
+    :param failing_pages: Page numbers that answer with a 500 status.
+    :type failing_pages: tuple[int]
+    :returns: A callable suitable as a mock ``side_effect``.
+    :rtype: callable
+    """
+    def _request(_method, url, **_kwargs):
+        requested_urls.append(url)
+        page_num = int(url.rsplit('=', 1)[1])
+        day = (date(2025, 9, 30) - timedelta(days=page_num)).strftime('%d %b %Y')
+        rows = [(page_num * 2, day), (page_num * 2 - 1, day)] if page_num <= page_count else []
+        return fake_response(500 if page_num in failing_pages else 200,
+                             build_listing_page(rows).encode('utf-8'))
+    return _request
+
+
+def flaky_site_request(failures, requested_urls=None):
+    """Serve ``dated_site_request(64, ...)`` pages, failing some requests first.
+
+    :param failures: Maps a page number to the outcomes of its first requests, in
+        order: an HTTP status, ``'network'`` for a ``MaxRetryError``, or
+        ``'truncated'`` for a 200 whose body breaks off part way. Once a
+        page's outcomes are used up it is served normally; ``'always'`` fails it
+        with a 500 for good.
+    :type failures: dict[int, list]
+    :param requested_urls: Optional list that records every URL requested.
+    :type requested_urls: list or None
+    :returns: A callable suitable as a mock ``side_effect``.
+    :rtype: callable
+    """
+    serve = dated_site_request(64, [] if requested_urls is None else requested_urls)
+
+    def _request(method, url, **kwargs):
+        response = serve(method, url, **kwargs)
+        outcomes = failures.get(int(url.rsplit('=', 1)[1]), [])
+        outcome = outcomes[0] if outcomes == ['always'] else (outcomes.pop(0) if outcomes else None)
+        if outcome == 'network':
+            raise urllib3.exceptions.MaxRetryError(None, url, "connection reset")
+        if outcome == 'truncated':
+            return truncated_response()
+        if outcome is not None:
+            response.status = 500 if outcome == 'always' else outcome
+        return response
+    return _request
+
+
+# Strings at the edges of what strptime accepts: case, pivot years, leap days,
+# out-of-range days, extra whitespace and non-ASCII digits or letters.
+EDGE_DATE_STRINGS = [
+    "23 Sep 2025", "23 sep 25", "3 SEP 68", "03 Sep 69", "September 23, 2025",
+    "september 3, 2025", "23 Sep", "1 Jan", "29 Feb", "29 Feb 24", "29 Feb 25",
+    "February 29, 2023", "31 Apr", "0 Jan", "00 Jan 25", "32 Jan", " 5 Jan",
+    "5  Jan 25", "5\tJan", "23 Sep 2025 ", "23 Sept", "Sep 23, 25", "23 Sep, 2025",
+    "23 September", "\uff12\uff13 Sep", "23 \u017fep 2025", "01 Jan 0000", "", "x",
+]
@@ -1,14 +1,25 @@
 import pytest
 from bs4 import BeautifulSoup
-from datetime import datetime
+from datetime import date, datetime
 from src.date_utils import (
     infer_years,
     format_decision_date,
+    classify_date,
+    FORMATS_WITH_YEAR,
+    FORMAT_NO_YEAR,
+    SHAPE_DAY_MONTH,
+    SHAPE_DAY_MONTH_YEAR,
+    SHAPE_MONTH_DAY_YEAR,
+    YearInferrer,
+    _parse_date,
+    _parse_single_date,
+    _strptime_decision_date,
 )
-from src.scrape_and_clean import (
+from src.listing_parser import (
     parse_status_and_date,
     parse_details_from_badges
 )
+from tests.conftest import EDGE_DATE_STRINGS
 
 
 @pytest.mark.analysis
@@ -240,4 +251,108 @@ def test_infer_years_backward_pass_corrects_year():
 
     # The backward pass should have corrected the year of the first date.
     expected_output = ['2024-12-31', '2025-01-01']
-    assert result == expected_output
\ No newline at end of file
+    assert result == expected_output
+
+
+@pytest.mark.analysis
+@pytest.mark.parametrize("date_str", EDGE_DATE_STRINGS)
+def test_fast_date_parsing_matches_strptime(date_str):
+    """Test that the shape-based parsers return what the strptime reference returns.
+
+    :param date_str: Date string to parse.
+    :type date_str: str
+    """
+    assert _parse_date(date_str) == _parse_single_date(date_str, FORMATS_WITH_YEAR,
+                                                       FORMAT_NO_YEAR)
+    for reference_year in (2024, 2025, 999, "2024"):
+        expected = _strptime_decision_date(date_str, reference_year) if date_str else None
+        assert format_decision_date(date_str, reference_year) == expected
+
+
+@pytest.mark.analysis
+def test_classify_date_shapes():
+    """Test that date strings are split by shape, with two-digit years pivoted like %y."""
+    assert classify_date("23 Sep") == (SHAPE_DAY_MONTH, None, 9, 23)
+    assert classify_date("23 sep 68") == (SHAPE_DAY_MONTH_YEAR, 2068, 9, 23)
+    assert classify_date("23 Sep 69") == (SHAPE_DAY_MONTH_YEAR, 1969, 9, 23)
+    assert classify_date("September 3, 2025") == (SHAPE_MONTH_DAY_YEAR, 2025, 9, 3)
+    for unknown in ("32 Sep", "Sep 3, 25", "23  Sep", "23 Sept", "23 Sep 123", "a b c d"):
+        assert classify_date(unknown) is None
+
+
+@pytest.mark.analysis
+@pytest.mark.parametrize("dates, expected", [
+    (["05 Jan 24", "02 Jan", "30 Dec 23"], ["2024-01-05", "2024-01-02", "2023-12-30"]),
+    (["01 Jan 2025", "31 Dec"], ["2025-01-01", "2024-12-31"]),
+    (["05 Jan", "31 Dec 2024"], ["2025-01-05", "2024-12-31"]),
+    (["02 Jan", "01 Jan"], ["2025-01-02", "2025-01-01"]),
+    (["15 Oct", "20 Sep"], ["2024-10-15", "2024-09-20"]),
+    ([None, "bad", "10 Feb 2025", "28 Dec", "11 Nov 99"],
+     [None, None, "2025-02-10", "2024-12-28", "1999-11-11"]),
+    ([], []),
+])
+def test_year_inferrer_dates_a_newest_first_page(dates, expected):
+    """Test that a page listed newest first is dated backward, never after today.
+
+    :param dates: Date strings of one page, newest first.
+    :type dates: list[str or None]
+    :param expected: Expected YYYY-MM-DD strings, with today being 1 Oct 2025.
+    :type expected: list[str or None]
+    """
+    assert YearInferrer(today=date(2025, 10, 1)).infer_page(dates) == expected
+
+
+@pytest.mark.analysis
+def test_year_inferrer_carries_year_across_a_dec_jan_page_boundary():
+    """Test that year-less dates at the top of a page take their year from the page before.
+
+    Page 1 ends in January 2025 and page 2 starts in December, so its dates
+    belong to 2024. Dated from its own page, page 2 would fall in the
+    December before today, 2025.
+    """
+    first_page, second_page = ["02 Jan 2025", "01 Jan"], ["31 Dec", "30 Dec"]
+    inferrer = YearInferrer(today=date(2026, 1, 5))
+
+    assert inferrer.infer_page(first_page) == ["2025-01-02", "2025-01-01"]
+    assert inferrer.infer_page(second_page) == ["2024-12-31", "2024-12-30"]
+    assert YearInferrer(today=date(2026, 1, 5)).infer_page(second_page) == [
+        "2025-12-31", "2025-12-30"]
+
+
+@pytest.mark.analysis
+def test_year_inferrer_state_restores_the_year_context():
+    """Test that an inferrer restored from a saved state continues like the original."""
+    inferrer = YearInferrer()
+    inferrer.infer_page(["02 Jan 2025", "01 Jan"])
+    restored = YearInferrer()
+    restored.restore(inferrer.state())
+
+    assert inferrer.state() == {'year': 2025, 'previous': '2025-01-01'}
+    assert restored.infer_page(["31 Dec", "30 Dec"]) == ["2024-12-31", "2024-12-30"]
+
+    restored.restore(None)
+    assert restored.state() == {'year': None, 'previous': None}
+
+
+@pytest.mark.analysis
+def test_year_inferrer_buffers_dates_until_a_year_arrives():
+    """Test that dates before the first year wait for it and are resolved upward."""
+    inferrer = YearInferrer()
+    assert inferrer.push("02 Jan") == []
+    assert inferrer.push("31 Dec 2024") == ["2025-01-02", "2024-12-31"]
+    assert inferrer.push(None) == [None]
+    assert inferrer.push("30 Dec") == ["2024-12-30"]
+    assert inferrer.flush() == []
+
+
+@pytest.mark.analysis
+def test_year_inferrer_never_dates_into_the_future():
+    """Test that inferred dates after today are moved back a year."""
+    inferrer = YearInferrer(today=date(2025, 12, 10))
+    assert inferrer.push("20 Dec") == []
+    assert inferrer.push("01 Dec 2025") == ["2024-12-20", "2025-12-01"]
+
+    inferrer.restore({'year': 2026, 'previous': None})
+    assert inferrer.push("20 Nov") == ["2025-11-20"]
+
+
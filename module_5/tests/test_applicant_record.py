@@ -0,0 +1,60 @@
+import pytest
+import json
+import pickle
+from datetime import date
+from src.listing_parser import parse_listing_page
+from src.entry_writer import EntryWriter
+from src.applicant_record import ApplicantRecord, SCRAPED_FIELDS, entry_to_json
+from tests.conftest import FAKE_HTML
+
+
+@pytest.mark.web
+def test_applicant_record_round_trip(tmp_path):
+    """Test that scraped entries are slotted records that serialize like the old dicts.
+
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    entries, _ = parse_listing_page(FAKE_HTML, None, set())
+    record = entries[0]
+    assert isinstance(record, ApplicantRecord)
+    assert not hasattr(record, '__dict__')
+    assert record['pid'] == record.pid == 103
+    with pytest.raises(KeyError):
+        record['missing']
+
+    # JSON keeps the scraper's key order and reads back to an equal record.
+    line = record.to_json()
+    assert list(json.loads(line)) == list(SCRAPED_FIELDS)
+    assert ApplicantRecord.from_json(line) == record
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert record != record.as_dict()
+    assert repr(record) == "ApplicantRecord(pid=103, date_added='2025-09-23')"
+
+    # Fields added by the LLM step are written only once they are set.
+    record.term = 'Fall 2026'
+    assert record.as_dict()['term'] == 'Fall 2026'
+    assert 'llm_generated_program' not in record.as_dict()
+    assert record.db_params()[1] == ', '
+
+    with EntryWriter(str(tmp_path / "entries.jsonl")) as writer:
+        writer.write([record, {'pid': 1, 'date_added': date(2025, 9, 1)}])
+    with open(tmp_path / "entries.jsonl", 'r', encoding='utf-8') as f:
+        assert f.read().splitlines() == [record.to_json(), entry_to_json(
+            {'pid': 1, 'date_added': '2025-09-01'})]
+
+
+@pytest.mark.web
+def test_content_hash_tracks_scraped_fields():
+    """Test that the hash changes with a scraped field but not with LLM fields or JSON."""
+    entries, _ = parse_listing_page(FAKE_HTML, None, set())
+    record = entries[0]
+    original = record.content_hash()
+    assert len(original) == 32
+    assert ApplicantRecord.from_json(record.to_json()).content_hash() == original
+
+    record.llm_generated_university = 'Test University'
+    assert record.content_hash() == original
+    assert record.db_params()[-1] == original
+    record.status = 'Rejected'
+    assert record.content_hash() != original
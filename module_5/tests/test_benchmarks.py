@@ -0,0 +1,106 @@
+import pytest
+import json
+import urllib3
+from src.scrape_and_clean import scrape_and_clean
+from src.scrape_options import ScrapeOptions
+from src.failed_pages import FailedPages
+from src.retry_policy import RetryPolicy
+from benchmarks.replay_server import ReplayServer, load_corpus, split_entries, synthetic_corpus
+from benchmarks.run_benchmarks import run_target
+
+
+@pytest.mark.web
+def test_replay_server_paginates_fails_and_shifts():
+    """Test the replay server's pages, 404 past the end, injected 503s and row shifts."""
+    entries = synthetic_corpus(45)
+    http = urllib3.PoolManager()
+    with ReplayServer(entries) as server:
+        assert http.request('GET', server.base_url + 'robots.txt').status == 200
+        assert server.page_count == 3
+        page_1 = http.request('GET', server.url + '?page=1').data.decode('utf-8')
+        assert len(split_entries(page_1)) == 20 and '/result/900000"' in page_1
+        assert len(split_entries(http.request('GET', server.url + '?page=3').data)) == 5
+        assert http.request('GET', server.url + '?page=4').status == 404
+        assert http.request('GET', server.url + '?page=x').status == 400
+        assert http.request('GET', server.base_url + 'other').status == 404
+        assert (server.pages_served, server.entries_served) == (2, 25)
+
+    with ReplayServer(entries, error_rate=1.0) as server:
+        assert http.request('GET', server.url + '?page=1').status == 503
+
+    # Every second request inserts a new entry, pushing the old first entry down a page.
+    with ReplayServer(entries, shift_every=2) as server:
+        http.request('GET', server.url + '?page=1')
+        page_1 = http.request('GET', server.url + '?page=1').data.decode('utf-8')
+        first, second = split_entries(page_1)[:2]
+        assert '/result/900001"' in first and '/result/900000"' in second
+        page_2 = http.request('GET', server.url + '?page=2').data
+        assert '/result/899981"' in split_entries(page_2)[0]
+
+
+@pytest.mark.web
+def test_scrape_over_http_matches_replayed_corpus(mocker):
+    """Test ``scrape_and_clean`` end to end over real HTTP against the replay server.
+
+    :param mocker: Pytest mocker fixture for pointing the scraper at the server.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    entries = synthetic_corpus(130)
+    with ReplayServer(entries, error_rate=0.1, seed=3) as server:
+        mocker.patch('src.scrape_and_clean.TARGET_URL', server.url)
+        scraped = scrape_and_clean(page_limit=20, options=ScrapeOptions(
+            probe=False, retry=RetryPolicy(base_delay=0.01), failed_pages=FailedPages()
+        ))
+
+    assert [entry['pid'] for entry in scraped] == list(range(900000, 900000 - 130, -1))
+    assert scraped[0]['comments'] == 'Comment for entry 900000.'
+
+
+@pytest.mark.web
+def test_benchmark_corpus_and_report(tmp_path):
+    """Test loading recorded pages both ways and a benchmark result row.
+
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    pages = ReplayServer(synthetic_corpus(30)).render_pages()
+    raw_file = tmp_path / 'raw_html_data.json'
+    raw_file.write_text(json.dumps(pages), encoding='utf-8')
+    cache_dir = tmp_path / 'page_cache'
+    cache_dir.mkdir()
+    for key, html in pages.items():
+        (cache_dir / f'{key}.html').write_text(html, encoding='utf-8')
+    (cache_dir / 'page_1.json').write_text('{}', encoding='utf-8')
+
+    assert len(load_corpus(str(raw_file))) == len(load_corpus(str(cache_dir))) == 30
+    assert split_entries('<html></html>') == []
+
+    row = run_target('module_2.clean_data', load_corpus(str(raw_file)))
+    assert row['target'] == 'module_2.clean_data'
+    assert (row['pages'], row['entries']) == (2, 30)
+    assert row['entries_per_sec'] > 0
+
+    # The parallel cleaner reads the same pages back from an archive.
+    row = run_target('module_2.clean_archive', load_corpus(str(raw_file)))
+    assert (row['pages'], row['entries']) == (2, 30)
+
+
+@pytest.mark.web
+def test_scrape_over_http_sends_compressed_pages(mocker):
+    """Test that a real scrape is served gzip-compressed and parses the same entries.
+
+    :param mocker: Pytest mocker fixture for pointing the scraper at the server.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    entries = synthetic_corpus(60)
+    results = {}
+    for compress in (False, True):
+        with ReplayServer(entries, compress=compress) as server:
+            mocker.patch('src.scrape_and_clean.TARGET_URL', server.url)
+            scraped = scrape_and_clean(page_limit=10, options=ScrapeOptions(
+                probe=False, max_workers=1
+            ))
+            results[compress] = ([entry['pid'] for entry in scraped], server.bytes_sent)
+
+    assert results[True][0] == results[False][0] == list(range(900000, 899940, -1))
+    assert results[True][1] * 5 < results[False][1]
@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import MagicMock
+from src.applicant_record import ApplicantRecord
+from src.bulk_load import (APPLICANT_COLUMNS, batch_insert, copy_insert, insert_records,
+                            load_chunks)
+
+
+@pytest.mark.db
+def test_copy_insert_merges_staging_table():
+    """Test that records are copied into a staging table and merged in one statement.
+
+    The merge keeps the first record for each PID, skips stored PIDs and
+    reports the rows it inserted.
+    """
+    records = [ApplicantRecord.from_dict({'pid': pid}) for pid in (7, 8, 7)]
+    cur = MagicMock()
+    cur.rowcount = 2
+    assert copy_insert(cur, records) == 2
+
+    statements = [call.args[0].as_string(None) for call in cur.execute.call_args_list]
+    assert statements[0] == 'DROP TABLE IF EXISTS "pg_temp"."applicants_staging";'
+    assert statements[1].startswith('CREATE TEMP TABLE "applicants_staging" (LIKE "applicants"')
+    assert 'SELECT DISTINCT ON ("pid")' in statements[2]
+    assert 'ORDER BY "pid", "seq"' in statements[2]
+    assert 'ON CONFLICT ("pid") DO NOTHING' in statements[2]
+    assert statements[3] == 'DROP TABLE "applicants_staging";'
+
+    copy_query = cur.copy.call_args.args[0].as_string(None)
+    assert copy_query.startswith('COPY "applicants_staging" ("seq", "pid", "program"')
+    copy = cur.copy.return_value.__enter__.return_value
+    rows = [call.args[0] for call in copy.write_row.call_args_list]
+    assert [row[:2] for row in rows] == [(0, 7), (1, 8), (2, 7)]
+    assert all(len(row) == len(APPLICANT_COLUMNS) + 1 for row in rows)
+
+
+@pytest.mark.db
+def test_batch_insert_counts_returned_pids():
+    """Test that a batch is sent in one ``executemany`` and counted by its RETURNING rows.
+
+    Records whose PID was already stored return no row and are not counted.
+    """
+    records = [ApplicantRecord.from_dict({'pid': pid}) for pid in (7, 8, 9)]
+    cur = MagicMock()
+    cur.fetchone.side_effect = [(7,), None, (9,)]
+    cur.nextset.side_effect = [True, True, False]
+    assert batch_insert(cur, records) == 2
+
+    query, params = cur.executemany.call_args.args
+    assert cur.executemany.call_args.kwargs == {'returning': True}
+    assert query.as_string(None).strip().endswith('ON CONFLICT ("pid") DO NOTHING\n    RETURNING "pid";')
+    assert [row[0] for row in params] == [7, 8, 9]
+
+
+@pytest.mark.db
+def test_insert_records_picks_batch_or_copy_by_size(mocker):
+    """Test that small loads are batched, large ones copied, and empty ones skipped.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    batch = mocker.patch('src.bulk_load.batch_insert', return_value=1)
+    copy = mocker.patch('src.bulk_load.copy_insert', return_value=3)
+    cur = MagicMock()
+    records = [ApplicantRecord.from_dict({'pid': pid}) for pid in (7, 8, 9)]
+
+    assert insert_records(cur, []) == 0
+    assert insert_records(cur, records[:2], copy_threshold=3) == 1
+    batch.assert_called_once_with(cur, records[:2])
+    assert insert_records(cur, records, copy_threshold=3) == 3
+    copy.assert_called_once_with(cur, records)
+
+
+@pytest.mark.db
+def test_load_chunks_inserts_while_reading(mocker):
+    """Test that records are inserted chunk by chunk as they are read, with optional commits.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    read = []
+
+    def stream():
+        for pid in range(5):
+            read.append(pid)
+            yield ApplicantRecord.from_dict({'pid': pid})
+
+    def insert(cur, chunk):
+        # Each chunk is inserted before the next record is read.
+        assert read[-1] == chunk[-1].pid
+        return len(chunk) - 1
+
+    insert = mocker.patch('src.bulk_load.insert_records', side_effect=insert)
+    conn = MagicMock()
+    assert load_chunks(conn, stream(), chunk_size=2) == (2, 5)
+    assert [[record.pid for record in call.args[1]]
+            for call in insert.call_args_list] == [[0, 1], [2, 3], [4]]
+    conn.commit.assert_not_called()
+
+    assert load_chunks(conn, [], chunk_size=2) == (0, 0)
+    load_chunks(conn, stream(), chunk_size=2, commit_each_chunk=True)
+    assert conn.commit.call_count == 3
@@ -2,6 +2,7 @@ from unittest.mock import MagicMock
 import pytest
 import subprocess
 from src import app
+from src.scrape_metrics import ScrapeMetrics
 
 
 @pytest.mark.buttons
@@ -129,6 +130,30 @@ def test_status_endpoint(client, monkeypatch):
     assert response_busy.json['PIPELINE_IN_PROGRESS']
 
 
+@pytest.mark.buttons
+def test_scrape_metrics_endpoint(client, monkeypatch, tmp_path):
+    """Test that ``/scrape-metrics`` serves the last run's summary, or 404 without one.
+
+    :param client: The Flask test client fixture.
+    :type client: flask.testing.FlaskClient
+    :param monkeypatch: The pytest fixture for modifying classes or modules.
+    :type monkeypatch: _pytest.monkeypatch.MonkeyPatch
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    metrics_file = tmp_path / 'scrape_metrics.json'
+    monkeypatch.setattr(app, 'SCRAPE_METRICS_FILE', str(metrics_file))
+    assert client.get('/scrape-metrics').status_code == 404
+
+    metrics = ScrapeMetrics()
+    metrics.record_fetch('fetched', 0.2, wire_bytes=5000, decoded_bytes=40000)
+    metrics.write(str(metrics_file))
+    response = client.get('/scrape-metrics')
+    assert response.status_code == 200
+    assert response.json['pages']['fetched'] == 1
+    assert response.json['histograms']['response_bytes']['max'] == 5000
+
+
 @pytest.mark.web
 @pytest.mark.buttons
 def test_pipeline_subprocess_error(mocker, capsys):
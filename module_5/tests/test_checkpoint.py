@@ -0,0 +1,178 @@
+import pytest
+import json
+from datetime import date, timedelta
+from src.scrape_and_clean import scrape_and_clean, save_failed_pages
+from src.scrape_options import ScrapeOptions
+from src.failed_pages import FailedPages
+from src.pid_index import PidIndex
+from src.checkpoint import ScrapeCheckpoint, cutoff_key
+from tests.conftest import dated_site_request, flaky_site_request
+
+
+@pytest.mark.web
+def test_scrape_resumes_from_checkpoint_after_crash(mocker, tmp_path, capsys):
+    """Test that a crashed scrape resumes after its last saved page.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param capsys: Pytest fixture for capturing stdout and stderr.
+    :type capsys: pytest.CaptureFixture
+    """
+    mocker.patch('src.page_walk.CHECKPOINT_EVERY', 2)
+    cutoff = date(2025, 9, 30) - timedelta(days=7)
+    kwargs = {'probe': False, 'max_workers': 1}
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(64, []))
+    expected = scrape_and_clean(cutoff, page_limit=10, options=ScrapeOptions(**kwargs))
+
+    serve = dated_site_request(64, [])
+
+    def crash_on_page_6(method, url, **request_kwargs):
+        if url.endswith('page=6'):
+            raise RuntimeError("connection reset")
+        return serve(method, url, **request_kwargs)
+
+    mocker.patch('urllib3.PoolManager.request', side_effect=crash_on_page_6)
+    checkpoint = ScrapeCheckpoint(str(tmp_path / "scrape.checkpoint"))
+    with pytest.raises(RuntimeError):
+        scrape_and_clean(cutoff, page_limit=10,
+                         options=ScrapeOptions(checkpoint=checkpoint, **kwargs))
+
+    requested_urls = []
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=dated_site_request(64, requested_urls))
+    resumed = scrape_and_clean(cutoff, page_limit=10, options=ScrapeOptions(
+        checkpoint=checkpoint, resume=True, **kwargs
+    ))
+
+    assert resumed == expected
+    assert requested_urls[0].endswith('page=6')
+    assert "Resuming from checkpoint after page 5 with 10 entries." in capsys.readouterr().out
+
+    # A finished scrape is returned from the checkpoint without any request.
+    requested_urls.clear()
+    assert scrape_and_clean(cutoff, page_limit=10, options=ScrapeOptions(
+        checkpoint=checkpoint, resume=True, **kwargs
+    )) == expected
+    assert requested_urls == []
+
+
+@pytest.mark.web
+def test_scrape_resumes_after_failed_page(mocker, tmp_path):
+    """Test resuming after a failed page, using the configured checkpoint file.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    mocker.patch('src.scrape_and_clean.CHECKPOINT_FILE', str(tmp_path / "scrape.checkpoint"))
+    cutoff = date(2025, 9, 30) - timedelta(days=37)
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=dated_site_request(64, [], failing_pages=(20,)))
+    partial = scrape_and_clean(latest_db_date=cutoff)
+    assert len(partial) == 38
+
+    requested_urls = []
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=dated_site_request(64, requested_urls))
+    resumed = scrape_and_clean(latest_db_date=cutoff, options=ScrapeOptions(resume=True))
+
+    assert resumed[:38] == partial
+    assert len(resumed) == 74
+    # The saved stop page replaces the probe, so nothing before the failed page is requested.
+    assert min(int(url.rsplit('=', 1)[1]) for url in requested_urls) == 20
+
+
+@pytest.mark.web
+def test_checkpoint_load_rejects_stale_or_damaged_state(tmp_path):
+    """Test that checkpoints for another cutoff or with damaged files are ignored.
+
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    checkpoint = ScrapeCheckpoint(str(tmp_path / "scrape.checkpoint"))
+    cutoff = cutoff_key(date(2025, 9, 1), {7, 3}, 100)
+    assert checkpoint.load(cutoff) is None
+
+    checkpoint.start(cutoff, stop_page=50)
+    year_state = {'year': 2025, 'previous': '2025-09-01'}
+    checkpoint.record(1, [{'pid': 1}, {'pid': 2}], year_state=year_state)
+    # Entries appended after the last saved state are discarded on load.
+    with open(checkpoint.entries_path, 'ab') as f:
+        f.write(b'{"pid": 3}\n{"pi')
+
+    progress = checkpoint.load(cutoff)
+    assert progress == {'last_page': 1, 'stop_page': 50, 'done': False, 'failed_pages': None,
+                        'year_state': year_state, 'entries': [{'pid': 1}, {'pid': 2}]}
+    with open(checkpoint.entries_path, 'rb') as f:
+        assert f.read().count(b'\n') == 2
+
+    assert checkpoint.load(cutoff_key(date(2025, 9, 2), {3, 7}, 100)) is None
+    assert checkpoint.load(cutoff_key(None, set(), 100)) is None
+
+    with open(checkpoint.entries_path, 'wb') as f:
+        f.write(b'{"pid": 1}\n')
+    assert checkpoint.load(cutoff) is None
+    with open(checkpoint.entries_path, 'wb') as f:
+        f.write(b'not json\n')
+    assert checkpoint.load(cutoff) is None
+
+
+@pytest.mark.web
+def test_checkpoint_keeps_failed_pages(mocker, tmp_path):
+    """Test that pages skipped before a crash are still reported after resuming.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    mocker.patch('src.page_walk.CHECKPOINT_EVERY', 1)
+    serve = flaky_site_request({2: ['always']})
+
+    def crash_on_page_5(method, url, **request_kwargs):
+        if url.endswith('page=5'):
+            raise RuntimeError("connection reset")
+        return serve(method, url, **request_kwargs)
+    mocker.patch('urllib3.PoolManager.request', side_effect=crash_on_page_5)
+    checkpoint = ScrapeCheckpoint(str(tmp_path / "scrape.checkpoint"))
+    kwargs = {'probe': False, 'max_workers': 1, 'checkpoint': checkpoint}
+    with pytest.raises(RuntimeError):
+        scrape_and_clean(page_limit=6, options=ScrapeOptions(failed_pages=FailedPages(), **kwargs))
+
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(6, []))
+    failed_pages = FailedPages()
+    result = scrape_and_clean(page_limit=6, options=ScrapeOptions(
+        resume=True, failed_pages=failed_pages, **kwargs
+    ))
+
+    assert failed_pages.pages == [2]
+    # The bound of the gap survives the crash with it.
+    assert failed_pages.bounds == {2: {'date_added': '2025-09-29', 'pid': 1}}
+    assert [entry['pid'] for entry in result] == [2, 1, 6, 5, 8, 7, 10, 9, 12, 11]
+
+
+@pytest.mark.web
+def test_pid_watermark_is_part_of_the_cutoff(mocker, tmp_path):
+    """Test that checkpoints and failed-page records are tied to the PID watermark.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    checkpoint = ScrapeCheckpoint(str(tmp_path / "state.json"))
+    checkpoint.start(cutoff_key(None, set(), 100, pid_watermark=994), 5)
+    checkpoint.record(2, [{'pid': 998}])
+
+    assert checkpoint.load(cutoff_key(None, set(), 100)) is None
+    assert checkpoint.load(cutoff_key(None, set(), 100, pid_watermark=990)) is None
+    assert checkpoint.load(cutoff_key(None, set(), 100, pid_watermark=994))['last_page'] == 2
+
+    failed_file = tmp_path / "failed_pages.json"
+    mocker.patch('src.scrape_and_clean.FAILED_PAGES_FILE', str(failed_file))
+    save_failed_pages(FailedPages([4]), date(2025, 9, 25), set(), PidIndex(994))
+    with open(failed_file, 'r', encoding='utf-8') as f:
+        assert json.load(f)['pid_watermark'] == 994
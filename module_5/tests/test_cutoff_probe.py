@@ -0,0 +1,136 @@
+import pytest
+from datetime import date, timedelta
+from src.scrape_and_clean import scrape_and_clean, make_fetcher
+from src.cutoff_probe import find_cutoff_page, oldest_entry_date
+from src.scrape_options import ScrapeOptions
+from tests.conftest import fake_response, build_listing_page, dated_site_request
+
+
+@pytest.mark.web
+def test_probe_locates_cutoff_page(mocker):
+    """Test that probing finds the cutoff page with logarithmically many requests.
+
+    Pages up to 37 are on or after the cutoff date, so page 38 is the first
+    page with older entries.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    requested_urls = []
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=dated_site_request(64, requested_urls))
+    cutoff = date(2025, 9, 30) - timedelta(days=37)
+
+    last_page = find_cutoff_page(make_fetcher(1), cutoff, page_limit=100)
+
+    assert last_page == 38
+    assert len(requested_urls) <= 14
+
+
+@pytest.mark.web
+def test_probed_scrape_matches_page_walk(mocker):
+    """Test that a probed scrape returns the page walk's entries, fetching pages afresh.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    requested_urls = []
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=dated_site_request(64, requested_urls))
+    cutoff = date(2025, 9, 30) - timedelta(days=37)
+
+    walked = scrape_and_clean(latest_db_date=cutoff, options=ScrapeOptions(probe=False))
+    requested_urls.clear()
+    probed = scrape_and_clean(latest_db_date=cutoff, options=ScrapeOptions(
+        probe=True, max_workers=8
+    ))
+
+    assert probed == walked
+    assert len(probed) == 74
+    # The walk requests probed pages again and stops at the probed cutoff page.
+    walked_pages = [int(url.rsplit('=', 1)[1]) for url in requested_urls[-38:]]
+    assert sorted(walked_pages) == list(range(1, 39))
+
+
+@pytest.mark.web
+def test_probed_scrape_follows_a_shifted_listing(mocker):
+    """Test that entries posted after the probe do not push older ones out of the scrape.
+
+    Two pages of new entries arrive once the probe has found the cutoff on
+    page 6, so the old pages 4 to 6 are now pages 6 to 8. The walk refetches
+    every page and carries on past page 6 until it reaches the cutoff.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    shift = [0]
+    serve = dated_site_request(64, [])
+
+    def shifted_request(method, url, **kwargs):
+        page_num = int(url.rsplit('=', 1)[1])
+        if page_num <= shift[0]:
+            rows = [(1000 + page_num * 2, '30 Sep 2025'), (999 + page_num * 2, '30 Sep 2025')]
+            return fake_response(200, build_listing_page(rows).encode('utf-8'))
+        return serve(method, f"{url.rsplit('=', 1)[0]}={page_num - shift[0]}", **kwargs)
+
+    def probe_then_post(*args):
+        last_page = find_cutoff_page(*args)
+        shift[0] = 2
+        return last_page
+
+    mocker.patch('urllib3.PoolManager.request', side_effect=shifted_request)
+    mocker.patch('src.scrape_and_clean.find_cutoff_page', side_effect=probe_then_post)
+
+    entries = scrape_and_clean(latest_db_date=date(2025, 9, 25), options=ScrapeOptions(
+        probe=True, max_workers=4
+    ))
+
+    # Old page N holds PIDs 2N and 2N - 1; old page 5 is the last one on the cutoff date.
+    assert [entry.pid for entry in entries] == [
+        1002, 1001, 1004, 1003, 2, 1, 4, 3, 6, 5, 8, 7, 10, 9]
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("page_count, failing_pages, expected_last_page", [
+    (3, (), 4),      # the listing runs out before the cutoff date
+    (64, (2,), 10),  # a probe fails, so the whole page range is walked
+    (5, (6,), 10),   # a bisection probe fails, with the same fallback
+    (64, (), 10),    # the cutoff lies beyond the page limit
+])
+def test_probe_edge_cases(mocker, page_count, failing_pages, expected_last_page):
+    """Test the probe at the end of the listing, on failures and at the page limit.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param page_count: Number of pages with entries.
+    :type page_count: int
+    :param failing_pages: Pages that answer with an error status.
+    :type failing_pages: tuple[int]
+    :param expected_last_page: Last page the scrape should cover.
+    :type expected_last_page: int
+    """
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=dated_site_request(page_count, [], failing_pages))
+    cutoff = date(2025, 9, 30) - timedelta(days=37)
+
+    last_page = find_cutoff_page(make_fetcher(1), cutoff, page_limit=10)
+
+    assert last_page == expected_last_page
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("page, expected", [
+    (build_listing_page([(2, "03 Sep 2025"), (1, "02 Sep 2025")]), date(2025, 9, 2)),
+    (build_listing_page([(1, "02 Sep 2025")]).replace("</tbody>", ""), date(2025, 9, 2)),
+    (build_listing_page([(1, "not a date")]), None),
+    ("<html><body>No table</body></html>", None),
+])
+def test_oldest_entry_date(page, expected):
+    """Test reading the oldest entry date from a page, including fallback cases.
+
+    :param page: Listing page markup.
+    :type page: str
+    :param expected: Expected oldest date, or None when the page has no dated entries.
+    :type expected: datetime.date or None
+    """
+    assert oldest_entry_date(page) == expected
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from src.date_batch import infer_dates_batch, infer_years_batch
+from src.date_utils import infer_years
+from tests.conftest import EDGE_DATE_STRINGS
+
+
+@pytest.mark.analysis
+@pytest.mark.parametrize("dates", [
+    ["30 Dec 23", "02 Jan", "05 Jan 24"],
+    ["31 Dec", "01 Jan 2025"],
+    ["01 Jan", "02 Jan"],
+    ["01 Jan 2025", "this is not a date", "", None, "99 Zzz 9999"],
+    ["15 Mar", None, "29 Feb", "01 Jan 2025", "bad", "10 Feb", "28 Dec", "11 Nov 99"],
+    ["31 Dec", "30 Nov", "01 Jan 2025", "28 Dec", "02 Jan", "01 Jan 0999"],
+    EDGE_DATE_STRINGS,
+    [],
+])
+def test_infer_years_batch_matches_infer_years(dates):
+    """Test that the NumPy batch path returns exactly what ``infer_years`` returns.
+
+    :param dates: Date strings in listing order.
+    :type dates: list[str or None]
+    """
+    assert infer_years_batch(dates) == infer_years(dates)
+
+
+@pytest.mark.analysis
+def test_infer_dates_batch_returns_datetime64():
+    """Test that the batch path returns day-precision dates with NaT for bad strings."""
+    dates = infer_dates_batch(["30 Dec 23", "02 Jan", "bad"])
+    assert dates.dtype == np.dtype('datetime64[D]')
+    assert [str(d) for d in dates[:2]] == ['2023-12-30', '2024-01-02']
+    assert np.isnat(dates[2])
+
+    with pytest.raises(ValueError):
+        infer_dates_batch(["31 Dec 9999", "01 Jan"])
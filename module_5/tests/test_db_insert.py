@@ -4,10 +4,15 @@ import pytest
 import json
 from datetime import date
 from unittest.mock import MagicMock
-from src import scrape_and_clean
+from src import load_new_data, scrape_and_clean
+from src.bulk_load import upsert_returning_query
+from src.applicant_record import ApplicantRecord
 from src.load_data import load_initial_json_data
-from src.load_new_data import main as load_new_data_main
+from src.load_new_data import main as load_new_data_main, update_changed_data
+from src.pipeline_files import (CLEANED_OUTPUT_FILE, CLEANED_UPDATE_FILE, LLM_COMMAND,
+                                SCRAPE_OUTPUT_FILE, RECRAWL_OUTPUT_FILE)
 from src.query_data import execute_query, run_all_queries_for_console
+from tests.conftest import fake_llm_step
 
 
 # This is a sample of fake data that mimics the output of the scraper/LLM.
@@ -47,23 +52,6 @@ FAKE_ENTRY_DATA = [
 ]
 
 
-def create_fake_jsonl_file(tmp_path, data):
-    """Helper function to create a JSONL file in a temporary directory.
-    
-    :param tmp_path: Pytest temporary directory fixture.
-    :type tmp_path: pathlib.Path
-    :param data: List of dictionaries to write to the JSONL file.
-    :type data: list
-    :returns: String path to the created JSONL file.
-    :rtype: str
-    """
-    jsonl_file = tmp_path / "new_structured_entries.json.jsonl"
-    with open(jsonl_file, 'w') as f:
-        for item in data:
-            f.write(json.dumps(item) + '\n')
-    return str(jsonl_file)
-
-
 def get_connection_string():
     """Get the appropriate connection string based on the environment.
     
@@ -98,11 +86,10 @@ def test_insert_on_pull(client, db_session, mocker, tmp_path):
         cur.execute("SELECT COUNT(*) FROM applicants;")
         assert cur.fetchone()[0] == 0, "Database should be empty before the test."
 
-    fake_file_path = create_fake_jsonl_file(tmp_path, FAKE_ENTRY_DATA)
-    mocker.patch('src.load_new_data.INPUT_FILE', fake_file_path) # Point loader to our fake file.
+    # The fake LLM step prints the entries for the loader to read.
+    fake_llm_step(mocker, tmp_path, FAKE_ENTRY_DATA)
     # Mock the scrape function to return the count
     mocker.patch('src.scrape_and_clean.main', return_value=len(FAKE_ENTRY_DATA))
-    mocker.patch('subprocess.run') # Mock the LLM subprocess call.
 
     # Call the endpoint that triggers the database write.
     response = client.post('/pull-data')
@@ -136,10 +123,8 @@ def test_idempotency_constraints(client, db_session, mocker, tmp_path):
     :type tmp_path: pathlib.Path
     """
     # Run the pull once to populate the database.
-    fake_file_path = create_fake_jsonl_file(tmp_path, FAKE_ENTRY_DATA)
-    mocker.patch('src.load_new_data.INPUT_FILE', fake_file_path)
+    fake_llm_step(mocker, tmp_path, FAKE_ENTRY_DATA)
     mocker.patch('src.scrape_and_clean.main', return_value=len(FAKE_ENTRY_DATA))
-    mocker.patch('subprocess.run')
     
     client.post('/pull-data')
     with db_session.cursor() as cur:
@@ -565,8 +550,8 @@ def test_scrape_and_clean_main_function(db_session, mocker):
     # Verify the scrape function was called with correct parameters
     mock_scrape.assert_called_once()
     
-    # Verify the file was written
-    mock_open.assert_called_with('new_structured_entries.json', 'w', encoding='utf-8')
+    # Verify the file was written; the metrics summary is saved after it.
+    mock_open.assert_any_call('new_structured_entries.jsonl', 'w', encoding='utf-8')
 
 
 @pytest.mark.db
@@ -608,7 +593,7 @@ def test_process_table_row():
     entry data from HTML table rows.
     """
     from bs4 import BeautifulSoup
-    from src.scrape_and_clean import process_table_row
+    from src.listing_parser import process_table_row
     
     # Create mock HTML structure
     html = """
@@ -771,4 +756,187 @@ def test_pipeline_psycopg_error(mocker, capsys):
     # Check that the error was printed
     captured = capsys.readouterr()
     assert "Database error occurred in the pipeline:" in captured.out
-    assert "PIPELINE PROCESS HAS CONCLUDED" in captured.out
\ No newline at end of file
+    assert "PIPELINE PROCESS HAS CONCLUDED" in captured.out
+
+@pytest.mark.db
+def test_pipeline_llm_files_follow_scraper_outputs(mocker, tmp_path):
+    """Test that the LLM step is given the scraper's file and the loaders read what it writes.
+
+    Every step takes its file names from ``src.pipeline_files``; the LLM
+    prints its output, which the app saves under the loader's input name.
+
+    :param mocker: The pytest-mock fixture for mocking objects.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    import src.app as app_module
+
+    mock_conn = mocker.MagicMock()
+    mock_conn.__enter__.return_value = mock_conn
+    mocker.patch('psycopg.connect', return_value=mock_conn)
+    mocker.patch('src.app.run_scrape_and_clean', return_value=1)
+    mocker.patch('src.app.run_data_loading')
+    cleaned_file = tmp_path / CLEANED_OUTPUT_FILE
+    mocker.patch('src.app.CLEANED_OUTPUT_FILE', str(cleaned_file))
+    mock_subprocess = mocker.patch('src.app.subprocess.run')
+
+    app_module.run_full_pipeline()
+
+    assert mock_subprocess.call_args.args[0] == [*LLM_COMMAND, SCRAPE_OUTPUT_FILE]
+    assert mock_subprocess.call_args.kwargs['stdout'].name == str(cleaned_file)
+    assert scrape_and_clean.OUTPUT_FILE == SCRAPE_OUTPUT_FILE
+    assert scrape_and_clean.RECRAWL_OUTPUT_FILE == RECRAWL_OUTPUT_FILE
+    assert load_new_data.INPUT_FILE == CLEANED_OUTPUT_FILE
+    assert load_new_data.UPDATE_INPUT_FILE == CLEANED_UPDATE_FILE
+    assert not CLEANED_OUTPUT_FILE.endswith('.jsonl.jsonl')
+
+@pytest.mark.db
+def test_loaders_insert_record_params(mocker, tmp_path):
+    """Test that both loaders parse lines into records and insert their parameters.
+
+    Fields the LLM step adds are read back, keys that are not fields are
+    ignored, and a missing LLM field counts as an empty string.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    lines = [json.dumps({**FAKE_ENTRY_DATA[0], 'llm_generated_program': 'Mechanical Engineering',
+                         'llm_generated_university': 'Post University'}),
+             json.dumps({'pid': 105, 'university': 'MIT'})]
+    test_file = tmp_path / "records.jsonl"
+    test_file.write_text("\n".join(lines) + "\n", encoding='utf-8')
+    hashes = [ApplicantRecord.from_json(line).content_hash() for line in lines]
+    expected = [
+        (103, 'Post University, Mechanical Engineering', 'Great experience.', '2025-09-01',
+         'http://example.com/101', 'Accepted', 'Fall 2025', 'American', 3.2, 319, 159, 4.1,
+         'PhD', 'Mechanical Engineering', 'Post University', hashes[0]),
+        (105, ', ', None, None, None, None, None, None, None, None, None, None, None, '', '',
+         hashes[1]),
+    ]
+
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.nextset.side_effect = [True, False]
+    mocker.patch('src.load_new_data.INPUT_FILE', str(test_file))
+    load_new_data_main(conn)
+    assert list(cur.executemany.call_args.args[1]) == expected
+
+    connect = mocker.patch('psycopg.connect')
+    cur = connect.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+    cur.nextset.side_effect = [True, False]
+    load_initial_json_data(str(test_file), "")
+    assert list(cur.executemany.call_args.args[1]) == expected
+
+
+@pytest.mark.db
+def test_loaders_stream_in_chunks(mocker, tmp_path, capsys):
+    """Test that both loaders hand the file to ``load_chunks`` and report its counts.
+
+    A malformed line in an initial load is reported after the rows before it
+    were handed over, and the connection is left to roll them back.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param capsys: Pytest fixture for capturing stdout.
+    :type capsys: pytest.CaptureFixture
+    """
+    test_file = tmp_path / "records.jsonl"
+    test_file.write_text("".join(json.dumps({'pid': pid}) + "\n" for pid in range(3)),
+                         encoding='utf-8')
+
+    def consume(conn, records, commit_each_chunk=False, update_changed=False):
+        return sum(1 for _ in records) - 1, 3
+
+    load = mocker.patch('src.load_data.load_chunks', side_effect=consume)
+    connect = mocker.patch('psycopg.connect')
+    load_initial_json_data(str(test_file), "", commit_each_chunk=True)
+    assert load.call_args.kwargs == {'commit_each_chunk': True}
+    assert "Added 2 new record(s)." in capsys.readouterr().out
+
+    with open(test_file, 'a', encoding='utf-8') as f:
+        f.write("{bad json}\n")
+    load_initial_json_data(str(test_file), "")
+    assert "Error decoding JSON" in capsys.readouterr().out
+    assert connect.return_value.__exit__.call_args.args[0] is json.JSONDecodeError
+
+    load = mocker.patch('src.load_new_data.load_chunks', side_effect=consume)
+    mocker.patch('src.load_new_data.INPUT_FILE', str(test_file))
+    conn = MagicMock()
+    load_new_data_main(conn, commit_each_chunk=True)
+    assert load.call_args.args[0] is conn
+    assert load.call_args.kwargs == {'commit_each_chunk': True, 'update_changed': False}
+    out = capsys.readouterr().out
+    assert "Skipping malformed JSON line: {bad json}" in out
+    assert "Successfully inserted 2 new entries out of 3 total." in out
+
+
+@pytest.mark.db
+def test_update_changed_data_rewrites_changed_rows(db_session, mocker, tmp_path):
+    """Test the re-crawl loader against the database, on a table without ``content_hash``.
+
+    :param db_session: Database session fixture providing a clean database connection.
+    :type db_session: psycopg.Connection
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    with db_session.cursor() as cur:
+        cur.execute("ALTER TABLE applicants DROP COLUMN content_hash;")
+    new_file = tmp_path / "new.jsonl"
+    new_file.write_text(json.dumps(FAKE_ENTRY_DATA[0]) + "\n", encoding='utf-8')
+    mocker.patch('src.load_new_data.INPUT_FILE', str(new_file))
+    load_new_data_main(db_session)
+
+    changed = {**FAKE_ENTRY_DATA[0], 'status': 'Rejected'}
+    updated_file = tmp_path / "updated.jsonl"
+    updated_file.write_text(json.dumps(changed) + "\n" + json.dumps(FAKE_ENTRY_DATA[1]) + "\n",
+                            encoding='utf-8')
+    mocker.patch('src.load_new_data.UPDATE_INPUT_FILE', str(updated_file))
+    assert update_changed_data(db_session) == 2
+    # Loading the same changes again finds nothing to rewrite.
+    assert update_changed_data(db_session) == 0
+
+    with db_session.cursor() as cur:
+        cur.execute("SELECT pid, status FROM applicants ORDER BY pid;")
+        assert cur.fetchall() == [(103, 'Rejected'), (104, 'Accepted')]
+
+
+@pytest.mark.db
+def test_update_changed_data_upserts_on_hash_change(mocker, tmp_path, capsys):
+    """Test that re-crawled entries are upserted only where the stored hash differs.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param capsys: Pytest fixture for capturing stdout.
+    :type capsys: pytest.CaptureFixture
+    """
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    mocker.patch('src.load_new_data.UPDATE_INPUT_FILE', str(tmp_path / "missing.jsonl"))
+    assert update_changed_data(conn) == 0
+    # Only the content_hash migration ran.
+    assert [call.args[0] for call in cur.execute.call_args_list] == [
+        "ALTER TABLE applicants ADD COLUMN IF NOT EXISTS content_hash TEXT;"
+    ]
+
+    test_file = tmp_path / "updated.jsonl"
+    test_file.write_text(json.dumps({'pid': 103, 'status': 'Accepted'}) + "\n",
+                         encoding='utf-8')
+    mocker.patch('src.load_new_data.UPDATE_INPUT_FILE', str(test_file))
+    cur.fetchone.return_value = (103,)
+    cur.nextset.return_value = False
+    assert update_changed_data(conn) == 1
+    # The upserts go through the same pipelined batch as new entries.
+    query, params = cur.executemany.call_args.args
+    assert query is upsert_returning_query
+    assert 'IS DISTINCT FROM EXCLUDED."content_hash"' in query.as_string(None)
+    assert [row[0] for row in params] == [103]
+    assert "Successfully updated 1 changed entries out of 1 total." in capsys.readouterr().out
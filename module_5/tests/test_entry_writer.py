@@ -0,0 +1,34 @@
+import gzip
+import pytest
+import json
+import zlib
+from datetime import date
+from src.entry_writer import EntryWriter
+
+
+@pytest.mark.web
+def test_entry_writer_gzip_and_empty_runs(tmp_path):
+    """Test gzip output, readable up to the last flush, and that no entries means no file.
+
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    with EntryWriter(str(tmp_path / "empty.jsonl")) as writer:
+        writer.write([])
+    assert not (tmp_path / "empty.jsonl").exists()
+
+    path = tmp_path / "entries.jsonl.gz"
+    writer = EntryWriter(str(path))
+    writer.write([{'pid': 1, 'date_added': date(2025, 9, 1)}])
+    writer.write([{'pid': 2}])
+
+    # Before closing, everything flushed so far can be read back.
+    with open(path, 'rb') as f:
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        partial = decoder.decompress(f.read()).decode('utf-8')
+    assert partial.splitlines() == ['{"pid": 1, "date_added": "2025-09-01"}', '{"pid": 2}']
+
+    writer.close()
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert [json.loads(line)['pid'] for line in f] == [1, 2]
+    assert writer.count == 2
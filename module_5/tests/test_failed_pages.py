@@ -0,0 +1,43 @@
+import pytest
+import json
+from src.applicant_record import ApplicantRecord
+from src.failed_pages import FailedPages, entry_bound
+
+
+@pytest.mark.web
+def test_failed_pages_records_gaps_and_gives_up():
+    """Test skipped pages, giving up over a run of failures, and the saved state."""
+    failed = FailedPages()
+    assert not failed and repr(failed) == "FailedPages(pages=[], gave_up_at=None)"
+
+    bound = {'date_added': '2025-09-28', 'pid': 3}
+    failed.add(2, {'date_added': '2025-09-29', 'pid': 1})
+    failed.add(4, bound)
+    failed.add(5, bound)
+    failed.give_up(4, bound)
+
+    assert failed and failed.pages == [2] and failed.gave_up_at == 4
+    assert failed.bounds == {2: {'date_added': '2025-09-29', 'pid': 1}, 4: bound}
+
+    copy = FailedPages()
+    copy.restore(json.loads(json.dumps(failed.state())))
+    assert copy.pages == [2] and copy.gave_up_at == 4 and copy.bounds == failed.bounds
+    copy.restore(None)
+    assert not copy and copy.bounds == {}
+
+
+@pytest.mark.web
+def test_failed_pages_keeps_only_entries_below_the_bound():
+    """Test that rows the run collected before a gap are dropped from its refetch."""
+    failed = FailedPages([3], bounds={3: {'date_added': '2025-09-28', 'pid': 5}})
+    entries = [ApplicantRecord(pid=pid, date_added=date_added) for pid, date_added in
+               [(7, '2025-09-28'), (5, '2025-09-28'), (6, '2025-09-27'), (4, '2025-09-28')]]
+
+    # Rows pushed down by new posts repeat the bound row and above; a late
+    # PID on an older date, or an older PID, still counts as missing.
+    assert [entry.pid for entry in failed.missing(3, entries)] == [6, 4]
+    assert failed.missing(9, entries) == entries
+
+    assert entry_bound(entries[0]) == {'date_added': '2025-09-28', 'pid': 7}
+    assert entry_bound({'pid': 1, 'date_added': '2025-09-01'})['pid'] == 1
+    assert entry_bound(None) is None
@@ -1,6 +1,6 @@
 import pytest
-import json
 from bs4 import BeautifulSoup
+from tests.conftest import fake_llm_step
 
 
 FAKE_ENTRY_DATA = [
@@ -44,14 +44,8 @@ def test_end_to_end_flow_pull_update_render(client, db_session, mocker, tmp_path
     :type tmp_path: pathlib.Path
     """
     # --- SETUP & PULL ---
-    jsonl_file = tmp_path / "integration_test_data.jsonl"
-    with open(jsonl_file, 'w') as f:
-        for item in FAKE_ENTRY_DATA:
-            f.write(json.dumps(item) + '\n')
-
-    mocker.patch('src.load_new_data.INPUT_FILE', str(jsonl_file))
+    fake_llm_step(mocker, tmp_path, FAKE_ENTRY_DATA)
     mocker.patch('src.app.run_scrape_and_clean', return_value=len(FAKE_ENTRY_DATA))
-    mocker.patch('subprocess.run')
 
     pull_response = client.post('/pull-data')
     assert pull_response.status_code == 200
@@ -98,14 +92,8 @@ def test_multiple_pulls_are_idempotent(client, db_session, mocker, tmp_path):
     :type tmp_path: pathlib.Path
     """
     # --- FIRST PULL ---
-    jsonl_file = tmp_path / "idempotency_test_data.jsonl"
-    with open(jsonl_file, 'w') as f:
-        for item in FAKE_ENTRY_DATA:
-            f.write(json.dumps(item) + '\n')
-    
-    mocker.patch('src.load_new_data.INPUT_FILE', str(jsonl_file))
+    fake_llm_step(mocker, tmp_path, FAKE_ENTRY_DATA)
     mocker.patch('src.app.run_scrape_and_clean', return_value=len(FAKE_ENTRY_DATA))
-    mocker.patch('subprocess.run')
     
     # Run the first pull.
     client.post('/pull-data')
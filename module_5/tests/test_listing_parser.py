@@ -0,0 +1,21 @@
+import pytest
+from src.listing_parser import parse_listing_page
+from src.row_extractor import extract_listing_rows
+from tests.conftest import build_listing_page
+
+
+@pytest.mark.web
+def test_parse_listing_page_falls_back_to_beautifulsoup():
+    """Test that a page the fast path refuses is still parsed via BeautifulSoup.
+
+    An unclosed ``<tbody>`` makes the streaming extractor give up, but the
+    BeautifulSoup fallback recovers the same entry.
+    """
+    page = build_listing_page([(777, "05 Sep 2025")]).replace("</tbody>", "")
+    assert extract_listing_rows(page) is None
+
+    entries, keep_going = parse_listing_page(page, None, set())
+
+    assert keep_going
+    assert [entry['pid'] for entry in entries] == [777]
+    assert entries[0]['gpa'] == 3.5
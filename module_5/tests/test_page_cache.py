@@ -0,0 +1,169 @@
+import pytest
+import os
+from datetime import date
+from src.scrape_and_clean import scrape_and_clean, make_fetcher
+from src.scrape_options import ScrapeOptions
+from src.page_cache import PageCache
+from tests.conftest import fake_response, respond_with, FAKE_SITE
+
+
+def cached_site_request(requested_headers):
+    """Return a ``PoolManager.request`` replacement that honours ``If-None-Match``.
+
+    Every page carries the ETag ``"v<page>"``; a request that presents it gets a
+    ``304 Not Modified`` with no body.
+
+    :param requested_headers: List that records the headers of every request.
+    :type requested_headers: list[dict]
+    :returns: A callable suitable as a mock ``side_effect``.
+    :rtype: callable
+    """
+    def _request(_method, url, headers=None, **_kwargs):
+        requested_headers.append(dict(headers or {}))
+        page_num = int(url.rsplit('=', 1)[1])
+        etag = f'"v{page_num}"'
+        validators = {'ETag': etag, 'Last-Modified': 'Tue, 30 Sep 2025 00:00:00 GMT'}
+        if (headers or {}).get('If-None-Match') == etag:
+            return fake_response(304, headers=validators)
+        return fake_response(200, FAKE_SITE.get(page_num, "<tbody></tbody>").encode('utf-8'),
+                             validators)
+    return _request
+
+
+@pytest.mark.web
+def test_page_cache_round_trip(tmp_path):
+    """Test storing a page, reading it back and building its conditional headers.
+
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    cache = PageCache(str(tmp_path))
+    assert cache.get('https://example.com/?page=1') is None
+    assert PageCache.conditional_headers(None) == {}
+
+    cache.put('https://example.com/?page=1', b'<html>one</html>', etag='"a"',
+              last_modified='Tue, 30 Sep 2025 00:00:00 GMT')
+    page = cache.get('https://example.com/?page=1')
+
+    assert page['body'] == b'<html>one</html>'
+    assert PageCache.conditional_headers(page) == {
+        'If-None-Match': '"a"',
+        'If-Modified-Since': 'Tue, 30 Sep 2025 00:00:00 GMT',
+    }
+    assert not cache.is_fresh(page)
+    # A second cache over the same directory picks up the stored size.
+    assert PageCache(str(tmp_path))._size == cache._size > 0
+
+
+@pytest.mark.web
+def test_scrape_revalidates_cached_pages(mocker, tmp_path, capsys):
+    """Test that a repeat scrape sends conditional GETs and reuses 304 bodies.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param capsys: Pytest fixture for capturing stdout and stderr.
+    :type capsys: pytest.CaptureFixture
+    """
+    requested_headers = []
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=cached_site_request(requested_headers))
+    mocker.patch('src.scrape_and_clean.PAGE_CACHE_DIR', str(tmp_path))
+    cutoff = date(2025, 9, 23)
+    kwargs = {'probe': False}
+
+    # Page 4 is past the cutoff, so a limit of 4 leaves no page to fetch
+    # speculatively; every run requests exactly the pages the first one cached.
+    first = scrape_and_clean(cutoff, page_limit=4, options=ScrapeOptions(**kwargs))
+    assert not any('If-None-Match' in headers for headers in requested_headers)
+
+    requested_headers.clear()
+    second = scrape_and_clean(cutoff, page_limit=4, options=ScrapeOptions(**kwargs))
+
+    assert second == first
+    assert requested_headers and all(
+        headers['If-None-Match'].startswith('"v') for headers in requested_headers
+    )
+
+    # Within the freshness window no request is made at all.
+    requested_headers.clear()
+    fresh = scrape_and_clean(cutoff, page_limit=4, options=ScrapeOptions(
+        cache=PageCache(str(tmp_path), fresh_for=60), **kwargs
+    ))
+    assert fresh == first
+    assert requested_headers == []
+    assert "Using cached page 1." in capsys.readouterr().out
+
+
+@pytest.mark.web
+def test_cached_page_is_dropped_on_error_status(mocker, tmp_path, capsys):
+    """Test that an error status on revalidation is reported like any failed fetch.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param capsys: Pytest fixture for capturing stdout and stderr.
+    :type capsys: pytest.CaptureFixture
+    """
+    cache = PageCache(str(tmp_path))
+    fetcher = make_fetcher(1, cache)
+    cache.put(fetcher.page_url(1), b'<tbody></tbody>', etag='"old"')
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=respond_with(500))
+
+    assert fetcher.fetch(1) is None
+    assert "Failed to fetch page 1. Status: 500" in capsys.readouterr().out
+
+
+@pytest.mark.web
+def test_page_cache_eviction(tmp_path, mocker):
+    """Test age and size eviction and recovery from corrupt cache files.
+
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    clock = mocker.patch('src.page_cache.time.time', return_value=1000.0)
+    cache = PageCache(str(tmp_path), max_bytes=10 ** 6, max_age=100)
+    for page in range(3):
+        clock.return_value = 1000.0 + page
+        cache.put(f'https://example.com/?page={page}', bytes(range(256)) * 4)
+        # Room for two pages: the third put goes over the size budget.
+        cache.max_bytes = min(cache.max_bytes, cache._size * 2)
+
+    # Over the size budget the oldest entries go first.
+    assert cache.get('https://example.com/?page=0') is None
+    assert cache.get('https://example.com/?page=2') is not None
+
+    # A revalidated entry is kept past the age of its first download.
+    clock.return_value = 1090.0
+    cache.touch('https://example.com/?page=2')
+    clock.return_value = 1150.0
+    cache.evict()
+    assert cache.get('https://example.com/?page=1') is None
+    assert cache.get('https://example.com/?page=2') is not None
+
+    # Expired entries are dropped on read as well.
+    clock.return_value = 1200.0
+    assert cache.get('https://example.com/?page=2') is None
+    cache.touch('https://example.com/?page=2')
+    assert list(tmp_path.iterdir()) == []
+
+    # Corrupt bodies and metadata are treated as misses and cleaned up.
+    cache.put('https://example.com/?page=3', b'body')
+    cache.put('https://example.com/?page=4', b'body')
+    cache.put('https://example.com/?page=5', b'body')
+    body_path, meta_path = cache._paths('https://example.com/?page=3')
+    with open(body_path, 'wb') as f:
+        f.write(b'not gzip')
+    assert cache.get('https://example.com/?page=3') is None
+    _, meta_path = cache._paths('https://example.com/?page=4')
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        f.write('{')
+    _, meta_path = cache._paths('https://example.com/?page=5')
+    os.remove(meta_path)
+    cache.evict()
+    assert list(tmp_path.iterdir()) == []
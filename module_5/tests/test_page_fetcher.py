@@ -0,0 +1,118 @@
+import gzip
+import pytest
+import zlib
+import urllib3
+from src.scrape_and_clean import scrape_and_clean, make_fetcher
+from src.scrape_options import ScrapeOptions
+from src.page_cache import PageCache
+from src.retry_policy import RetryPolicy
+from src.scrape_metrics import ScrapeMetrics
+from tests.conftest import (
+    truncated_response, respond_with, FAKE_SITE, dated_site_request, flaky_site_request
+)
+
+
+@pytest.mark.web
+def test_fetcher_retries_transient_failures(mocker, capsys):
+    """Test that network errors and 5xx answers are retried until the page arrives.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param capsys: Pytest fixture for capturing stdout and stderr.
+    :type capsys: pytest.CaptureFixture
+    """
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(64, []))
+    expected = scrape_and_clean(page_limit=6, options=ScrapeOptions(probe=False))
+
+    sleep = mocker.patch('src.page_fetcher.time.sleep')
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=flaky_site_request({2: [503, 'network'], 4: [502]}))
+
+    result = scrape_and_clean(page_limit=6, options=ScrapeOptions(
+        probe=False, retry=RetryPolicy(base_delay=0.01)
+    ))
+
+    assert result == expected
+    assert sleep.call_count == 3
+    output = capsys.readouterr().out
+    assert "Failed to fetch page 2. Status: 503" in output
+    assert "Retrying page 2 in" in output
+
+    # A 404 is final, and so is any failure once the budget is spent.
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=flaky_site_request({1: [404], 2: [503]}))
+    fetcher = make_fetcher(1, retry=RetryPolicy(budget=0))
+    assert fetcher.fetch(1) is None
+    assert fetcher.fetch(2) is None
+    assert sleep.call_count == 3
+
+
+@pytest.mark.web
+def test_fetcher_treats_broken_bodies_as_network_errors(mocker, capsys):
+    """Test that a body that breaks off or cannot be decoded fails the page, not the scrape.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param capsys: Pytest fixture for capturing stdout and stderr.
+    :type capsys: pytest.CaptureFixture
+    """
+    sleep = mocker.patch('src.page_fetcher.time.sleep')
+    metrics = ScrapeMetrics()
+    mocker.patch('urllib3.PoolManager.request', side_effect=lambda *_args, **_kwargs:
+                 truncated_response())
+    assert make_fetcher(1, metrics=metrics).fetch(1) is None
+    assert "Network error while reading page 1" in capsys.readouterr().out
+
+    mocker.patch('urllib3.PoolManager.request', side_effect=respond_with(
+        200, b'not gzip', {'Content-Encoding': 'gzip'}))
+    assert make_fetcher(1, metrics=metrics).fetch(2) is None
+    summary = metrics.summary()
+    assert summary['statuses']['network_error'] == 2
+    assert summary['pages']['failed'] == 2
+    assert sleep.call_count == 0
+
+    # With a retry policy the page is requested again, like any network error.
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=flaky_site_request({3: ['truncated', 'truncated']}))
+    body = make_fetcher(1, retry=RetryPolicy(base_delay=0.01)).fetch(3)
+    assert b'/result/6' in body
+    assert sleep.call_count == 2
+
+
+def encode_body(data, coding):
+    """Compress a body the way a server would for ``Content-Encoding: coding``."""
+    if coding == 'gzip':
+        return gzip.compress(data)
+    if coding == 'deflate':
+        return zlib.compress(data)
+    return urllib3.response.brotli.compress(data)
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("coding", [
+    'gzip', 'deflate',
+    pytest.param('br', marks=pytest.mark.skipif(urllib3.response.brotli is None,
+                                                reason="brotli is not installed")),
+])
+def test_fetcher_negotiates_and_stream_decodes_compression(mocker, tmp_path, coding):
+    """Test that pages are requested compressed, decoded in chunks and cached decoded.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param coding: Content coding the fake server answers with.
+    :type coding: str
+    """
+    page = FAKE_SITE[1].encode('utf-8') * 50
+    request = mocker.patch('urllib3.PoolManager.request', side_effect=respond_with(
+        200, encode_body(page, coding), {'Content-Encoding': coding}))
+    mocker.patch('src.page_fetcher.STREAM_CHUNK_SIZE', 256)
+    cache = PageCache(str(tmp_path))
+    fetcher = make_fetcher(1, cache)
+
+    assert fetcher.fetch(1) == page
+    assert cache.get(fetcher.page_url(1))['body'] == page
+    kwargs = request.call_args.kwargs
+    assert kwargs['preload_content'] is False
+    assert kwargs['headers']['Accept-Encoding'].startswith('gzip,deflate')
@@ -0,0 +1,47 @@
+import pytest
+import pickle
+import psycopg
+from unittest.mock import MagicMock
+from src.pid_index import PidIndex, load_pid_index
+
+
+@pytest.mark.web
+def test_pid_index_membership():
+    """Test the watermark floor, the sorted recent PIDs and pickling for parser processes."""
+    index = PidIndex(1000, [995, 1000, 500, 990], window=20)
+
+    assert index.floor == 980 and len(index) == 3
+    assert 995 in index and 1000 in index
+    assert 996 not in index and 1001 not in index
+    assert 970 in index
+    assert index.is_past(980) and not index.is_past(981)
+
+    copy = pickle.loads(pickle.dumps(index))
+    assert [pid in copy for pid in (970, 990, 991)] == [True, True, False]
+
+
+@pytest.mark.web
+def test_load_pid_index_uses_pid_queries_only(capsys):
+    """Test loading the index from the primary key, an empty table and a database error.
+
+    :param capsys: Pytest fixture for capturing stdout and stderr.
+    :type capsys: pytest.CaptureFixture
+    """
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.fetchone.return_value = (1000,)
+    cur.fetchall.return_value = [(1000,), (998,), (996,)]
+
+    index = load_pid_index(conn, window=10)
+
+    assert index.watermark == 1000 and index.floor == 990
+    assert 998 in index and 999 not in index
+    assert cur.execute.call_args_list[-1].args == (
+        "SELECT pid FROM applicants WHERE pid > %s;", (990,))
+    assert "Tracking 3 PIDs above 990" in capsys.readouterr().out
+
+    cur.fetchone.return_value = (None,)
+    assert load_pid_index(conn) is None
+
+    conn.cursor.side_effect = psycopg.OperationalError("DB connection failed")
+    assert load_pid_index(conn) is None
@@ -0,0 +1,111 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from src.scrape_and_clean import scrape_and_clean
+from src.scrape_options import ScrapeOptions
+from src.rate_limiter import RateLimiter, parse_retry_after
+from urllib.robotparser import RobotFileParser
+from tests.conftest import fake_response, dated_site_request
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("robots_lines, expected_rate", [
+    ([], 5.0),
+    (["User-agent: *", "Crawl-delay: 1"], 1.0),
+    (["User-agent: *", "Crawl-delay: 2", "Request-rate: 1/5"], 0.2),
+    (["User-agent: Burch", "Request-rate: 3/1"], 3.0),
+])
+def test_rate_limiter_ceiling_follows_robots(robots_lines, expected_rate):
+    """Test that the strictest of crawl-delay, request-rate and the default is the ceiling.
+
+    :param robots_lines: Lines of the robots.txt file.
+    :type robots_lines: list[str]
+    :param expected_rate: Expected maximum requests per second.
+    :type expected_rate: float
+    """
+    parser = RobotFileParser()
+    parser.parse(robots_lines)
+
+    limiter = RateLimiter.from_robots(parser, 'Burch')
+
+    assert limiter.max_rate == pytest.approx(expected_rate)
+    assert limiter.rate == limiter.max_rate
+
+
+@pytest.mark.web
+def test_rate_limiter_paces_and_adapts(mocker):
+    """Test token-bucket pacing, AIMD adjustment and Retry-After debt on a fake clock.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    clock = [100.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+    mocker.patch('src.rate_limiter.time.monotonic', side_effect=lambda: clock[0])
+    mocker.patch('src.rate_limiter.time.sleep', side_effect=fake_sleep)
+
+    limiter = RateLimiter(2.0, increase=0.5)
+    for _ in range(3):
+        limiter.acquire()
+    assert sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
+
+    # Throttling halves the rate down to the floor; successes climb back to the ceiling.
+    for _ in range(10):
+        limiter.on_throttle()
+    assert limiter.rate == limiter.min_rate == 2.0 / 32
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.rate == 2.0
+
+    # Retry-After holds back the next request for at least that long.
+    sleeps.clear()
+    limiter.on_throttle(retry_after=30)
+    limiter.acquire()
+    assert sum(sleeps) >= 30
+
+
+@pytest.mark.web
+def test_parse_retry_after(mocker):
+    """Test reading Retry-After as seconds, as an HTTP date, and when malformed.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    assert parse_retry_after(None) is None
+    assert parse_retry_after(' 120 ') == 120.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 -0000') == 0.0
+
+    future = datetime.now(timezone.utc) + timedelta(seconds=90)
+    delay = parse_retry_after(future.strftime('%a, %d %b %Y %H:%M:%S GMT'))
+    assert 80 < delay <= 90
+
+
+@pytest.mark.web
+def test_fetcher_reports_throttling_to_shared_limiter(mocker):
+    """Test that every worker paces through one limiter and reports 429/503 to it.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    serve = dated_site_request(64, [])
+
+    def throttle_page_3(method, url, **kwargs):
+        if url.endswith('page=3'):
+            return fake_response(429, headers={'Retry-After': '7'})
+        return serve(method, url, **kwargs)
+    mocker.patch('urllib3.PoolManager.request', side_effect=throttle_page_3)
+    limiter = MagicMock(spec=RateLimiter)
+
+    result = scrape_and_clean(page_limit=10, options=ScrapeOptions(
+        probe=False, max_workers=4, limiter=limiter
+    ))
+
+    assert [entry['pid'] for entry in result] == [2, 1, 4, 3]
+    assert limiter.acquire.call_count >= 3
+    limiter.on_throttle.assert_called_once_with(7.0)
+    assert limiter.on_success.call_count == limiter.acquire.call_count - 1
@@ -0,0 +1,23 @@
+import pytest
+from src.retry_policy import RetryPolicy
+
+
+@pytest.mark.web
+def test_retry_policy_budget_and_backoff(mocker):
+    """Test the attempt limit, the shared budget and the jittered backoff bounds.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    policy = RetryPolicy(attempts=3, base_delay=1.0, max_delay=5.0, budget=3)
+    assert policy.allow(0) and policy.allow(1)
+    assert not policy.allow(2)
+    assert policy.allow(0)
+    assert not policy.allow(0)
+
+    uniform = mocker.patch('src.retry_policy.random.uniform', side_effect=lambda low, high: high)
+    assert policy.backoff(0) == 1.0
+    assert policy.backoff(2) == 4.0
+    assert policy.backoff(6) == 5.0
+    assert policy.backoff(0, retry_after=12.0) == 12.0
+    uniform.assert_called_with(0, 1.0)
@@ -0,0 +1,189 @@
+import pytest
+import threading
+from src.robots_cache import RobotsCache
+from urllib.robotparser import RobotFileParser
+
+
+class FakeRobotsParser(RobotFileParser):
+    """RobotFileParser that "downloads" ``LINES`` instead of going to the network."""
+
+    LINES = ["User-agent: *", "Crawl-delay: 2", "Disallow: /admin"]
+    reads = 0
+    error = None
+    release = None
+
+    def read(self):
+        type(self).reads += 1
+        if self.release is not None:
+            self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        self.parse(self.LINES)
+
+
+@pytest.fixture
+def fake_robots_parser(monkeypatch):
+    """Reset the fake parser's class-level state for each test.
+
+    :param monkeypatch: Pytest fixture used to reset class attributes.
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: The fake parser class.
+    :rtype: type
+    """
+    monkeypatch.setattr(FakeRobotsParser, 'reads', 0)
+    monkeypatch.setattr(FakeRobotsParser, 'LINES', list(FakeRobotsParser.LINES))
+    return FakeRobotsParser
+
+
+def load_robots(cache, parser_class, url='https://example.com/robots.txt'):
+    """Fill a new parser through ``cache`` and return it with any refresh thread."""
+    parser = parser_class()
+    parser.set_url(url)
+    return parser, cache.load(parser, url)
+
+
+@pytest.mark.web
+def test_robots_cache_reuses_fresh_policy(tmp_path, fake_robots_parser):
+    """Test that a fresh policy is served from memory and from disk without a read.
+
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param fake_robots_parser: Fake parser class that counts its reads.
+    :type fake_robots_parser: type
+    """
+    path = str(tmp_path / 'robots.json')
+    cache = RobotsCache(path)
+
+    first, thread = load_robots(cache, fake_robots_parser)
+    assert thread is None and fake_robots_parser.reads == 1
+
+    # Same run, then a later run that only has the file.
+    for reused_cache in (cache, RobotsCache(path)):
+        parser, thread = load_robots(reused_cache, fake_robots_parser)
+        assert thread is None and fake_robots_parser.reads == 1
+        assert parser.crawl_delay('Burch') == first.crawl_delay('Burch') == 2
+        assert not parser.can_fetch('Burch', 'https://example.com/admin')
+        assert parser.can_fetch('Burch', 'https://example.com/survey/index.php')
+
+
+@pytest.mark.web
+def test_robots_cache_refreshes_stale_policy(tmp_path, mocker, fake_robots_parser, capsys):
+    """Test background refreshes after the TTL and blocking reads after ``max_stale``.
+
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param mocker: Pytest mocker fixture for mocking the clock.
+    :type mocker: pytest_mock.MockerFixture
+    :param fake_robots_parser: Fake parser class that counts its reads.
+    :type fake_robots_parser: type
+    :param capsys: Pytest fixture for capturing stdout and stderr.
+    :type capsys: pytest.CaptureFixture
+    """
+    clock = mocker.patch('src.robots_cache.time.time', return_value=1000.0)
+    path = str(tmp_path / 'robots.json')
+    cache = RobotsCache(path, ttl=100, max_stale=1000)
+    load_robots(cache, fake_robots_parser)
+
+    # Past the TTL the old rules are used at once while a thread fetches new ones.
+    fake_robots_parser.LINES = ["User-agent: *", "Disallow: /"]
+    clock.return_value = 1150.0
+    parser, thread = load_robots(cache, fake_robots_parser)
+    assert parser.can_fetch('Burch', 'https://example.com/survey/index.php')
+    thread.join()
+    parser, thread = load_robots(cache, fake_robots_parser)
+    assert thread is None and fake_robots_parser.reads == 2
+    assert not parser.can_fetch('Burch', 'https://example.com/survey/index.php')
+
+    # Only one refresh runs at a time, and a failed one keeps the cached rules.
+    clock.return_value = 1300.0
+    fake_robots_parser.release = threading.Event()
+    fake_robots_parser.error = OSError('connection refused')
+    try:
+        _, thread = load_robots(cache, fake_robots_parser)
+        _, same_thread = load_robots(cache, fake_robots_parser)
+        assert same_thread is thread
+    finally:
+        fake_robots_parser.release.set()
+    thread.join()
+    fake_robots_parser.release = fake_robots_parser.error = None
+    assert "Could not refresh https://example.com/robots.txt" in capsys.readouterr().out
+    assert fake_robots_parser.reads == 3
+
+    # Another run refreshing the file is picked up once this copy goes stale.
+    clock.return_value = 1400.0
+    fake_robots_parser.LINES = ["User-agent: *", "Crawl-delay: 7"]
+    load_robots(RobotsCache(path, max_stale=0), fake_robots_parser)
+    parser, thread = load_robots(cache, fake_robots_parser)
+    assert thread is None and parser.crawl_delay('Burch') == 7
+
+    # Too stale to trust: read before returning.
+    clock.return_value = 9000.0
+    _, thread = load_robots(cache, fake_robots_parser)
+    assert thread is None and fake_robots_parser.reads == 5
+
+
+@pytest.mark.web
+def test_robots_cache_flags_and_failures(tmp_path, mocker):
+    """Test that access flags are cached, failed reads are not, and bad files are ignored.
+
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param mocker: Pytest mocker fixture for mocking reads.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    path = tmp_path / 'robots.json'
+    path.write_text('not json', encoding='utf-8')
+    cache = RobotsCache(str(path))
+
+    # A 5xx answer leaves no rules and no flags, so the next run asks again.
+    read = mocker.patch.object(RobotFileParser, 'read')
+    load_robots(cache, RobotFileParser)
+    load_robots(cache, RobotFileParser)
+    assert read.call_count == 2
+    assert path.read_text(encoding='utf-8') == 'not json'
+
+    # A 401/403 answer means "disallow everything" and is worth remembering.
+    def forbidden(parser):
+        parser.disallow_all = True
+    read.side_effect = lambda: forbidden(parser)
+    parser = RobotFileParser()
+    parser.set_url('https://example.com/robots.txt')
+    cache.load(parser, 'https://example.com/robots.txt')
+    reused, _ = load_robots(RobotsCache(str(path)), RobotFileParser)
+    assert read.call_count == 3
+    assert not reused.can_fetch('Burch', 'https://example.com/survey/index.php')
+
+    # Without a path the cache lives in memory only.
+    memory_only = RobotsCache()
+    read.side_effect = lambda: forbidden(parser)
+    parser = RobotFileParser()
+    memory_only.load(parser, 'https://example.com/robots.txt')
+    load_robots(memory_only, RobotFileParser)
+    assert read.call_count == 4
+
+
+@pytest.mark.web
+def test_robots_cache_survives_failed_write(tmp_path, mocker, fake_robots_parser, capsys):
+    """Test that a cache file that cannot be written leaves the policy cached in memory.
+
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param mocker: Pytest mocker fixture for failing the file move.
+    :type mocker: pytest_mock.MockerFixture
+    :param fake_robots_parser: Fake parser class that counts its reads.
+    :type fake_robots_parser: type
+    :param capsys: Pytest fixture for capturing stdout and stderr.
+    :type capsys: pytest.CaptureFixture
+    """
+    path = tmp_path / 'robots.json'
+    cache = RobotsCache(str(path))
+    mocker.patch('src.robots_cache.os.replace', side_effect=OSError('read-only file system'))
+
+    parser, thread = load_robots(cache, fake_robots_parser)
+    assert thread is None and parser.crawl_delay('Burch') == 2
+    assert "Could not save the robots.txt cache" in capsys.readouterr().out
+    assert not path.exists()
+
+    # The same run still reuses the policy it read.
+    load_robots(cache, fake_robots_parser)
+    assert fake_robots_parser.reads == 1
@@ -0,0 +1,71 @@
+import pytest
+from src.row_extractor import extract_listing_rows, rows_from_soup
+from tests.conftest import FAKE_HTML, FAKE_SITE
+
+
+# Markup the streaming extractor must read exactly like BeautifulSoup does:
+# entities, comments splitting text, nested spans, void and self-closing tags.
+TRICKY_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body><table><tbody>
+    <tr>
+        <td>Caf&eacute; &amp; Co<!-- hidden --> University<?pi x?></td>
+        <td><div><span>Data <b>Science</b></span><br><span>PhD<span/></span></div></td>
+        <td>  02 Jan  </td>
+        <td>Wait listed on 03 Jan</td>
+        <td><a>no link</a><a href="/about">About</a><a href="/result/555">Note</a></td>
+    </tr>
+    <tr><td colspan="3"><div class="tw-inline-flex extra"><span>GRE V</span> 160</div>
+        <div class="tw-inline-flex"/><img src="x.png"/></td></tr>
+    <tr><td colspan="100%"><p>First <i>comment</i></p><p>Second</p></td></tr>
+</tbody></table><table><tbody><tr><td>ignored</td><td>table</td></tr></tbody></table></body></html>
+"""
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("html", [FAKE_HTML, FAKE_SITE[1], TRICKY_HTML])
+def test_streaming_extractor_matches_beautifulsoup(html):
+    """Test that the streaming extractor produces the same rows as BeautifulSoup.
+
+    :param html: Listing page markup to extract.
+    :type html: str
+    """
+    streamed = extract_listing_rows(html.encode('utf-8'))
+
+    assert streamed is not None
+    assert streamed == rows_from_soup(html.encode('utf-8'))
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("html", [
+    "<tbody><tr><td>a</td><td>b</td>",                          # unclosed tbody
+    "<tbody><tr><td><table></table></td></tr></tbody>",          # nested table
+    "<tbody><tr><td><tr></tr></td></tr></tbody>",                # nested row
+    "<tbody><tr><td><td></td></td></tr></tbody>",                # nested cell
+    "<tbody><div></div></tbody>",                                # non-row child
+    "<tbody><tr><th>x</th></tr></tbody>",                        # header cell
+    "<tbody><tr><span>x</span></tr></tbody>",                    # non-cell child
+    "<tbody><tr><td><b>x</i></td></tr></tbody>",                 # mismatched end tag
+    "<tbody><tr><td><script>var a;</script></td></tr></tbody>",  # script content
+    "<tbody><tr><td><![CDATA[x]]></td></tr></tbody>",            # CDATA section
+])
+def test_streaming_extractor_defers_unsupported_markup(html):
+    """Test that markup the streaming extractor cannot mirror is left to BeautifulSoup.
+
+    :param html: Listing page markup the fast path should refuse.
+    :type html: str
+    """
+    assert extract_listing_rows(html) is None
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("page_data", [
+    b'<meta charset="windows-1252"><tbody></tbody>',
+    b'<tbody><tr><td>\xff</td></tr></tbody>',
+])
+def test_streaming_extractor_defers_non_utf8_pages(page_data):
+    """Test that pages not encoded as UTF-8 are left to BeautifulSoup's detection.
+
+    :param page_data: Raw page bytes.
+    :type page_data: bytes
+    """
+    assert extract_listing_rows(page_data) is None
@@ -0,0 +1,134 @@
+import pytest
+import urllib3
+from datetime import date
+from src.scrape_and_clean import main as scrape_main, scrape_and_clean, make_fetcher
+from src.scrape_options import ScrapeOptions
+from src.failed_pages import FailedPages
+from src.page_cache import PageCache
+from src.retry_policy import RetryPolicy
+from src.scrape_metrics import Histogram, ScrapeMetrics, load_summary
+from urllib.robotparser import RobotFileParser
+from tests.conftest import FAKE_HTML, respond_with, dated_site_request
+
+
+@pytest.mark.web
+def test_histogram_buckets_and_percentiles():
+    """Test bucket counts, percentile estimates and the overflow bucket."""
+    histogram = Histogram((1, 10, 100))
+    assert histogram.summary()['p50'] is None
+
+    for value in (0.5, 2, 3, 4, 50, 500):
+        histogram.add(value)
+    summary = histogram.summary()
+
+    assert summary['buckets'] == {'1': 1, '10': 3, '100': 1, '+Inf': 1}
+    assert (summary['count'], summary['min'], summary['max']) == (6, 0.5, 500)
+    assert summary['mean'] == pytest.approx(559.5 / 6)
+    # A percentile is the bound of its bucket, capped at the largest value seen.
+    assert (summary['p50'], summary['p90'], summary['p99']) == (10, 500, 500)
+
+
+@pytest.mark.web
+def test_scrape_metrics_count_pages_rows_and_retries(mocker, tmp_path):
+    """Test that a scrape reports every fetch and parse to its metrics.
+
+    Page 1 (29 Sep) has two new rows, page 2 always answers 500, page 3
+    (27 Sep) has one new row and PID 5, which is already stored, and page 4
+    (26 Sep) is past the cutoff.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    mocker.patch('src.page_fetcher.time.sleep')
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=dated_site_request(10, [], failing_pages=(2,)))
+    metrics = ScrapeMetrics()
+
+    entries = scrape_and_clean(latest_db_date=date(2025, 9, 27), pids_on_latest_date={5},
+                               options=ScrapeOptions(
+                                   probe=False, max_workers=1, failed_pages=FailedPages(),
+                                   retry=RetryPolicy(attempts=2, base_delay=0), metrics=metrics
+                               ))
+    summary = metrics.write(str(tmp_path / 'metrics.json'))
+
+    assert [entry.pid for entry in entries] == [2, 1, 6]
+    assert summary['rows'] == {'new': 3, 'duplicate': 1, 'past_cutoff': 2}
+    assert summary['pages']['parsed'] == 3
+    assert (summary['pages']['failed'], summary['retries']) == (1, 1)
+    assert summary['statuses']['500'] == 2
+    fetched = summary['pages']['fetched']
+    assert fetched >= 3 and summary['statuses']['200'] == fetched
+    histograms = summary['histograms']
+    assert histograms['response_bytes']['count'] == fetched
+    assert histograms['fetch_seconds']['count'] == fetched
+    assert histograms['rows_per_page']['sum'] == 6
+    assert histograms['parse_seconds']['count'] == 3
+    assert load_summary(str(tmp_path / 'metrics.json')) == summary
+    assert load_summary(str(tmp_path / 'missing.json')) is None
+
+    # An unwritable summary file does not end the run.
+    unsaved = metrics.write(str(tmp_path / 'missing' / 'metrics.json'))
+    assert unsaved['rows'] == summary['rows'] and not (tmp_path / 'missing').exists()
+
+
+@pytest.mark.web
+def test_scrape_metrics_record_cache_hits_and_network_errors(mocker, tmp_path):
+    """Test that fresh cache hits, 304 answers and network errors are counted.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    metrics = ScrapeMetrics()
+    cache = PageCache(str(tmp_path), fresh_for=3600)
+    fetcher = make_fetcher(1, cache, metrics=metrics)
+    cache.put(fetcher.page_url(1), FAKE_HTML.encode('utf-8'), etag='"v1"')
+    assert fetcher.fetch(1) == FAKE_HTML.encode('utf-8')
+
+    cache.fresh_for = 0
+    mocker.patch('urllib3.PoolManager.request', side_effect=respond_with(304))
+    assert fetcher.fetch(1) == FAKE_HTML.encode('utf-8')
+
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=urllib3.exceptions.MaxRetryError(None, fetcher.page_url(2)))
+    assert fetcher.fetch(2) is None
+
+    summary = metrics.summary()
+    assert summary['pages'] == {'fetched': 0, 'not_modified': 1, 'cached': 1, 'failed': 1,
+                                'parsed': 0}
+    assert summary['statuses'] == {'304': 1, 'network_error': 1}
+    assert summary['histograms']['fetch_seconds']['count'] == 1
+    assert summary['histograms']['response_bytes']['count'] == 0
+
+
+@pytest.mark.web
+def test_main_writes_metrics_summary(mocker, tmp_path, capsys):
+    """Test that a full run saves its metrics, including its parses.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param capsys: Pytest fixture for capturing stdout and stderr.
+    :type capsys: pytest.CaptureFixture
+    """
+    mocker.patch.object(RobotFileParser, 'read', autospec=True,
+                        side_effect=lambda parser: parser.parse(["User-agent: *"]))
+    mocker.patch('src.rate_limiter.time.sleep')
+    mocker.patch('src.scrape_and_clean.load_pid_index', return_value=None)
+    mocker.patch('src.scrape_and_clean.get_latest_day_info',
+                 return_value=(date(2025, 9, 28), set()))
+    mocker.patch('src.scrape_and_clean.OUTPUT_FILE', str(tmp_path / "output.jsonl"))
+    metrics_file = tmp_path / "metrics.json"
+    mocker.patch('src.scrape_and_clean.METRICS_FILE', str(metrics_file))
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(10, []))
+
+    assert scrape_main(None) == 4
+
+    summary = load_summary(str(metrics_file))
+    assert summary['rows'] == {'new': 4, 'duplicate': 0, 'past_cutoff': 2}
+    assert summary['pages']['parsed'] == 3
+    assert f"details in {metrics_file}" in capsys.readouterr().out
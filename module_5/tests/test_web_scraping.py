@@ -1,57 +1,26 @@
 import pytest
 import json
+import os
 import psycopg
 import urllib3
-from datetime import date
-from unittest.mock import MagicMock, patch
-from src.scrape_and_clean import main as scrape_main, get_latest_day_info, scrape_and_clean
-
-
-# This has three realistic html entries from a scrape in order to test.
-FAKE_HTML = """
-<html><body><table><tbody>
-    
-    <tr>
-        <td class="tw-py-5 tw-pr-3"><div class="tw-font-medium">Test University</div></td>
-        <td class="tw-px-3 tw-py-5"><div><span>Software Engineering</span><span class="tw-text-gray-500">MS</span></div></td>
-        <td class="tw-px-3 tw-py-5">September 23, 2025</td>
-        <td class="tw-px-3 tw-py-5"><div class="tw-bg-green-50">Accepted on 23 Sep</div></td>
-        <td class="tw-relative tw-py-5"><a href="/result/103">Note</a></td>
-    </tr>
-    <tr class="tw-border-none">
-        <td colspan="3" class="tw-pt-2 tw-pb-5">
-            <div class="tw-gap-2 tw-flex">
-                <div class="tw-inline-flex">American</div>
-                <div class="tw-inline-flex">GPA 4.00</div>
-                <div class="tw-inline-flex">GRE 330</div>
-            </div>
-        </td>
-    </tr>
-    <tr class="tw-border-none">
-        <td colspan="100%" class="tw-pb-5"><p>This is a new comment.</p></td>
-    </tr>
-
-    <tr>
-        <td class="tw-py-5 tw-pr-3"><div class="tw-font-medium">Another University</div></td>
-        <td class="tw-px-3 tw-py-5"><div><span>Mechanical Engineering</span><span class="tw-text-gray-500">PhD</span></div></td>
-        <td class="tw-px-3 tw-py-5">September 22, 2025</td>
-        <td class="tw-px-3 tw-py-5"><div class="tw-bg-red-50">Rejected on 22 Sep</div></td>
-        <td class="tw-relative tw-py-5"><a href="/result/101">Note</a></td>
-    </tr>
-    <tr class="tw-border-none"><td colspan="3"><div>Details...</div></td></tr>
-    <tr class="tw-border-none"><td colspan="100%"><p>This is a duplicate comment.</p></td></tr>
-
-    <tr>
-        <td class="tw-py-5 tw-pr-3"><div class="tw-font-medium">Older University</div></td>
-        <td class="tw-px-3 tw-py-5"><div><span>Electrical Engineering</span><span class="tw-text-gray-500">MS</span></div></td>
-        <td class="tw-px-3 tw-py-5">September 21, 2025</td>
-        <td class="tw-px-3 tw-py-5"><div class="tw-bg-blue-50">Interview</div></td>
-        <td class="tw-relative tw-py-5"><a href="/result/100">Note</a></td>
-    </tr>
-    <tr class="tw-border-none"><td colspan="100%"><p>This comment should not be scraped.</p></td></tr>
-
-</tbody></table></body></html>
-"""
+from datetime import date, timedelta
+from unittest.mock import ANY, MagicMock, patch
+from src.scrape_and_clean import (
+    main as scrape_main, get_latest_day_info, scrape_and_clean,
+    scrape_pages, recrawl, load_content_hashes, retry_failed_pages
+)
+from src.scrape_options import ScrapeOptions
+from src.failed_pages import FailedPages
+from src.pid_index import PidIndex
+from src.checkpoint import ScrapeCheckpoint
+from src.entry_writer import EntryWriter
+from src.rate_limiter import RateLimiter
+from src.retry_policy import RetryPolicy
+from urllib.robotparser import RobotFileParser
+from tests.conftest import (
+    FAKE_HTML, fake_response, respond_with, build_listing_page,
+    fake_site_request, dated_site_request, flaky_site_request
+)
 
 
 # When Scraping is Disallowed by robots.txt
@@ -109,7 +78,7 @@ def test_main_scrapes_and_saves_new_data(mocker, tmp_path, db_session):
     mock_scraper = mocker.patch('src.scrape_and_clean.scrape_and_clean', return_value=fake_scraped_data)
 
     # Mock the output file path to use a temporary file.
-    fake_output_file = tmp_path / "output.json"
+    fake_output_file = tmp_path / "output.jsonl"
     mocker.patch('src.scrape_and_clean.OUTPUT_FILE', str(fake_output_file))
 
     # Run the main function.
@@ -118,8 +87,11 @@ def test_main_scrapes_and_saves_new_data(mocker, tmp_path, db_session):
     # Check that the scraper was called with the default start date.
     mock_scraper.assert_called_once_with(
         latest_db_date=date(2020, 1, 1),
-        pids_on_latest_date=set()
+        pids_on_latest_date=set(),
+        options=ANY
     )
+    options = mock_scraper.call_args.kwargs['options']
+    assert not options.failed_pages and options.pid_index is None
 
     # Check that the function returned the correct count.
     assert result == 2
@@ -127,7 +99,7 @@ def test_main_scrapes_and_saves_new_data(mocker, tmp_path, db_session):
     # Check that the output file was actually written with the correct data.
     assert fake_output_file.exists()
     with open(fake_output_file, 'r') as f:
-        saved_data = json.load(f)
+        saved_data = [json.loads(line) for line in f]
         assert saved_data == fake_scraped_data
 
 
@@ -162,8 +134,11 @@ def test_main_handles_no_new_data(mocker, db_session, capsys):
     # Check that the scraper was called with the correct latest date
     mock_scraper.assert_called_once_with(
         latest_db_date=latest_date,
-        pids_on_latest_date={101, 102}
+        pids_on_latest_date={101, 102},
+        options=ANY
     )
+    options = mock_scraper.call_args.kwargs['options']
+    assert not options.failed_pages and options.pid_index is None
     # Check that the function returned 0
     assert result == 0
     # Check that the correct message was printed
@@ -262,14 +237,12 @@ def test_scrape_and_clean_logic(mocker):
     :type mocker: pytest_mock.MockerFixture
     """
     # Mock the web request to return our fake HTML instead of hitting the internet.
-    mock_response = mocker.Mock()
-    mock_response.status = 200
-    mock_response.data = FAKE_HTML.encode('utf-8')
-    mocker.patch('urllib3.PoolManager.request', return_value=mock_response)
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=respond_with(200, FAKE_HTML.encode('utf-8')))
     
     # Mock the helper function that determines the year for dates.
     mocker.patch(
-        'src.scrape_and_clean.infer_years', 
+        'src.date_utils.YearInferrer.infer_page',
         return_value=['2025-09-23', '2025-09-22', '2025-09-21']
     )
     
@@ -310,13 +283,11 @@ def test_scrape_and_clean_handles_none_pids(mocker):
     :type mocker: pytest_mock.MockerFixture
     """
     # Set up mocks to match the 3 entries in the full FAKE_HTML.
-    mock_response = mocker.Mock()
-    mock_response.status = 200
-    mock_response.data = FAKE_HTML.encode('utf-8')
-    mocker.patch('urllib3.PoolManager.request', return_value=mock_response)
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=respond_with(200, FAKE_HTML.encode('utf-8')))
     
     mocker.patch(
-        'src.scrape_and_clean.infer_years',
+        'src.date_utils.YearInferrer.infer_page',
         return_value=['2025-09-23', '2025-09-22', '2025-09-21']
     )
 
@@ -355,9 +326,8 @@ def test_scrape_and_clean_handles_http_error_status(mocker, capsys):
     :type capsys: pytest.CaptureFixture
     """
     # Mock the web request to return a failed status code.
-    mock_response = mocker.Mock()
-    mock_response.status = 404 # Simulate "Not Found"
-    mocker.patch('urllib3.PoolManager.request', return_value=mock_response)
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=respond_with(404)) # Simulate "Not Found"
 
     # Run the function, limiting it to one page for speed.
     result = scrape_and_clean(page_limit=1)
@@ -413,10 +383,8 @@ def test_scrape_and_clean_handles_missing_tbody(mocker, capsys):
     :type capsys: pytest.CaptureFixture
     """
     # Mock a successful web request, but with invalid HTML content.
-    mock_response = mocker.Mock()
-    mock_response.status = 200
-    mock_response.data = b"<html><body><p>This is not the page you are looking for.</p></body></html>"
-    mocker.patch('urllib3.PoolManager.request', return_value=mock_response)
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=respond_with(200, b"<html><body><p>This is not the page you are looking for.</p></body></html>"))
 
     # Run the function.
     result = scrape_and_clean(page_limit=1)
@@ -450,10 +418,8 @@ def test_scrape_and_clean_stops_on_no_valid_rows(mocker, capsys):
       <tr><td colspan="5">No more results found on this page.</td></tr>
     </tbody>
     """
-    mock_response = mocker.Mock()
-    mock_response.status = 200
-    mock_response.data = fake_html_no_rows.encode('utf-8')
-    mocker.patch('urllib3.PoolManager.request', return_value=mock_response)
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=respond_with(200, fake_html_no_rows.encode('utf-8')))
 
     # Call the function.
     result = scrape_and_clean(page_limit=1)
@@ -464,6 +430,7 @@ def test_scrape_and_clean_stops_on_no_valid_rows(mocker, capsys):
     captured = capsys.readouterr()
     assert "No valid entry rows found on this page." in captured.out
 
+
 @pytest.mark.web
 def test_process_table_row_with_no_degree_span():
     """Test process_table_row when there's only one span (no degree).
@@ -472,7 +439,7 @@ def test_process_table_row_with_no_degree_span():
     is extracted only if there are multiple spans.
     """
     from bs4 import BeautifulSoup
-    from src.scrape_and_clean import process_table_row
+    from src.listing_parser import process_table_row
     
     # Create HTML with only one span (no degree span)
     html = """
@@ -511,7 +478,7 @@ def test_process_table_row_with_no_spans():
     is extracted, but the cell has no span elements.
     """
     from bs4 import BeautifulSoup
-    from src.scrape_and_clean import process_table_row
+    from src.listing_parser import process_table_row
     
     # Create HTML with no spans in the program cell
     html = """
@@ -550,7 +517,7 @@ def test_process_table_row_with_no_comment_paragraph():
     are extracted only if a <p> tag exists in the comment row.
     """
     from bs4 import BeautifulSoup
-    from src.scrape_and_clean import process_table_row
+    from src.listing_parser import process_table_row
     
     # Create main row HTML
     html = """
@@ -590,6 +557,7 @@ def test_process_table_row_with_no_comment_paragraph():
     # Verify comments is None when no <p> tag exists
     assert result['comments'] is None
 
+
 @pytest.mark.web
 def test_scrape_and_clean_no_pid_in_url():
     """Test when pid_match is None (URL doesn't contain a PID pattern).   
@@ -619,13 +587,10 @@ def test_scrape_and_clean_no_pid_in_url():
     """
     
     with patch('urllib3.PoolManager') as mock_pool:
-        mock_response = MagicMock()
-        mock_response.status = 200
-        mock_response.data = fake_html.encode('utf-8')
-        mock_pool.return_value.request.return_value = mock_response
+        mock_pool.return_value.request.side_effect = respond_with(200, fake_html.encode('utf-8'))
         
-        # Mock infer_years to return valid dates
-        with patch('src.scrape_and_clean.infer_years') as mock_infer:
+        # Mock the year inference to return valid dates
+        with patch('src.date_utils.YearInferrer.infer_page') as mock_infer:
             mock_infer.return_value = ['2025-09-15', '2025-09-14']
             
             # Run scrape_and_clean
@@ -639,4 +604,506 @@ def test_scrape_and_clean_no_pid_in_url():
             # The first entry should be skipped due to no PID match
             assert len(result) == 1
             assert result[0]['pid'] == 12345
-            assert result[0]['university'] == 'University B'
\ No newline at end of file
+            assert result[0]['university'] == 'University B'
+
+
+@pytest.mark.web
+def test_concurrent_scrape_matches_sequential(mocker):
+    """Test that concurrent fetching returns exactly the sequential result.
+
+    Pages are served out of order by the worker pool, so this verifies that
+    they are reassembled in page order before the cutoff and the duplicate
+    check are applied.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    mocker.patch('urllib3.PoolManager.request', side_effect=fake_site_request())
+
+    # Page 3 holds 24 and 23 Sep; pid 993 (23 Sep) is already in the database.
+    cutoff, stored_pids = date(2025, 9, 23), {993}
+    sequential = scrape_and_clean(cutoff, stored_pids, 5, ScrapeOptions(max_workers=1))
+    concurrent = scrape_and_clean(cutoff, stored_pids, 5, ScrapeOptions(max_workers=4))
+
+    assert concurrent == sequential
+    assert [entry['pid'] for entry in concurrent] == [998, 997, 996, 995, 994]
+
+
+@pytest.mark.web
+def test_concurrent_scrape_cancels_pages_past_cutoff(mocker):
+    """Test that pages queued past the cutoff page are not fetched.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    requested_urls = []
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=fake_site_request(requested_urls))
+
+    # The cutoff falls on page 1, so at most one window of pages is requested.
+    result = scrape_and_clean(latest_db_date=date(2025, 9, 28), page_limit=50,
+                              options=ScrapeOptions(max_workers=2))
+
+    assert [entry['pid'] for entry in result] == [998]
+    assert len(requested_urls) <= 3
+    assert not any(url.endswith('page=50') for url in requested_urls)
+
+
+@pytest.mark.web
+def test_process_pool_parsing_matches_inline(mocker):
+    """Test that parsing on a process pool returns exactly the inline result.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(64, []))
+    cutoff = date(2025, 9, 30) - timedelta(days=37)
+
+    inline = scrape_and_clean(cutoff, {74}, options=ScrapeOptions(probe=False))
+    pooled = scrape_and_clean(cutoff, {74}, options=ScrapeOptions(probe=False, parse_workers=2))
+
+    assert pooled == inline
+    assert len(pooled) == 73
+
+
+@pytest.mark.web
+def test_process_pool_parsing_stops_on_failed_page(mocker):
+    """Test that the pooled parser hands back every page before a failed one.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=dated_site_request(64, [], failing_pages=(4,)))
+    mocker.patch('src.scrape_and_clean.PARSE_WORKERS', 2)
+
+    result = scrape_and_clean(page_limit=10, options=ScrapeOptions(probe=False))
+
+    assert [entry['pid'] for entry in result] == [2, 1, 4, 3, 6, 5]
+
+    # Skipping the failed page, the parsed pages are drained once the page range runs out.
+    failed_pages = FailedPages()
+    result = scrape_and_clean(page_limit=5, options=ScrapeOptions(
+        probe=False, failed_pages=failed_pages
+    ))
+
+    assert failed_pages.pages == [4]
+    assert [entry['pid'] for entry in result] == [2, 1, 4, 3, 6, 5, 10, 9]
+
+
+# Two pages across New Year where only the first row gives a year, so page 2
+# can only be dated from page 1.
+YEAR_BOUNDARY_SITE = {
+    1: build_listing_page([(4, '02 Jan 2025'), (3, '01 Jan')]),
+    2: build_listing_page([(2, '31 Dec'), (1, '30 Dec')]),
+}
+
+
+@pytest.mark.web
+def test_year_context_carries_across_every_parse_path(mocker, tmp_path):
+    """Test that pooled, resumed and probed scrapes date pages like the inline parser.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=fake_site_request(site=YEAR_BOUNDARY_SITE))
+    kwargs = {'probe': False, 'max_workers': 1}
+
+    inline = scrape_and_clean(page_limit=5, options=ScrapeOptions(parse_workers=0, **kwargs))
+    assert [entry['date_added'] for entry in inline] == [
+        '2025-01-02', '2025-01-01', '2024-12-31', '2024-12-30'
+    ]
+    assert scrape_and_clean(page_limit=5,
+                            options=ScrapeOptions(parse_workers=2, **kwargs)) == inline
+    # The probe dates each page on its own; page 2 then looks newer, never older, than it is.
+    assert scrape_and_clean(date(2024, 1, 1), page_limit=5) == inline
+
+    # A scrape interrupted after page 1 resumes page 2 with page 1's year.
+    mocker.patch('src.page_walk.CHECKPOINT_EVERY', 1)
+    serve = fake_site_request(site=YEAR_BOUNDARY_SITE)
+
+    def crash_on_page_2(method, url, **request_kwargs):
+        if url.endswith('page=2'):
+            raise RuntimeError("connection reset")
+        return serve(method, url, **request_kwargs)
+    mocker.patch('urllib3.PoolManager.request', side_effect=crash_on_page_2)
+    checkpoint = ScrapeCheckpoint(str(tmp_path / "scrape.checkpoint"))
+    with pytest.raises(RuntimeError):
+        scrape_and_clean(page_limit=5, options=ScrapeOptions(checkpoint=checkpoint, **kwargs))
+
+    mocker.patch('urllib3.PoolManager.request', side_effect=serve)
+    assert scrape_and_clean(page_limit=5, options=ScrapeOptions(checkpoint=checkpoint, resume=True,
+                                                  parse_workers=2, **kwargs)) == inline
+
+
+@pytest.mark.web
+def test_main_streams_entries_to_jsonl(mocker, tmp_path):
+    """Test that ``main`` writes each page's entries as JSON Lines while scraping.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    mock_parser = MagicMock()
+    mock_parser.can_fetch.return_value = True
+    mocker.patch('src.scrape_and_clean.RobotFileParser', return_value=mock_parser)
+    cutoff = date(2025, 9, 30) - timedelta(days=7)
+    mocker.patch('src.scrape_and_clean.load_pid_index', return_value=None)
+    mocker.patch('src.scrape_and_clean.get_latest_day_info', return_value=(cutoff, set()))
+    output_file = tmp_path / "output.jsonl"
+    mocker.patch('src.scrape_and_clean.OUTPUT_FILE', str(output_file))
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(64, []))
+    mocker.patch.object(RateLimiter, 'from_robots', return_value=RateLimiter(1000.0))
+
+    lines_seen_per_page = []
+    original_write = EntryWriter.write
+
+    def record_progress(writer, entries):
+        original_write(writer, entries)
+        lines_seen_per_page.append(len(output_file.read_text().splitlines()))
+    mocker.patch.object(EntryWriter, 'write', record_progress)
+
+    # Pages 1 to 7 are on or after the cutoff date, with two entries each.
+    assert scrape_main(None) == 14
+
+    with open(output_file, 'r', encoding='utf-8') as f:
+        pids = [json.loads(line)['pid'] for line in f]
+    assert pids == [pid for page in range(1, 8) for pid in (page * 2, page * 2 - 1)]
+    # Entries reach the file as they are scraped, not in one write at the end.
+    assert lines_seen_per_page[0] < 14
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("parse_workers", [0, 2])
+def test_failed_pages_are_skipped_and_filled_in(mocker, parse_workers):
+    """Test that a failed page is recorded and skipped, then filled in by ``scrape_pages``.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param parse_workers: Number of parser processes.
+    :type parse_workers: int
+    """
+    cutoff = date(2025, 9, 30) - timedelta(days=6)
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(64, []))
+    expected = scrape_and_clean(latest_db_date=cutoff, options=ScrapeOptions(probe=False))
+
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=flaky_site_request({3: ['always']}))
+    failed_pages = FailedPages()
+    result = scrape_and_clean(latest_db_date=cutoff, options=ScrapeOptions(
+        probe=False, failed_pages=failed_pages, parse_workers=parse_workers
+    ))
+
+    assert failed_pages.pages == [3]
+    assert [entry['pid'] for entry in result] == [2, 1, 4, 3, 8, 7, 10, 9, 12, 11]
+
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(64, []))
+    failed_pages.add(7)
+    filled = scrape_pages(failed_pages, latest_db_date=cutoff)
+    assert sorted(result + filled, key=lambda entry: -entry['pid']) == \
+        sorted(expected, key=lambda entry: -entry['pid'])
+
+
+@pytest.mark.web
+def test_scrape_gives_up_after_failures_in_a_row(mocker):
+    """Test that the scrape stops after ``MAX_FAILED_IN_A_ROW`` consecutive failures.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    mocker.patch('urllib3.PoolManager.request', side_effect=flaky_site_request(
+        {2: ['always'], 4: ['always'], 5: ['always'], 6: ['always'], 8: ['always']}
+    ))
+    failed_pages = FailedPages()
+    result = scrape_and_clean(page_limit=20, options=ScrapeOptions(
+        probe=False, failed_pages=failed_pages
+    ))
+
+    # Page 2 was skipped; pages 4 onwards were never walked.
+    assert failed_pages.pages == [2] and failed_pages.gave_up_at == 4
+    assert failed_pages.bounds == {2: {'date_added': '2025-09-29', 'pid': 1},
+                                   4: {'date_added': '2025-09-27', 'pid': 5}}
+    assert [entry['pid'] for entry in result] == [2, 1, 6, 5]
+
+    failed_again = FailedPages()
+    assert scrape_pages(FailedPages([2]), options=ScrapeOptions(failed_pages=failed_again)) == []
+    assert failed_again.pages == [2]
+    assert scrape_pages(FailedPages([4])) == []
+
+    # Once the site recovers, the follow-up pass fills page 2 and walks on from page 4.
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(64, []))
+    filled = scrape_pages(failed_pages, page_limit=20)
+    assert sorted(entry['pid'] for entry in result + filled) == list(range(1, 41))
+
+
+@pytest.mark.web
+def test_continued_walk_keeps_year_context_and_skips_shifted_rows(mocker):
+    """Test that a walk continued from a gap is dated and trimmed from the gap's bound.
+
+    The earlier walk gave up at page 2 after collecting PID 3. Since then two
+    new entries have pushed PIDs 4 and 3 onto page 2, and the year-less dates
+    below them can only be dated from the bound.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    site = {
+        1: build_listing_page([(6, '03 Jan 2025'), (5, '02 Jan 2025')]),
+        2: build_listing_page([(4, '02 Jan 2025'), (3, '01 Jan')]),
+        3: build_listing_page([(2, '31 Dec'), (1, '30 Dec')]),
+    }
+    mocker.patch('urllib3.PoolManager.request', side_effect=fake_site_request(site=site))
+    failed_pages = FailedPages(gave_up_at=2, bounds={2: {'date_added': '2025-01-01', 'pid': 3}})
+
+    filled = scrape_pages(failed_pages, page_limit=5)
+
+    assert [(entry['pid'], entry['date_added']) for entry in filled] == [
+        (2, '2024-12-31'), (1, '2024-12-30')
+    ]
+
+
+@pytest.mark.web
+def test_retry_failed_pages_fills_in_a_recorded_run(mocker, tmp_path, capsys):
+    """Test that ``retry_failed_pages`` scrapes what an earlier run recorded as missing.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param capsys: Pytest fixture for capturing stdout and stderr.
+    :type capsys: pytest.CaptureFixture
+    """
+    mocker.patch.object(RobotFileParser, 'read', autospec=True,
+                        side_effect=lambda parser: parser.parse(["User-agent: *"]))
+    mocker.patch('src.rate_limiter.time.sleep')
+    mocker.patch('src.page_fetcher.time.sleep')
+    cutoff = date(2025, 9, 30) - timedelta(days=9)
+    mocker.patch('src.scrape_and_clean.load_pid_index', return_value=PidIndex(0))
+    mocker.patch('src.scrape_and_clean.get_latest_day_info', return_value=(cutoff, set()))
+    output_file = tmp_path / "output.jsonl"
+    failed_file = tmp_path / "failed_pages.json"
+    mocker.patch('src.scrape_and_clean.OUTPUT_FILE', str(output_file))
+    mocker.patch('src.scrape_and_clean.FAILED_PAGES_FILE', str(failed_file))
+    assert retry_failed_pages() == 0
+    assert "No failed pages are recorded" in capsys.readouterr().out
+
+    # Pages 4 to 6 fail through the first pass and its follow-up, so the run gives up.
+    failing = {page: ['always'] for page in (4, 5, 6)}
+    mocker.patch('urllib3.PoolManager.request', side_effect=flaky_site_request(failing))
+    assert scrape_main(None) == 6
+    with open(failed_file, 'r', encoding='utf-8') as f:
+        record = json.load(f)
+    assert record['gave_up_at'] == 4 and record['pid_watermark'] == 0
+
+    # The retry walks on from page 4 to the cutoff and clears the record.
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(64, []))
+    assert retry_failed_pages() == 12
+    with open(output_file, 'r', encoding='utf-8') as f:
+        assert [json.loads(line)['pid'] for line in f] == [
+            pid for page in range(4, 10) for pid in (page * 2, page * 2 - 1)
+        ]
+    assert not failed_file.exists()
+
+    mocker.patch('src.scrape_and_clean.robots_limiter', return_value=None)
+    failed_file.write_text(json.dumps(record), encoding='utf-8')
+    assert retry_failed_pages() == 0
+
+
+@pytest.mark.web
+@pytest.mark.parametrize("failure", [500, 'truncated'])
+def test_main_retries_failed_pages_and_records_the_rest(mocker, tmp_path, capsys, failure):
+    """Test the follow-up pass in ``main`` and the record of pages that still fail.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param capsys: Pytest fixture for capturing stdout and stderr.
+    :type capsys: pytest.CaptureFixture
+    :param failure: How page 2 fails: an error status, or a body that breaks off.
+    :type failure: int or str
+    """
+    mock_parser = MagicMock()
+    mock_parser.can_fetch.return_value = True
+    mocker.patch('src.scrape_and_clean.RobotFileParser', return_value=mock_parser)
+    mocker.patch.object(RateLimiter, 'from_robots', return_value=RateLimiter(1000.0))
+    mocker.patch('src.page_fetcher.time.sleep')
+    cutoff = date(2025, 9, 30) - timedelta(days=5)
+    mocker.patch('src.scrape_and_clean.load_pid_index', return_value=None)
+    mocker.patch('src.scrape_and_clean.get_latest_day_info', return_value=(cutoff, set()))
+    output_file = tmp_path / "output.jsonl"
+    failed_file = tmp_path / "failed_pages.json"
+    mocker.patch('src.scrape_and_clean.OUTPUT_FILE', str(output_file))
+    mocker.patch('src.scrape_and_clean.FAILED_PAGES_FILE', str(failed_file))
+
+    # Page 2 fails through every retry of the probe and the first pass, then recovers.
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=flaky_site_request({2: [failure] * 8, 4: ['always']}))
+
+    assert scrape_main(None) == 8
+    with open(output_file, 'r', encoding='utf-8') as f:
+        assert sorted(json.loads(line)['pid'] for line in f) == [1, 2, 3, 4, 5, 6, 9, 10]
+    with open(failed_file, 'r', encoding='utf-8') as f:
+        assert json.load(f) == {'pages': [4], 'gave_up_at': None,
+                                'bounds': {'4': {'date_added': '2025-09-27', 'pid': 5}},
+                                'latest_db_date': '2025-09-25', 'pids_on_latest_date': []}
+    assert "Retrying the pages that failed: FailedPages(pages=[2, 4], gave_up_at=None)" \
+        in capsys.readouterr().out
+
+    # A clean run removes the stale record.
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(64, []))
+    assert scrape_main(None) == 10
+    assert not failed_file.exists()
+
+
+@pytest.mark.web
+def test_main_reuses_cached_robots_policy(mocker, tmp_path, isolated_robots_cache):
+    """Test that a second ``main`` run uses the cached robots.txt instead of reading it.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    :param isolated_robots_cache: Per-test cache installed by conftest.
+    :type isolated_robots_cache: src.robots_cache.RobotsCache
+    """
+    read = mocker.patch.object(RobotFileParser, 'read', autospec=True,
+                               side_effect=lambda parser: parser.parse(
+                                   ["User-agent: *", "Crawl-delay: 1"]))
+    mocker.patch('src.scrape_and_clean.load_pid_index', return_value=None)
+    mocker.patch('src.scrape_and_clean.get_latest_day_info',
+                 return_value=(date(2025, 9, 30), set()))
+    mocker.patch('src.scrape_and_clean.OUTPUT_FILE', str(tmp_path / "output.jsonl"))
+    mocker.patch('src.scrape_and_clean.FAILED_PAGES_FILE', str(tmp_path / "failed.json"))
+    mocker.patch('src.rate_limiter.time.sleep')
+    from_robots = mocker.spy(RateLimiter, 'from_robots')
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(64, []))
+
+    scrape_main(None)
+    scrape_main(None)
+
+    assert read.call_count == 1
+    assert os.path.exists(isolated_robots_cache.path)
+    # The cached copy keeps the Crawl-delay the pacing is built from.
+    assert from_robots.call_count == 2
+    assert from_robots.spy_return.max_rate == 1.0
+
+
+@pytest.mark.web
+def test_recrawl_saves_only_changed_entries(mocker, tmp_path):
+    """Test that a re-crawl writes out stored entries whose content hash differs.
+
+    The newest stored date is 29 Sep, so a two-day window covers pages 1-3
+    (PIDs 2, 1, 4, 3, 6, 5). PIDs 5 and 6 are not stored and are left to the
+    regular scrape; PID 1 has no stored hash and PID 3 a stale one.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param tmp_path: Pytest temporary directory fixture.
+    :type tmp_path: pathlib.Path
+    """
+    mocker.patch.object(RobotFileParser, 'read', autospec=True,
+                        side_effect=lambda parser: parser.parse(["User-agent: *"]))
+    mocker.patch('src.rate_limiter.time.sleep')
+    mocker.patch('src.scrape_and_clean.get_latest_day_info',
+                 return_value=(date(2025, 9, 29), set()))
+    output_file = tmp_path / "updated.jsonl"
+    mocker.patch('src.scrape_and_clean.RECRAWL_OUTPUT_FILE', str(output_file))
+    mocker.patch('urllib3.PoolManager.request', side_effect=dated_site_request(10, []))
+    current = {entry.pid: entry.content_hash()
+               for entry in scrape_and_clean(latest_db_date=date(2025, 9, 27),
+                                             options=ScrapeOptions(probe=False))}
+    assert sorted(current) == [1, 2, 3, 4, 5, 6]
+
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.fetchall.return_value = [(1, None), (2, current[2]), (3, 'stale'), (4, current[4])]
+
+    assert recrawl(conn, days=2) == 2
+    assert cur.execute.call_args.args[1] == (date(2025, 9, 27),)
+    with open(output_file, 'r', encoding='utf-8') as f:
+        assert [json.loads(line)['pid'] for line in f] == [1, 3]
+
+    # A failed page is reported and picked up by the next re-crawl.
+    mocker.patch('src.scrape_and_clean.RetryPolicy', return_value=RetryPolicy(attempts=1))
+    mocker.patch('urllib3.PoolManager.request',
+                 side_effect=dated_site_request(10, [], failing_pages=(2,)))
+    assert recrawl(conn, days=2) == 1
+
+    mocker.patch('src.scrape_and_clean.get_latest_day_info', return_value=(None, set()))
+    assert recrawl(conn) == 0
+    mocker.patch('src.scrape_and_clean.robots_limiter', return_value=None)
+    assert recrawl(conn) == 0
+
+
+@pytest.mark.web
+def test_load_content_hashes_handles_db_error():
+    """Test that a database error while reading hashes leaves nothing to compare."""
+    conn = MagicMock()
+    conn.cursor.side_effect = psycopg.OperationalError("connection lost")
+    assert load_content_hashes(conn, date(2025, 9, 1)) == {}
+
+
+@pytest.mark.web
+def test_scrape_skips_and_stops_on_pid_alone(mocker, capsys):
+    """Test that stored PIDs are skipped and the scrape stops below the PID window.
+
+    ``FAKE_SITE`` lists PIDs 998 down to 989, two per page. With 994 and 993
+    stored and a window of 3, page 3 is skipped entirely and page 4 stops the
+    scrape after its late-arriving PID 992, whatever the listing's dates say.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    :param capsys: Pytest fixture for capturing stdout and stderr.
+    :type capsys: pytest.CaptureFixture
+    """
+    requested_urls = []
+    mocker.patch('urllib3.PoolManager.request', side_effect=fake_site_request(requested_urls))
+    index = PidIndex(994, [994, 993], window=3)
+
+    entries = scrape_and_clean(options=ScrapeOptions(
+        max_workers=1, probe=False, pid_index=index
+    ))
+
+    assert [entry['pid'] for entry in entries] == [998, 997, 996, 995, 992]
+    # Without the PID stop the walk would go on to the empty page 6.
+    assert not any(url.endswith('page=6') for url in requested_urls)
+    assert "Found PID 991, which is well below the highest stored PID (994)" in capsys.readouterr().out
+    assert [entry['pid'] for entry in scrape_pages(FailedPages([4, 5]), options=ScrapeOptions(
+        pid_index=index
+    ))] == [992]
+
+
+@pytest.mark.web
+def test_get_latest_day_info_without_pids():
+    """Test that the per-day PID query is skipped when a PID index is used instead."""
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.fetchone.return_value = (date(2025, 9, 23),)
+
+    assert get_latest_day_info(conn, with_pids=False) == (date(2025, 9, 23), set())
+    assert cur.execute.call_count == 1
+
+
+@pytest.mark.web
+def test_scrape_carries_year_context_across_pages(mocker):
+    """Test that year-less dates at the top of a page are dated from the previous page.
+
+    Inferred from its own page alone, page 2 would fall in the last December before today.
+
+    :param mocker: Pytest mocker fixture for mocking external dependencies.
+    :type mocker: pytest_mock.MockerFixture
+    """
+    pages = {1: [(4, '02 Jan 2025'), (3, '01 Jan')], 2: [(2, '31 Dec'), (1, '30 Dec')], 3: []}
+    mocker.patch('urllib3.PoolManager.request', side_effect=lambda _method, url, **_kwargs:
+                 fake_response(200, build_listing_page(pages[int(url.rsplit('=', 1)[1])])
+                               .encode('utf-8')))
+
+    entries = scrape_and_clean(page_limit=3, options=ScrapeOptions(probe=False, max_workers=1))
+
+    assert [(entry.pid, entry.date_added) for entry in entries] == [
+        (4, '2025-01-02'), (3, '2025-01-01'), (2, '2024-12-31'), (1, '2024-12-30')]